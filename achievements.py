@@ -2,9 +2,12 @@ import discord
 from discord.ui import Button, View, Select
 import datetime
 import random
+import weakref
+import zlib
 from typing import Dict, List, Any, Optional, Tuple
 
-from data_models import PlayerData, DataManager, Achievement
+from data_models import PlayerData, DataManager
+from scheduler import Scheduler
 
 # Achievement definitions with requirements, rewards, and badges
 ACHIEVEMENTS = {
@@ -385,6 +388,11 @@ ACHIEVEMENTS = {
     }
 }
 
+# Version of the daily and weekly quest tables. Players' quests for a period
+# are drawn from a seed that includes it, so bump it whenever DAILY_QUESTS or
+# WEEKLY_QUESTS change; progress recorded against the old tables is dropped.
+QUEST_TABLE_VERSION = 1
+
 # Daily quests - these reset daily
 DAILY_QUESTS = [
     {
@@ -629,32 +637,106 @@ SPECIAL_EVENTS = [
     }
 ]
 
+# Requirement type -> PlayerData counter it compares against. Assigning one
+# of these fields is reported to AchievementTracker.stat_changed().
+FIELD_REQUIREMENTS = {
+    "level": "class_level",
+    "wins": "wins",
+    "pvp_wins": "pvp_wins",
+    "dungeons_completed": "dungeons_completed",
+    "bosses_defeated": "bosses_defeated",
+    "gold_earned": "gold_earned",
+    "gold_spent": "gold_spent",
+    "training_completed": "training_completed",
+    "advanced_training_completed": "advanced_training_completed",
+    "guild_contributions": "guild_contributions",
+    "guild_dungeons": "guild_dungeons",
+    "class_changes": "class_changes",
+    "daily_claims": "daily_claims",
+    "quests_completed": "quests_completed",
+}
+FIELD_STATS = {field: req_type for req_type, field in FIELD_REQUIREMENTS.items()}
+
+# Requirements read from the inventory's collection counters
+INVENTORY_REQUIREMENTS = ("unique_items", "unique_weapons", "unique_armor",
+                          "unique_accessories", "rare_items", "epic_items",
+                          "legendary_items")
+
+# Requirements read from guild membership, a few lookups each
+GUILD_REQUIREMENTS = ("join_guild", "guild_officer", "guild_leader")
+
+RARITIES_AT_LEAST = {
+    "rare_items": ["rare", "epic", "legendary", "mythic"],
+    "epic_items": ["epic", "legendary", "mythic"],
+    "legendary_items": ["legendary", "mythic"],
+}
+UNIQUE_TYPES = {
+    "unique_weapons": "weapon",
+    "unique_armor": "armor",
+    "unique_accessories": "accessory",
+}
+
+
+def _compile_thresholds() -> Dict[str, List[Tuple[int, str]]]:
+    thresholds = {}
+    for achievement_id, achievement in ACHIEVEMENTS.items():
+        requirement = achievement["requirement"]
+        thresholds.setdefault(requirement["type"], []).append(
+            (requirement["value"], achievement_id))
+    for entries in thresholds.values():
+        entries.sort()
+    return thresholds
+
+
+# Requirement type -> [(value, achievement_id)], lowest value first
+THRESHOLDS = _compile_thresholds()
+
+
+def get_achievement_tracker(data_manager: DataManager) -> 'AchievementTracker':
+    """The data manager's tracker, created (and listening) on first use"""
+    if data_manager.achievement_tracker is None:
+        data_manager.achievement_tracker = AchievementTracker(data_manager)
+    return data_manager.achievement_tracker
+
+
 class AchievementTracker:
+    """
+    Awards achievements as the stats they require change
+
+    Counter requirements are tested from field change events: each event
+    tests only the lowest unearned threshold for that stat (more only if
+    the value passed several) and queues the achievements reached. The
+    position of that threshold is remembered per player and stat. check_achievements() then awards the queue, and
+    tests guild and item requirements, which are O(1) lookups each. Use
+    get_achievement_tracker() rather than creating trackers directly.
+    """
+
     def __init__(self, data_manager: DataManager):
         self.data_manager = data_manager
+        # Achievements reached but not yet awarded, by user id
+        self._pending: Dict[int, List[str]] = {}
+        # Player -> req_type -> index into THRESHOLDS[req_type] of the lowest
+        # threshold not yet earned or queued; earned achievements are never
+        # taken away, so it only moves forward
+        self._next: 'weakref.WeakKeyDictionary[PlayerData, Dict[str, int]]' = (
+            weakref.WeakKeyDictionary())
+
+        for field, req_type in FIELD_STATS.items():
+            if req_type in THRESHOLDS:
+                data_manager.watch_field(field, self.stat_changed)
 
     def get_player_achievements(self, player: PlayerData) -> List[Dict[str, Any]]:
         """Get a list of player's completed achievements"""
-        if not hasattr(player, "achievements"):
-            player.achievements = []
-
-        completed_achievements = []
-        for achievement_id in player.achievements:
-            if achievement_id in ACHIEVEMENTS:
-                completed_achievements.append({
-                    "id": achievement_id,
-                    **ACHIEVEMENTS[achievement_id]
-                })
-
-        return completed_achievements
+        return [
+            {"id": achievement_id, **achievement}
+            for achievement_id, achievement in ACHIEVEMENTS.items()
+            if achievement_id in player.achievements
+        ]
 
     def get_player_achievement_points(self, player: PlayerData) -> int:
         """Get total achievement points for player"""
         total_points = 0
 
-        if not hasattr(player, "achievements"):
-            player.achievements = []
-
         for achievement_id in player.achievements:
             if achievement_id in ACHIEVEMENTS:
                 total_points += ACHIEVEMENTS[achievement_id].get("points", 0)
@@ -663,192 +745,111 @@ class AchievementTracker:
 
     def get_player_available_achievements(self, player: PlayerData) -> List[Dict[str, Any]]:
         """Get a list of player's available (not yet completed) achievements"""
-        if not hasattr(player, "achievements"):
-            player.achievements = []
-
-        available_achievements = []
-        for achievement_id, achievement in ACHIEVEMENTS.items():
-            if achievement_id not in player.achievements:
-                available_achievements.append({
-                    "id": achievement_id,
-                    **achievement
-                })
-
-        return available_achievements
-
-    def check_achievements(self, player: PlayerData) -> List[Dict[str, Any]]:
-        """Check and apply any newly completed achievements"""
-        if not hasattr(player, "achievements"):
-            player.achievements = []
+        return [
+            {"id": achievement_id, **achievement}
+            for achievement_id, achievement in ACHIEVEMENTS.items()
+            if achievement_id not in player.achievements
+        ]
 
-        if not hasattr(player, "achievement_progress"):
-            player.achievement_progress = {}
+    def stat_changed(self, player: PlayerData, field: str, value: Any) -> None:
+        """Field watcher: a counter a requirement compares against changed"""
+        self._reached(player, FIELD_STATS[field], value)
+
+    def _reached(self, player: PlayerData, req_type: str, value: Any) -> None:
+        """Queue every unearned achievement of req_type that value reaches"""
+        thresholds = THRESHOLDS.get(req_type, ())
+        positions = self._next.setdefault(player, {})
+        i = positions.get(req_type, 0)
+        pending = self._pending.get(player.user_id, ())
+        # Thresholds are sorted, so stop at the first one not reached
+        while i < len(thresholds) and (thresholds[i][1] in player.achievements
+                                       or value >= thresholds[i][0]):
+            achievement_id = thresholds[i][1]
+            if (achievement_id not in player.achievements
+                    and achievement_id not in pending):
+                pending = self._pending.setdefault(player.user_id, [])
+                pending.append(achievement_id)
+            i += 1
+        positions[req_type] = i
+
+    def check_achievements(self, player: PlayerData, full: bool = False) -> List[Dict[str, Any]]:
+        """
+        Award the achievements the player has reached
+
+        With full=True every requirement is re-evaluated, not just the ones
+        changed since the last check; use it where the player may have
+        changed while nothing was listening.
+
+        Returns:
+            The newly earned achievements, in the order they were earned
+        """
+        if full:
+            for req_type in THRESHOLDS:
+                self._reached(player, req_type,
+                              self.requirement_value(player, req_type))
+        else:
+            for req_type in GUILD_REQUIREMENTS + INVENTORY_REQUIREMENTS:
+                self._reached(player, req_type,
+                              self.requirement_value(player, req_type))
 
         newly_earned = []
-
-        # Get available achievements
-        available_achievements = self.get_player_available_achievements(player)
-
-        for achievement in available_achievements:
-            # Skip already earned
-            if achievement["id"] in player.achievements:
+        pending = self._pending.pop(player.user_id, [])
+        while pending:
+            achievement_id = pending.pop(0)
+            if achievement_id in player.achievements:
                 continue
 
-            # Check if achievement is completed
-            completed = self.check_achievement_completion(player, achievement)
+            achievement = {"id": achievement_id, **ACHIEVEMENTS[achievement_id]}
+            player.achievements.add(achievement_id)
 
-            if completed:
-                # Add achievement to player
-                player.achievements.append(achievement["id"])
+            # Rewards can level the player up, which queues more
+            self.award_achievement_rewards(player, achievement)
+            newly_earned.append(achievement)
 
-                # Award rewards
-                self.award_achievement_rewards(player, achievement)
-
-                # Add to newly earned list
-                newly_earned.append(achievement)
-
-                # Check for meta achievements (like earning X achievements)
-                if achievement["category"] == "meta":
-                    # Recheck achievements since we just earned one
-                    return newly_earned + self.check_achievements(player)
+            # Earning one moves the meta achievements (like earning X achievements)
+            self._reached(player, "achievements_earned", len(player.achievements))
+            self._reached(player, "achievement_points",
+                          self.get_player_achievement_points(player))
+            pending.extend(self._pending.pop(player.user_id, []))
 
         return newly_earned
 
     def check_achievement_completion(self, player: PlayerData, achievement: Dict[str, Any]) -> bool:
         """Check if an achievement is completed"""
-        req_type = achievement["requirement"]["type"]
-        req_value = achievement["requirement"]["value"]
-
-        # Check based on requirement type
-        if req_type == "level":
-            return player.class_level >= req_value
-
-        elif req_type == "wins":
-            return hasattr(player, "wins") and player.wins >= req_value
-
-        elif req_type == "pvp_wins":
-            return hasattr(player, "pvp_wins") and player.pvp_wins >= req_value
-
-        elif req_type == "dungeons_completed":
-            return hasattr(player, "dungeons_completed") and player.dungeons_completed >= req_value
-
-        elif req_type == "bosses_defeated":
-            return hasattr(player, "bosses_defeated") and player.bosses_defeated >= req_value
-
-        elif req_type == "gold_earned":
-            return hasattr(player, "gold_earned") and player.gold_earned >= req_value
-
-        elif req_type == "gold_spent":
-            return hasattr(player, "gold_spent") and player.gold_spent >= req_value
-
-        elif req_type == "unique_items":
-            return hasattr(player, "inventory") and len(self.get_unique_items(player)) >= req_value
-
-        elif req_type == "unique_weapons":
-            return hasattr(player, "inventory") and len(self.get_unique_items_by_type(player, "weapon")) >= req_value
-
-        elif req_type == "unique_armor":
-            return hasattr(player, "inventory") and len(self.get_unique_items_by_type(player, "armor")) >= req_value
-
-        elif req_type == "unique_accessories":
-            return hasattr(player, "inventory") and len(self.get_unique_items_by_type(player, "accessory")) >= req_value
-
-        elif req_type == "rare_items":
-            return hasattr(player, "inventory") and len(self.get_items_by_rarity(player, ["rare", "epic", "legendary", "mythic"])) >= req_value
-
-        elif req_type == "epic_items":
-            return hasattr(player, "inventory") and len(self.get_items_by_rarity(player, ["epic", "legendary", "mythic"])) >= req_value
-
-        elif req_type == "legendary_items":
-            return hasattr(player, "inventory") and len(self.get_items_by_rarity(player, ["legendary", "mythic"])) >= req_value
-
-        elif req_type == "training_completed":
-            return hasattr(player, "training_completed") and player.training_completed >= req_value
-
-        elif req_type == "advanced_training_completed":
-            return hasattr(player, "advanced_training_completed") and player.advanced_training_completed >= req_value
-
-        elif req_type == "join_guild":
-            # Check if player is in a guild
-            if hasattr(self.data_manager, "member_guild_map"):
-                return player.user_id in self.data_manager.member_guild_map
-            return False
-
-        elif req_type == "guild_contributions":
-            return hasattr(player, "guild_contributions") and player.guild_contributions >= req_value
-
-        elif req_type == "guild_dungeons":
-            return hasattr(player, "guild_dungeons") and player.guild_dungeons >= req_value
-
-        elif req_type == "guild_officer":
-            # Check if player is a guild officer
-            if hasattr(self.data_manager, "member_guild_map") and player.user_id in self.data_manager.member_guild_map:
-                guild_name = self.data_manager.member_guild_map[player.user_id]
-                if guild_name in self.data_manager.guild_data:
-                    guild_data = self.data_manager.guild_data[guild_name]
-                    return player.user_id in guild_data.get("officers", [])
-            return False
-
-        elif req_type == "guild_leader":
-            # Check if player is a guild leader
-            if hasattr(self.data_manager, "member_guild_map") and player.user_id in self.data_manager.member_guild_map:
-                guild_name = self.data_manager.member_guild_map[player.user_id]
-                if guild_name in self.data_manager.guild_data:
-                    guild_data = self.data_manager.guild_data[guild_name]
-                    return player.user_id == guild_data.get("leader_id")
-            return False
-
-        elif req_type == "class_changes":
-            return hasattr(player, "class_changes") and player.class_changes >= req_value
-
-        elif req_type == "daily_claims":
-            return hasattr(player, "daily_claims") and player.daily_claims >= req_value
-
-        elif req_type == "quests_completed":
-            return hasattr(player, "quests_completed") and player.quests_completed >= req_value
-
-        elif req_type == "achievements_earned":
-            return len(player.achievements) >= req_value
-
-        elif req_type == "achievement_points":
-            return self.get_player_achievement_points(player) >= req_value
-
-        return False
-
-    def get_unique_items(self, player: PlayerData) -> List[str]:
-        """Get list of unique item names in player inventory"""
-        if not hasattr(player, "inventory"):
-            return []
-
-        unique_items = set()
-        for inv_item in player.inventory:
-            unique_items.add(inv_item.item.name)
-
-        return list(unique_items)
-
-    def get_unique_items_by_type(self, player: PlayerData, item_type: str) -> List[str]:
-        """Get list of unique items of a specific type"""
-        if not hasattr(player, "inventory"):
-            return []
-
-        unique_items = set()
-        for inv_item in player.inventory:
-            if inv_item.item.item_type == item_type:
-                unique_items.add(inv_item.item.name)
-
-        return list(unique_items)
-
-    def get_items_by_rarity(self, player: PlayerData, rarities: List[str]) -> List[str]:
-        """Get list of items with specified rarities"""
-        if not hasattr(player, "inventory"):
-            return []
-
-        matching_items = []
-        for inv_item in player.inventory:
-            if inv_item.item.rarity in rarities:
-                matching_items.append(inv_item.item.name)
-
-        return matching_items
+        requirement = achievement["requirement"]
+        return (self.requirement_value(player, requirement["type"]) >=
+                requirement["value"])
+
+    def requirement_value(self, player: PlayerData, req_type: str) -> int:
+        """The player's current value for a requirement type"""
+        if req_type in FIELD_REQUIREMENTS:
+            return getattr(player, FIELD_REQUIREMENTS[req_type], 0) or 0
+
+        if req_type == "unique_items":
+            return player.unique_item_count()
+        if req_type in UNIQUE_TYPES:
+            return player.inventory.distinct_names_of_type(UNIQUE_TYPES[req_type])
+        if req_type in RARITIES_AT_LEAST:
+            return sum(player.inventory.rarity_count(rarity)
+                       for rarity in RARITIES_AT_LEAST[req_type])
+
+        if req_type in GUILD_REQUIREMENTS:
+            guild_name = self.data_manager.member_guild_map.get(player.user_id)
+            if guild_name is None:
+                return 0
+            if req_type == "join_guild":
+                return 1
+            guild_data = self.data_manager.guild_data.get(guild_name, {})
+            if req_type == "guild_officer":
+                return int(player.user_id in guild_data.get("officers", []))
+            return int(player.user_id == guild_data.get("leader_id"))
+
+        if req_type == "achievements_earned":
+            return len(player.achievements)
+        if req_type == "achievement_points":
+            return self.get_player_achievement_points(player)
+
+        return 0
 
     def award_achievement_rewards(self, player: PlayerData, achievement: Dict[str, Any]):
         """Award rewards for completing an achievement"""
@@ -863,9 +864,7 @@ class AchievementTracker:
 
         # Award gold
         if "gold" in reward:
-            if not hasattr(player, "gold"):
-                player.gold = 0
-            player.gold += reward["gold"]
+            player.add_gold(reward["gold"])
 
         # Award special item if any
         if "special_item" in reward:
@@ -888,99 +887,113 @@ class AchievementTracker:
 
             if reward["server_role"] not in player.earned_roles:
                 player.earned_roles.append(reward["server_role"])
+                player.mark_changed()
 
         # Save player data
         self.data_manager.save_data()
 
-class QuestManager:
-    def __init__(self, data_manager: DataManager):
-        self.data_manager = data_manager
+# (progress store, key of the quest's progress in it, quest)
+QuestSlot = Tuple[Any, Any, Dict[str, Any]]
 
-        # Initialize event system if not already
-        if not hasattr(self.data_manager, "active_events"):
-            self.data_manager.active_events = {}
 
-        # Check for event expiration
-        self.check_expired_events()
+def quest_periods(now: datetime.datetime) -> Tuple[str, str]:
+    """
+    Periods of the daily and weekly quests at now
 
-    def get_daily_quests(self, player: PlayerData) -> List[Dict[str, Any]]:
-        """Get player's active daily quests"""
-        today = datetime.datetime.now().strftime("%Y-%m-%d")
-
-        # Initialize player quest data if needed
-        if not hasattr(player, "daily_quests"):
-            player.daily_quests = {}
-
-        # Check if we need to generate new daily quests
-        if today not in player.daily_quests:
-            # Generate new daily quests
-            player.daily_quests[today] = self.generate_daily_quests(player)
-            self.data_manager.save_data()
+    Returns:
+        Tuple of (date, ISO week)
+    """
+    return now.strftime("%Y-%m-%d"), f"{now.year}-W{now.isocalendar()[1]}"
 
-        return player.daily_quests[today]
 
-    def generate_daily_quests(self, player: PlayerData) -> List[Dict[str, Any]]:
-        """Generate a set of daily quests for a player"""
-        # Select 3 random daily quests
-        selected_quests = random.sample(DAILY_QUESTS, min(3, len(DAILY_QUESTS)))
+def get_quest_manager(data_manager: DataManager) -> 'QuestManager':
+    """The data manager's quest manager, created on first use"""
+    if data_manager.quest_manager is None:
+        data_manager.quest_manager = QuestManager(data_manager)
+    return data_manager.quest_manager
 
-        # Customize values based on player level
-        daily_quests = []
-        for quest_template in selected_quests:
-            # Generate appropriate value based on level
-            level_factor = min(1.0, player.class_level / 50)  # Cap at level 50
-            value_range = quest_template["max_value"] - quest_template["min_value"]
-            quest_value = quest_template["min_value"] + int(value_range * level_factor)
 
-            # Calculate rewards
-            rewards = {}
-            for reward_type, reward_calc in quest_template["reward"].items():
-                rewards[reward_type] = reward_calc(quest_value)
+class QuestManager:
+    """
+    Player quests and server events
 
-            # Create the quest
-            quest = {
-                "id": quest_template["id"],
-                "name": quest_template["name"],
-                "description": quest_template["description"].format(value=quest_value),
-                "type": quest_template["type"],
-                "value": quest_value,
-                "progress": 0,
-                "completed": False,
-                "reward": rewards
-            }
+    Once schedule() has handed it a Scheduler, the quest periods roll over
+    and events expire from timer jobs, so reads only look them up; without
+    one both are worked out on every read. Use get_quest_manager() rather
+    than creating managers directly.
+    """
 
-            daily_quests.append(quest)
+    def __init__(self, data_manager: DataManager):
+        self.data_manager = data_manager
+        self.scheduler: Optional[Scheduler] = None
+        # (date, ISO week) as of the last rollover, kept by the scheduler
+        self._periods: Optional[Tuple[str, str]] = None
 
-        return daily_quests
+    def schedule(self, scheduler: Scheduler) -> None:
+        """Run the quest rollover and event expiry from scheduler jobs"""
+        self.scheduler = scheduler
+        self.check_expired_events()
+        for event_data in self.data_manager.active_events.values():
+            self._schedule_expiry(event_data)
+        self._roll_over()
 
-    def get_weekly_quests(self, player: PlayerData) -> List[Dict[str, Any]]:
-        """Get player's active weekly quests"""
-        # Get current week (ISO week number)
-        today = datetime.datetime.now()
-        current_week = f"{today.year}-W{today.isocalendar()[1]}"
-
-        # Initialize player quest data if needed
-        if not hasattr(player, "weekly_quests"):
-            player.weekly_quests = {}
-
-        # Check if we need to generate new weekly quests
-        if current_week not in player.weekly_quests:
-            # Generate new weekly quests
-            player.weekly_quests[current_week] = self.generate_weekly_quests(player)
+    def _roll_over(self) -> None:
+        """Start the current day's (and week's) quests and schedule the next rollover"""
+        now = datetime.datetime.now()
+        self._periods = quest_periods(now)
+        tomorrow = (now + datetime.timedelta(days=1)).date()
+        midnight = datetime.datetime.combine(tomorrow, datetime.time())
+        self.scheduler.call_at(midnight.timestamp(), self._roll_over, "quest rollover")
+
+    def current_day(self) -> str:
+        """Today's date, the period of the daily quests"""
+        if self._periods is not None:
+            return self._periods[0]
+        return quest_periods(datetime.datetime.now())[0]
+
+    def current_week(self) -> str:
+        """This ISO week, the period of the weekly quests"""
+        if self._periods is not None:
+            return self._periods[1]
+        return quest_periods(datetime.datetime.now())[1]
+
+    def _period_quests(self, player: PlayerData, field: str, period: str,
+                       templates: List[Dict[str, Any]],
+                       count: int) -> Tuple[List[int], List[Dict[str, Any]]]:
+        """
+        A player's quests for a daily or weekly period
+
+        Only a progress vector is stored per period: [class level when the
+        period started, progress of quest 1, quest 2, ...]. The first look
+        at a new period starts its vector and drops the expired ones.
+
+        Returns:
+            Tuple of (the stored progress vector, the quests)
+        """
+        key = f"{period}/v{QUEST_TABLE_VERSION}"
+        vector = getattr(player, field).get(key)
+        if vector is None:
+            vector = [player.class_level] + [0] * min(count, len(templates))
+            setattr(player, field, {key: vector})
             self.data_manager.save_data()
-
-        return player.weekly_quests[current_week]
-
-    def generate_weekly_quests(self, player: PlayerData) -> List[Dict[str, Any]]:
-        """Generate a set of weekly quests for a player"""
-        # Select 2 random weekly quests
-        selected_quests = random.sample(WEEKLY_QUESTS, min(2, len(WEEKLY_QUESTS)))
-
-        # Customize values based on player level
-        weekly_quests = []
-        for quest_template in selected_quests:
-            # Generate appropriate value based on level
-            level_factor = min(1.0, player.class_level / 50)  # Cap at level 50
+        return vector, self.generate_period_quests(player, templates, key, vector)
+
+    def generate_period_quests(self, player: PlayerData, templates: List[Dict[str, Any]],
+                               key: str, vector: List[int]) -> List[Dict[str, Any]]:
+        """
+        Build a player's daily or weekly quests from their progress vector
+
+        The quests are drawn with a generator seeded from the user id and the
+        period key (which includes QUEST_TABLE_VERSION), so the same quests
+        come back on every call and after restarts.
+        """
+        seed = zlib.crc32(f"{player.user_id}:{key}".encode())
+        selected_quests = random.Random(seed).sample(templates, len(vector) - 1)
+
+        # Customize values based on the level the period started at
+        level_factor = min(1.0, vector[0] / 50)  # Cap at level 50
+        quests = []
+        for quest_template, progress in zip(selected_quests, vector[1:]):
             value_range = quest_template["max_value"] - quest_template["min_value"]
             quest_value = quest_template["min_value"] + int(value_range * level_factor)
 
@@ -989,94 +1002,120 @@ class QuestManager:
             for reward_type, reward_calc in quest_template["reward"].items():
                 rewards[reward_type] = reward_calc(quest_value)
 
-            # Create the quest
-            quest = {
+            quests.append({
                 "id": quest_template["id"],
                 "name": quest_template["name"],
                 "description": quest_template["description"].format(value=quest_value),
                 "type": quest_template["type"],
                 "value": quest_value,
-                "progress": 0,
-                "completed": False,
+                "progress": progress,
+                "completed": progress >= quest_value,
                 "reward": rewards
-            }
+            })
 
-            weekly_quests.append(quest)
+        return quests
 
-        return weekly_quests
+    def get_daily_quests(self, player: PlayerData) -> List[Dict[str, Any]]:
+        """Get player's active daily quests"""
+        return self._period_quests(player, "daily_quests", self.current_day(),
+                                   DAILY_QUESTS, 3)[1]
+
+    def get_weekly_quests(self, player: PlayerData) -> List[Dict[str, Any]]:
+        """Get player's active weekly quests"""
+        return self._period_quests(player, "weekly_quests", self.current_week(),
+                                   WEEKLY_QUESTS, 2)[1]
 
     def get_long_term_quests(self, player: PlayerData) -> List[Dict[str, Any]]:
         """Get player's long-term quests"""
-        # Initialize player quest data if needed
-        if not hasattr(player, "long_term_quests"):
-            # Generate all long-term quests
-            player.long_term_quests = self.generate_long_term_quests()
-            self.data_manager.save_data()
-
-        return player.long_term_quests
-
-    def generate_long_term_quests(self) -> List[Dict[str, Any]]:
-        """Generate all long-term quests"""
-        long_term_quests = []
-
+        # Only quests with progress are stored, by quest id
+        progress = player.long_term_quests
+        quests = []
         for quest_template in LONG_TERM_QUESTS:
-            # Create the quest
-            quest = {
+            quest_progress = progress.get(quest_template["id"], 0)
+            quests.append({
                 "id": quest_template["id"],
                 "name": quest_template["name"],
                 "description": quest_template["description"],
                 "type": quest_template["type"],
                 "value": quest_template["value"],
-                "progress": 0,
-                "completed": False,
+                "progress": quest_progress,
+                "completed": quest_progress >= quest_template["value"],
                 "reward": quest_template["reward"]
-            }
-
-            long_term_quests.append(quest)
-
-        return long_term_quests
+            })
+
+        return quests
+
+    def active_quests(self, player: PlayerData) -> Dict[str, List[QuestSlot]]:
+        """
+        Player's unfinished daily, weekly and long-term quests by quest type
+
+        The index is kept on the player and rebuilt when the day or week
+        rolls over (which also starts the new period's quests) or when a
+        quest field is reassigned.
+
+        Returns:
+            Dict of quest type -> [(progress store, key in it, quest)], in
+            the order daily, weekly, long-term
+        """
+        today = self.current_day()
+        current_week = self.current_week()
+        cached = player._quest_index
+        if cached is not None and cached[0] == today and cached[1] == current_week:
+            return cached[2]
+
+        slots: List[QuestSlot] = []
+        for vector, quests in (
+                self._period_quests(player, "daily_quests", today, DAILY_QUESTS, 3),
+                self._period_quests(player, "weekly_quests", current_week, WEEKLY_QUESTS, 2)):
+            # Quest n's progress is vector[n + 1]
+            slots += [(vector, position + 1, quest)
+                      for position, quest in enumerate(quests)]
+        slots += [(player.long_term_quests, quest["id"], quest)
+                  for quest in self.get_long_term_quests(player)]
+
+        index: Dict[str, List[QuestSlot]] = {}
+        for slot in slots:
+            if not slot[2]["completed"]:
+                index.setdefault(slot[2]["type"], []).append(slot)
+
+        # Set after the getters above, which drop the index when they
+        # start a new period
+        object.__setattr__(player, "_quest_index", (today, current_week, index))
+        return index
 
     def update_quest_progress(self, player: PlayerData, quest_type: str, amount: int = 1) -> List[Dict[str, Any]]:
         """Update progress for all quests of a specific type and return completed quests"""
+        index = self.active_quests(player)
+        slots = index.get(quest_type)
+        if not slots:
+            # No active quest tracks this action
+            return []
+
         completed_quests = []
+        for store, key, quest in slots:
+            quest["progress"] += amount
+            store[key] = quest["progress"]
+            if quest["progress"] >= quest["value"]:
+                quest["completed"] = True
+                completed_quests.append(quest)
+
+        if completed_quests:
+            remaining = [slot for slot in slots if not slot[2]["completed"]]
+            if remaining:
+                index[quest_type] = remaining
+            else:
+                del index[quest_type]
 
-        # Check daily quests
-        daily_quests = self.get_daily_quests(player)
-        for quest in daily_quests:
-            if quest["type"] == quest_type and not quest["completed"]:
-                quest["progress"] += amount
-                if quest["progress"] >= quest["value"]:
-                    quest["completed"] = True
-                    completed_quests.append(quest)
-
-        # Check weekly quests
-        weekly_quests = self.get_weekly_quests(player)
-        for quest in weekly_quests:
-            if quest["type"] == quest_type and not quest["completed"]:
-                quest["progress"] += amount
-                if quest["progress"] >= quest["value"]:
-                    quest["completed"] = True
-                    completed_quests.append(quest)
-
-        # Check long-term quests
-        long_term_quests = self.get_long_term_quests(player)
-        for quest in long_term_quests:
-            if quest["type"] == quest_type and not quest["completed"]:
-                quest["progress"] += amount
-                if quest["progress"] >= quest["value"]:
-                    quest["completed"] = True
-                    completed_quests.append(quest)
-
-        # Award rewards for completed quests
-        for quest in completed_quests:
-            self.award_quest_rewards(player, quest)
-
-        # Update quest completion count for achievements
-        if not hasattr(player, "quests_completed"):
-            player.quests_completed = 0
-        player.quests_completed += len(completed_quests)
-
-        # Save data
+            # Award rewards for completed quests
+            for quest in completed_quests:
+                self.award_quest_rewards(player, quest)
+
+            # Update quest completion count for achievements
+            player.quests_completed += len(completed_quests)
+
+        # Progress is changed inside the quest fields, which the player
+        # does not see, so flag the record for saving here
+        self.data_manager.mark_player_dirty(player.user_id)
         self.data_manager.save_data()
 
         return completed_quests
@@ -1110,13 +1149,8 @@ class QuestManager:
                     if event_data["effect"]["type"] == "gold_multiplier":
                         energy_amount = int(energy_amount * event_data["effect"]["value"])
 
-            # Add to player's cursed energy (the main currency)
-            player.cursed_energy += energy_amount
-
-            # Track gold earned for achievements
-            if not hasattr(player, "gold_earned"):
-                player.gold_earned = 0
-            player.gold_earned += energy_amount
+            # Gold is the main currency; add_gold() also tracks gold_earned
+            player.add_gold(energy_amount)
 
         # Award special item if any
         if "special_item" in reward:
@@ -1203,27 +1237,36 @@ class QuestManager:
         # Add to active events
         self.data_manager.active_events[event_id] = event_data
         self.data_manager.save_data()
+        if self.scheduler is not None:
+            self._schedule_expiry(event_data)
 
         return event_data
 
     def get_active_events(self) -> List[Dict[str, Any]]:
         """Get list of currently active events"""
-        if not hasattr(self.data_manager, "active_events"):
-            self.data_manager.active_events = {}
-            return []
-
-        # Check for expired events
-        self.check_expired_events()
+        if self.scheduler is None:
+            # Nothing expires events in the background
+            self.check_expired_events()
 
         # Return active events
         return list(self.data_manager.active_events.values())
 
+    def _schedule_expiry(self, event_data: Dict[str, Any]) -> None:
+        end_time = event_data["end_time"]
+        self.scheduler.call_at(
+            datetime.datetime.fromisoformat(end_time).timestamp(),
+            lambda: self.expire_event(event_data["id"], end_time),
+            f"{event_data['id']} expiry")
+
+    def expire_event(self, event_id: str, end_time: str) -> None:
+        """End an event at end_time, unless it was ended or restarted since"""
+        event_data = self.data_manager.active_events.get(event_id)
+        if event_data is not None and event_data["end_time"] == end_time:
+            del self.data_manager.active_events[event_id]
+            self.data_manager.save_data()
+
     def check_expired_events(self):
         """Check and remove expired events"""
-        if not hasattr(self.data_manager, "active_events"):
-            self.data_manager.active_events = {}
-            return
-
         now = datetime.datetime.now()
         expired_events = []
 
@@ -1242,17 +1285,12 @@ class QuestManager:
 
     def get_average_player_level(self) -> int:
         """Get average level of all players"""
-        total_level = 0
-        player_count = 0
-
-        for player_id, player_data in self.data_manager.player_data.items():
-            total_level += player_data.class_level
-            player_count += 1
+        average = self.data_manager.population().mean("class_level")
 
-        if player_count == 0:
+        if average is None:
             return 10  # Default if no players
 
-        return max(1, int(total_level / player_count))
+        return max(1, int(average))
 
 class AchievementsView(View):
     def __init__(self, player_data: PlayerData, achievement_tracker: AchievementTracker):
@@ -1598,11 +1636,11 @@ async def achievements_command(ctx, data_manager: DataManager):
     """View your achievements and badges"""
     player_data = data_manager.get_player(ctx.author.id)
 
-    # Initialize achievement tracker
-    achievement_tracker = AchievementTracker(data_manager)
+    achievement_tracker = get_achievement_tracker(data_manager)
 
-    # Check for new achievements
-    new_achievements = achievement_tracker.check_achievements(player_data)
+    # Check for new achievements, including any reached while the bot wasn't
+    # tracking this player
+    new_achievements = achievement_tracker.check_achievements(player_data, full=True)
 
     # Create view
     achievements_view = AchievementsView(player_data, achievement_tracker)
@@ -1653,7 +1691,7 @@ async def quests_command(ctx, data_manager: DataManager):
     player_data = data_manager.get_player(ctx.author.id)
 
     # Initialize quest manager
-    quest_manager = QuestManager(data_manager)
+    quest_manager = get_quest_manager(data_manager)
 
     # Create view
     quests_view = QuestsView(player_data, quest_manager)
@@ -1670,7 +1708,7 @@ async def event_command(ctx, data_manager: DataManager, action: str = None, even
         return
 
     # Initialize quest manager
-    quest_manager = QuestManager(data_manager)
+    quest_manager = get_quest_manager(data_manager)
 
     if action == "start":
         if not event_id:
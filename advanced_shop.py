@@ -1001,7 +1001,7 @@ class AdvancedShopView(RestrictedView):
         ]
 
         # Only add secret items if player has the achievement
-        if hasattr(self.player_data, "achievements") and any(a.get("id") == "discover_secret" for a in self.player_data.achievements):
+        if hasattr(self.player_data, "achievements") and "discover_secret" in self.player_data.achievements:
             categories.append(discord.SelectOption(label="Secret Items", value="secret", emoji="🔍"))
 
         # Only add divine items for max level players
@@ -1212,21 +1212,14 @@ class AdvancedShopView(RestrictedView):
             # Check if player has enough gold
             if self.player_data.gold >= item_data["value"]:
                 # Create the item
-                from data_models import Item
+                from item_catalog import catalog_key, create_item
 
                 # Handle special effects
                 special_effect = item_data.get("special_effect", None)
 
-                new_item = Item(
-                    item_id=generate_item_id(),
-                    name=item_data["name"],
-                    description=item_data["description"],
-                    item_type=item_data["item_type"],
-                    rarity=item_data["rarity"],
-                    stats=item_data["stats"],
-                    level_req=item_data["level_req"],
-                    value=item_data["value"]
-                )
+                new_item = create_item(
+                    catalog_key("advanced", item_data["name"]),
+                    generate_item_id())
 
                 # Handle special items with effects
                 if item_data["item_type"] == "special":
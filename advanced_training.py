@@ -1036,20 +1036,10 @@ class TrainingMinigameView(View):
             energy_gain = self.current_difficulty.get("energy_gain", 5)
 
         # Apply the gains
-        levelup_threshold = 100 * self.player_data.class_level
         old_level = self.player_data.class_level
 
-        # Update XP
-        self.player_data.class_exp += exp_gain
-
-        # Check for level up
-        leveled_up = False
-        while self.player_data.class_exp >= levelup_threshold:
-            self.player_data.class_exp -= levelup_threshold
-            self.player_data.class_level += 1
-            self.player_data.skill_points += 3
-            levelup_threshold = 100 * self.player_data.class_level
-            leveled_up = True
+        # Update XP and apply any level ups
+        leveled_up = self.player_data.add_exp(exp_gain)
 
         # Apply attribute gains if applicable
         if attribute_gain > 0:
@@ -1063,6 +1053,8 @@ class TrainingMinigameView(View):
             if secondary_attr in self.player_data.allocated_stats:
                 self.player_data.allocated_stats[secondary_attr] += max(1, attribute_gain // 2)
 
+            self.player_data.invalidate_stats()
+
         # Check for special rewards for perfect score
         special_rewards = None
         if success_percent == 100 and "special_rewards" in self.training_data and "perfect_score" in self.training_data["special_rewards"]:
@@ -1072,7 +1064,7 @@ class TrainingMinigameView(View):
             if "cursed_energy" in special_rewards:
                 # Convert cursed_energy rewards to gold
                 gold_reward = special_rewards["cursed_energy"]
-                self.player_data.gold += gold_reward
+                self.player_data.add_gold(gold_reward)
 
             # Apply effect if present
             if "effect" in special_rewards:
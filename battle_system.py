@@ -52,22 +52,14 @@ class BattleEntity:
         self.status_effects = {
         }  # Effect name -> (turns remaining, effect strength)
 
-        # Process active effects from special items
+        # Apply stat boosts from active special item effects
         if is_player and player_data and hasattr(player_data,
-                                                 "active_effects"):
-            # Apply any HP boosts from active effects
-            for effect_name, effect_data in player_data.active_effects.items():
-                if effect_data.get("effect") == "hp_boost":
-                    boost_amount = effect_data.get("boost_amount", 0)
-                    self.stats["hp"] += boost_amount
-                    self.current_hp += boost_amount
-                elif effect_data.get("effect") == "all_stats_boost":
-                    boost_amount = effect_data.get("boost_amount", 0)
-                    for stat in ["power", "defense", "speed", "hp"]:
-                        if stat in self.stats:
-                            self.stats[stat] += boost_amount
-                            if stat == "hp":
-                                self.current_hp += boost_amount
+                                                 "get_effect_boosts"):
+            for stat, boost_amount in player_data.get_effect_boosts().items():
+                if stat in self.stats:
+                    self.stats[stat] += boost_amount
+                    if stat == "hp":
+                        self.current_hp += boost_amount
 
         # Activate special abilities for this battle
         if is_player and player_data and hasattr(player_data,
@@ -369,8 +361,28 @@ class BattleView(RestrictedView):
         self.enemy = enemy
         self.data_manager: Optional[
             DataManager] = None  # Will be set by start_battle
+        # Keep the fighters' data cached for the whole battle
+        self.pinned_players = [
+            entity.player_data for entity in (player, enemy)
+            if entity.player_data is not None
+        ]
+        for player_data in self.pinned_players:
+            player_data.pin()
         self.update_buttons()
 
+    def release_players(self):
+        for player_data in self.pinned_players:
+            player_data.unpin()
+        self.pinned_players = []
+
+    def stop(self):
+        self.release_players()
+        super().stop()
+
+    async def on_timeout(self):
+        self.release_players()
+        await super().on_timeout()
+
     def get_safe_message_content(self,
                                  interaction: discord.Interaction) -> str:
         """Safely extract message content from interaction, returning empty string if not possible"""
@@ -562,13 +574,10 @@ class BattleView(RestrictedView):
         item_effect_applied = False
         if player_data and hasattr(player_data,
                                    'inventory') and player_data.inventory:
-            for inv_item in player_data.inventory:
-                if (hasattr(inv_item, 'item') and inv_item.item
-                        and hasattr(inv_item.item, 'name')
-                        and inv_item.item.name == item_name
-                        and inv_item.quantity > 0):
-                    # Found the item, reduce quantity
-                    inv_item.quantity -= 1
+            for inv_item in player_data.inventory.by_name(item_name):
+                if inv_item.quantity > 0:
+                    # Found the item, use one up
+                    player_data.remove_item(inv_item, 1)
                     item_found = True
                     break
 
@@ -862,8 +871,8 @@ async def start_battle(ctx, player_data: PlayerData, enemy_name: str,
         player_data.wins += 1
 
         # Update quest progress for daily and weekly quest tracking
-        from achievements import QuestManager
-        quest_manager = QuestManager(data_manager)
+        from achievements import get_quest_manager
+        quest_manager = get_quest_manager(data_manager)
 
         # Update various quest types that would be triggered by a battle win
         completed_daily_quests = quest_manager.update_quest_progress(
@@ -916,6 +925,8 @@ async def start_battle(ctx, player_data: PlayerData, enemy_name: str,
             # Remove expired effects
             for effect_name in expired_effects:
                 del player_data.active_effects[effect_name]
+            if expired_effects:
+                player_data.invalidate_stats()
 
         # Check for achievements
         new_achievements = data_manager.check_player_achievements(player_data)
@@ -1409,12 +1420,12 @@ async def start_pvp_battle(ctx, target_member, player_data, target_data,
 
         # Add rewards
         leveled_up = target_data.add_exp(exp_reward)
-        target_data.gold += gold_reward
+        target_data.add_gold(gold_reward)
 
         # Deduct some gold from loser (but not too much)
         gold_penalty = min(gold_reward // 3, player_data.gold //
                            10)  # Reduced to be less punishing
-        player_data.gold = max(0, player_data.gold - gold_penalty)
+        player_data.remove_gold(gold_penalty)
 
         # Set cooldowns
         current_time = datetime.datetime.now()
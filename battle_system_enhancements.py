@@ -35,21 +35,13 @@ def enhanced_battle_entity_init(self, name: str, stats: Dict[str, int], moves=No
     self.player_data = player_data
     self.status_effects = {}  # Effect name -> (turns remaining, effect strength)
 
-    # Process active effects from special items
-    if is_player and player_data and hasattr(player_data, "active_effects"):
-        # Apply any HP boosts from active effects
-        for effect_name, effect_data in player_data.active_effects.items():
-            if effect_data.get("effect") == "hp_boost":
-                boost_amount = effect_data.get("boost_amount", 0)
-                self.stats["hp"] += boost_amount
-                self.current_hp += boost_amount
-            elif effect_data.get("effect") == "all_stats_boost":
-                boost_amount = effect_data.get("boost_amount", 0)
-                for stat in ["power", "defense", "speed", "hp"]:
-                    if stat in self.stats:
-                        self.stats[stat] += boost_amount
-                        if stat == "hp":
-                            self.current_hp += boost_amount
+    # Apply stat boosts from active special item effects
+    if is_player and player_data and hasattr(player_data, "get_effect_boosts"):
+        for stat, boost_amount in player_data.get_effect_boosts().items():
+            if stat in self.stats:
+                self.stats[stat] += boost_amount
+                if stat == "hp":
+                    self.current_hp += boost_amount
 
 # Enhanced function to update player energy after battle
 def update_player_energy_after_battle(player_data: PlayerData, battle_entity):
@@ -50,22 +50,14 @@ class BattleEntity:
         self.status_effects = {
         }  # Effect name -> (turns remaining, effect strength)
 
-        # Process active effects from special items
+        # Apply stat boosts from active special item effects
         if is_player and player_data and hasattr(player_data,
-                                                 "active_effects"):
-            # Apply any HP boosts from active effects
-            for effect_name, effect_data in player_data.active_effects.items():
-                if effect_data.get("effect") == "hp_boost":
-                    boost_amount = effect_data.get("boost_amount", 0)
-                    self.stats["hp"] += boost_amount
-                    self.current_hp += boost_amount
-                elif effect_data.get("effect") == "all_stats_boost":
-                    boost_amount = effect_data.get("boost_amount", 0)
-                    for stat in ["power", "defense", "speed", "hp"]:
-                        if stat in self.stats:
-                            self.stats[stat] += boost_amount
-                            if stat == "hp":
-                                self.current_hp += boost_amount
+                                                 "get_effect_boosts"):
+            for stat, boost_amount in player_data.get_effect_boosts().items():
+                if stat in self.stats:
+                    self.stats[stat] += boost_amount
+                    if stat == "hp":
+                        self.current_hp += boost_amount
 
     def is_alive(self) -> bool:
         return self.current_hp > 0
@@ -238,8 +230,28 @@ class BattleView(View):
         super().__init__(timeout=timeout)
         self.player = player
         self.enemy = enemy
+        # Keep the fighters' data cached for the whole battle
+        self.pinned_players = [
+            entity.player_data for entity in (player, enemy)
+            if entity.player_data is not None
+        ]
+        for player_data in self.pinned_players:
+            player_data.pin()
         self.update_buttons()
 
+    def release_players(self):
+        for player_data in self.pinned_players:
+            player_data.unpin()
+        self.pinned_players = []
+
+    def stop(self):
+        self.release_players()
+        super().stop()
+
+    async def on_timeout(self):
+        self.release_players()
+        await super().on_timeout()
+
     def get_safe_message_content(self,
                                  interaction: discord.Interaction) -> str:
         """Safely extract message content from interaction, returning empty string if not possible"""
@@ -545,16 +557,9 @@ class BattleView(View):
                 return
 
             # Find the item in inventory
-            item_index = None
-            used_inv_item = None
-
-            for i, item in enumerate(player_data.inventory):
-                if hasattr(item, 'name') and item.name == item_name:
-                    item_index = i
-                    used_inv_item = item
-                    break
+            used_inv_item = player_data.inventory.find(item_name)
 
-            if item_index is None or used_inv_item is None:
+            if used_inv_item is None:
                 await interaction.response.send_message(
                     f"Couldn't find {item_name} in your inventory!",
                     ephemeral=True)
@@ -631,11 +636,7 @@ class BattleView(View):
                 effect_message = f"You used {item_name} and boosted your defense by {boost_amount} for {boost_turns} turns! 🛡️"
 
             # Remove item from inventory
-            if hasattr(used_inv_item,
-                       'quantity') and used_inv_item.quantity > 1:
-                used_inv_item.quantity -= 1
-            else:
-                player_data.inventory.pop(item_index)
+            player_data.remove_item(used_inv_item, 1)
 
             # Save player data
             try:
@@ -775,6 +776,7 @@ async def start_battle(ctx, player_data: PlayerData, enemy_name: str,
 
         # Award rewards
         # Add rewards - ensure we're adding all rewards properly
+        old_level = player_data.class_level
         player_data.add_exp(exp_reward)
         player_data.add_gold(gold_reward)
 
@@ -805,23 +807,14 @@ async def start_battle(ctx, player_data: PlayerData, enemy_name: str,
                                 f"Gold: {gold_reward} 💰",
                                 inline=False)
 
-        # Check for level up
-        old_level = player_data.class_level
-        # Calculate XP needed for next level
-        xp_needed = int(100 * (old_level**1.5))
-
-        # Check if player has enough XP to level up
-        if player_data.class_exp >= xp_needed and old_level < 50:  # Max level cap at 50
-            # Level up!
-            player_data.class_level += 1
-            player_data.class_exp -= xp_needed
-            player_data.skill_points += 2  # Award 2 skill points per level
-
+        # add_exp() already applied any level-ups and their skill points
+        levels_gained = player_data.class_level - old_level
+        if levels_gained > 0:
             # Add level up message
             rewards_embed.add_field(
                 name="🎊 Level Up!",
                 value=f"You are now level {player_data.class_level}!\n"
-                f"You received 2 skill points!",
+                f"You received {3 * levels_gained} skill points!",
                 inline=False)
 
             # Add extra rewards for level up
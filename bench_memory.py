@@ -0,0 +1,78 @@
+"""
+Benchmark the in-memory size of hydrated players
+
+Builds the same synthetic players as bench_snapshot.py twice: once with the
+current slotted PlayerData/InventoryItem/Item classes, and once rebuilt into
+plain objects that keep their attributes in a per-instance __dict__ (the
+layout before __slots__). Reports traced bytes per player for each. Usage:
+
+    python bench_memory.py [player_count]
+"""
+
+import json
+import random
+import sys
+import tracemalloc
+
+from bench_snapshot import make_player
+from data_models import PlayerData, Inventory
+
+
+class Unslotted:
+    """Same attributes as the wrapped object, stored in a __dict__"""
+
+
+def unslotted(obj):
+    copy = Unslotted()
+    for name in type(obj).__slots__:
+        if name != "__weakref__" and hasattr(obj, name):
+            setattr(copy, name, getattr(obj, name))
+    return copy
+
+
+def build_slotted(user_id: int, encoded: str) -> PlayerData:
+    return PlayerData.from_dict(user_id, json.loads(encoded))
+
+
+def build_unslotted(user_id: int, encoded: str) -> Unslotted:
+    player = unslotted(build_slotted(user_id, encoded))
+    entries = []
+    for inv_item in player.inventory:
+        entry = unslotted(inv_item)
+        entry.item = unslotted(inv_item.item)
+        entries.append(entry)
+    player.inventory = Inventory(entries)
+    return player
+
+
+def bytes_per_player(build, records) -> float:
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    players = [build(user_id, encoded) for user_id, encoded in records]
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del players
+    return used / len(records)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rng = random.Random(42)
+    records = [(user_id, json.dumps(make_player(user_id, rng)))
+               for user_id in range(10**17, 10**17 + count)]
+    inventory = sum(len(json.loads(encoded)["inventory"])
+                    for _, encoded in records) / count
+    print(f"Synthetic dataset: {count} players, "
+          f"{inventory:.1f} inventory entries per player")
+
+    before = bytes_per_player(build_unslotted, records)
+    after = bytes_per_player(build_slotted, records)
+    print(f"{'layout':<24}{'bytes/player':>14}")
+    print(f"{'__dict__ (before)':<24}{before:>14.0f}")
+    print(f"{'__slots__ (after)':<24}{after:>14.0f}")
+    print(f"saved {before - after:.0f} bytes per player "
+          f"({(before - after) / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark snapshot formats on a synthetic player population
+
+Compares the legacy pretty-printed JSON, the current compact JSON document
+and the binary snapshot (binary_format.py) on file size, save time and load
+time, plus the cost of committing one changed player. Usage:
+
+    python bench_snapshot.py [player_count]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from data_models import PlayerData, Item, InventoryItem
+from storage import JsonStorage, BinaryStorage, summarize_record
+
+ITEM_TEMPLATES = [
+    ("Cursed Blade", "weapon", {"power": 12}),
+    ("Spirit Staff", "weapon", {"power": 9, "speed": 3}),
+    ("Iron Guard", "armor", {"defense": 10, "hp": 20}),
+    ("Shadow Cloak", "armor", {"defense": 6, "speed": 4}),
+    ("Jade Ring", "accessory", {"power": 3, "speed": 3}),
+    ("Healing Potion", "consumable", {"hp": 50}),
+    ("Energy Tonic", "consumable", {"energy": 30}),
+    ("Iron Ore", "Material:Mining", {}),
+    ("Moonpetal", "Material:Herbs", {}),
+]
+RARITIES = ["common", "uncommon", "rare", "epic", "legendary"]
+
+
+def make_player(user_id: int, rng: random.Random) -> dict:
+    """Build a plausible mid-game player record"""
+    player = PlayerData(user_id)
+    player.class_name = rng.choice(["Spirit Striker", "Domain Tactician", "Flash Rogue"])
+    player.class_level = rng.randint(1, 120)
+    player.class_exp = rng.randint(0, 5000)
+    player.gold = rng.randint(0, 250000)
+    player.wins = rng.randint(0, 800)
+    player.losses = rng.randint(0, 300)
+    player.skill_points = rng.randint(0, 30)
+    player.allocated_stats = {s: rng.randint(0, 40) for s in player.allocated_stats}
+    player.dungeon_clears = {"Shadow Crypt": rng.randint(0, 20)}
+
+    for _ in range(rng.randint(5, 40)):
+        name, item_type, stats = rng.choice(ITEM_TEMPLATES)
+        rarity = rng.choice(RARITIES)
+        item = Item(f"{name.lower().replace(' ', '_')}_{rng.getrandbits(48):x}",
+                    name, f"A {rarity} {name.lower()} from the abyss.",
+                    item_type, rarity, dict(stats), rng.randint(1, 50),
+                    rng.randint(10, 5000))
+        player.inventory.append(
+            InventoryItem(item, quantity=rng.randint(1, 10),
+                          equipped=rng.random() < 0.1))
+
+    return player.to_dict()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(42)
+    players = {
+        user_id: make_player(user_id, rng)
+        for user_id in range(10**17, 10**17 + count)
+    }
+    print(f"Synthetic dataset: {count} players, "
+          f"{sum(len(p['inventory']) for p in players.values())} inventory entries")
+
+    workdir = tempfile.mkdtemp(prefix="snapshot_bench_")
+    legacy_path = os.path.join(workdir, "legacy.json")
+    json_path = os.path.join(workdir, "player_data.json")
+    binary_path = os.path.join(workdir, "player_data.bin")
+
+    # Legacy: pretty-printed document, every player parsed and hydrated on load
+    document = {
+        "players": {str(k): v for k, v in players.items()},
+        "guilds": {},
+        "member_guild_map": {}
+    }
+
+    def legacy_save():
+        with open(legacy_path, 'w') as f:
+            json.dump(document, f, indent=4)
+
+    def legacy_load():
+        with open(legacy_path) as f:
+            data = json.load(f)
+        return {
+            int(k): PlayerData.from_dict(int(k), v)
+            for k, v in data["players"].items()
+        }
+
+    # Current compact JSON and binary, both loading lazily
+    json_storage = JsonStorage(json_path)
+    binary_storage = BinaryStorage(binary_path)
+    for user_id, record in players.items():
+        summary = summarize_record(record)
+        json_storage.put_player(user_id, json_storage.encode_record(record), summary)
+        binary_storage.put_player(user_id, binary_storage.encode_record(record), summary)
+
+    results = []
+    for name, path, save, load in [
+        ("legacy json (indent=4)", legacy_path, legacy_save, legacy_load),
+        ("json", json_path, json_storage.commit, lambda: JsonStorage(json_path).load()),
+        ("binary", binary_path, binary_storage.commit, lambda: BinaryStorage(binary_path).load()),
+    ]:
+        _, save_time = timed(save)
+        _, load_time = timed(load)
+        results.append((name, os.path.getsize(path), save_time, load_time))
+
+    # Cost of hydrating a single player from each lazy backend
+    sample = rng.sample(list(players), min(1000, count))
+    json_storage = JsonStorage(json_path)
+    json_storage.load()
+    binary_storage = BinaryStorage(binary_path)
+    binary_storage.load()
+    _, json_hydrate = timed(lambda: [
+        PlayerData.from_dict(u, json_storage.decode_record(json_storage.load_player(u)))
+        for u in sample
+    ])
+    _, binary_hydrate = timed(lambda: [
+        PlayerData.from_dict(u, binary_storage.decode_record(binary_storage.load_player(u)))
+        for u in sample
+    ])
+
+    # Cost of committing one changed player, as a flush after a command does
+    def commit_one(storage):
+        user_id = sample[0]
+        record = players[user_id]
+        storage.put_player(user_id, storage.encode_record(record),
+                           summarize_record(record))
+        storage.commit()
+
+    _, json_commit = timed(lambda: commit_one(json_storage))
+    _, binary_commit = timed(lambda: commit_one(binary_storage))
+
+    print(f"{'format':<24}{'size (MB)':>12}{'save (s)':>12}{'load (s)':>12}")
+    for name, size, save_time, load_time in results:
+        print(f"{name:<24}{size / 2**20:>12.1f}{save_time:>12.2f}{load_time:>12.2f}")
+    print(f"hydrate one player: json {json_hydrate / len(sample) * 1e6:.0f} us, "
+          f"binary {binary_hydrate / len(sample) * 1e6:.0f} us")
+    print(f"commit one player: json {json_commit * 1e3:.1f} ms, "
+          f"binary {binary_commit * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""
+Compact binary snapshot format
+
+Values are written as a one-byte type tag followed by their payload. Integers
+are zigzag varints, and containers and strings are length-prefixed. Each
+encoded record starts with its own string table (dict keys, item names,
+descriptions, rarities, ...) and refers to strings by index, so the keys
+repeated on every inventory item cost a byte or two each. The field names
+every player record uses are preset in COMMON_STRINGS and never stored.
+Records share nothing else, so a string goes away with the last record that
+used it and records can be encoded on any thread.
+
+File layout:
+    MAGIC
+    varint journal_seq
+    varint schema_version (see migrations.py; absent in version 1 files)
+    varint player count, then per player:
+        varint user_id, varint length + record, varint length + summary
+    varint guild count, then per guild:
+        varint length + UTF-8 name, varint length + record
+    varint length + member map
+
+An encoded record is a varint string count, then per string a varint byte
+length + UTF-8 bytes, then the value. Index i refers to COMMON_STRINGS[i],
+and indexes past the end of COMMON_STRINGS to the record's own strings. Version 1 and 2 files kept a single
+table for the whole file after the header; they are converted on load.
+
+Records stay length-prefixed so a loader can slice them out of a single
+buffered read and decode each one only when it is needed.
+
+Commits between snapshots are appended to a log as change entries, see
+pack_changes(): a 4-byte length, a 4-byte CRC-32 of the body, then
+    varint journal_seq, varint schema_version
+    varint player count, then per player:
+        varint user_id, varint length + record (0 for a removed player)
+        and, for a stored player, varint length + summary
+    varint guild count, then per guild:
+        varint length + UTF-8 name, varint length + record (0 if removed)
+    one byte 1 and varint length + member map if it changed, else 0
+"""
+
+import struct
+import zlib
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+MAGIC = b"SFAB\x03"
+MAGIC_V2 = b"SFAB\x02"  # One string table for the whole file
+MAGIC_V1 = b"SFAB\x01"  # As version 2, no schema_version in the header
+
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_FLOAT = 4
+_STR = 5
+_LIST = 6
+_DICT = 7
+
+_DOUBLE = struct.Struct("<d")
+_ENTRY_HEADER = struct.Struct("<II")  # body length, CRC-32 of the body
+
+Buffer = Union[bytes, memoryview]
+
+# Keys of player, inventory and summary records. Part of the format: only
+# ever append, and only together with a new MAGIC.
+COMMON_STRINGS = (
+    "class_name", "class_level", "class_exp", "user_level", "user_exp",
+    "gold", "max_gold", "cursed_energy", "battle_energy", "max_battle_energy",
+    "energy_training", "unlocked_classes", "equipped_items",
+    "equipped_gathering_tools", "special_abilities", "active_effects",
+    "training_cooldowns", "skill_points", "allocated_stats", "skill_tree",
+    "skill_points_spent", "wins", "losses", "daily_streak", "dungeon_clears",
+    "technique_grade", "domain_expansion", "pvp_history", "pvp_wins",
+    "pvp_losses", "earned_roles", "level", "current_hp", "dungeon_damage",
+    "dungeons_completed", "bosses_defeated", "gold_earned", "gold_spent",
+    "training_completed", "advanced_training_completed",
+    "guild_contributions", "guild_dungeons", "class_changes", "daily_claims",
+    "quests_completed", "daily_quests", "weekly_quests", "long_term_quests",
+    "achievement_progress", "inventory", "achievements", "last_daily",
+    "last_train", "last_pvp_battle", "skill_cooldowns", "crafting_skills",
+    "materials", "level_stamp", "display_name", "item", "quantity",
+    "equipped", "item_id", "name", "description", "item_type", "rarity",
+    "stats", "level_req", "value", "weapon", "armor", "accessory", "power",
+    "defense", "speed", "hp", "energy",
+)
+_COMMON_INDEX = {s: i for i, s in enumerate(COMMON_STRINGS)}
+
+
+class StringTable:
+    """Strings interned while encoding one record, after COMMON_STRINGS"""
+
+    def __init__(self):
+        self.strings = list(COMMON_STRINGS)
+        self.index = dict(_COMMON_INDEX)
+
+    def ref(self, value: str) -> int:
+        i = self.index.get(value)
+        if i is None:
+            i = len(self.strings)
+            self.strings.append(value)
+            self.index[value] = i
+        return i
+
+
+def _write_varint(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_varint(buf: Buffer, pos: int) -> Tuple[int, int]:
+    n = 0
+    shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _encode(value: Any, table: StringTable, out: bytearray) -> None:
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        out.append(_STR)
+        _write_varint(out, table.ref(value))
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _encode(item, table, out)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            # Same key coercion as json.dumps
+            _write_varint(out, table.ref(key if isinstance(key, str) else str(key)))
+            _encode(item, table, out)
+    else:
+        raise TypeError(f"Cannot encode {type(value).__name__} in a snapshot")
+
+
+def _decode(buf: Buffer, pos: int, strings: List[str]) -> Tuple[Any, int]:
+    tag = buf[pos]
+    pos += 1
+
+    if tag == _STR:
+        i, pos = _read_varint(buf, pos)
+        return strings[i], pos
+    if tag == _INT:
+        z, pos = _read_varint(buf, pos)
+        return (z >> 1) if not z & 1 else -(z >> 1) - 1, pos
+    if tag == _DICT:
+        count, pos = _read_varint(buf, pos)
+        result = {}
+        for _ in range(count):
+            i, pos = _read_varint(buf, pos)
+            result[strings[i]], pos = _decode(buf, pos, strings)
+        return result, pos
+    if tag == _LIST:
+        count, pos = _read_varint(buf, pos)
+        result = []
+        for _ in range(count):
+            item, pos = _decode(buf, pos, strings)
+            result.append(item)
+        return result, pos
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(buf, pos)[0], pos + 8
+
+    raise ValueError(f"Corrupt snapshot: unknown tag {tag} at offset {pos - 1}")
+
+
+def _write_str(out: bytearray, value: str) -> None:
+    raw = value.encode("utf-8")
+    _write_varint(out, len(raw))
+    out += raw
+
+
+def _read_str(buf: Buffer, pos: int) -> Tuple[str, int]:
+    length, pos = _read_varint(buf, pos)
+    return str(buf[pos:pos + length], "utf-8"), pos + length
+
+
+def _read_strings(buf: Buffer, pos: int) -> Tuple[List[str], int]:
+    count, pos = _read_varint(buf, pos)
+    strings = []
+    for _ in range(count):
+        s, pos = _read_str(buf, pos)
+        strings.append(s)
+    return strings, pos
+
+
+def encode_value(value: Any) -> bytes:
+    """Encode value as a self-contained record (string table included)"""
+    table = StringTable()
+    body = bytearray()
+    _encode(value, table, body)
+
+    own = table.strings[len(COMMON_STRINGS):]
+    out = bytearray()
+    _write_varint(out, len(own))
+    for s in own:
+        _write_str(out, s)
+    out += body
+    return bytes(out)
+
+
+def decode_value(buf: Buffer) -> Any:
+    own, pos = _read_strings(buf, 0)
+    return _decode(buf, pos, [*COMMON_STRINGS, *own])[0]
+
+
+def pack_snapshot(players: Dict[int, Tuple[Buffer, Buffer]],
+                  guilds: Dict[str, Buffer], member_map: Buffer,
+                  journal_seq: int, schema_version: int) -> bytes:
+    """
+    Assemble a snapshot from already encoded records
+
+    players maps user_id to (record, summary), each made by encode_value().
+    """
+    out = bytearray(MAGIC)
+    _write_varint(out, journal_seq)
+    _write_varint(out, schema_version)
+
+    _write_varint(out, len(players))
+    for user_id, (record, summary) in players.items():
+        _write_varint(out, user_id)
+        _write_varint(out, len(record))
+        out += record
+        _write_varint(out, len(summary))
+        out += summary
+
+    _write_varint(out, len(guilds))
+    for name, record in guilds.items():
+        _write_str(out, name)
+        _write_varint(out, len(record))
+        out += record
+
+    _write_varint(out, len(member_map))
+    out += member_map
+
+    return bytes(out)
+
+
+def unpack_snapshot(data: bytes) -> Tuple[Dict[int, Tuple[Buffer, Buffer]],
+                                          Dict[str, Buffer], Buffer, int, int]:
+    """
+    Split a snapshot into its still-encoded records
+
+    Returns:
+        Tuple of (players, guilds, member_map, journal_seq, schema_version),
+        with players mapping user_id to (record, summary) slices of data
+    """
+    if not data.startswith((MAGIC, MAGIC_V2, MAGIC_V1)):
+        raise ValueError("Not a binary snapshot (bad magic)")
+
+    buf = memoryview(data)
+    pos = len(MAGIC)
+    journal_seq, pos = _read_varint(buf, pos)
+    if data.startswith(MAGIC_V1):
+        schema_version = 1
+    else:
+        schema_version, pos = _read_varint(buf, pos)
+
+    shared = None
+    if not data.startswith(MAGIC):
+        shared, pos = _read_strings(buf, pos)
+
+    def record_at(pos: int) -> Tuple[Buffer, int]:
+        length, pos = _read_varint(buf, pos)
+        record = buf[pos:pos + length]
+        if shared is not None:
+            # Re-encode against its own table, see the module docstring
+            record = encode_value(_decode(record, 0, shared)[0])
+        return record, pos + length
+
+    players = {}
+    count, pos = _read_varint(buf, pos)
+    for _ in range(count):
+        user_id, pos = _read_varint(buf, pos)
+        record, pos = record_at(pos)
+        summary, pos = record_at(pos)
+        players[user_id] = (record, summary)
+
+    guilds = {}
+    count, pos = _read_varint(buf, pos)
+    for _ in range(count):
+        if shared is None:
+            name, pos = _read_str(buf, pos)
+        else:
+            name_ref, pos = _read_varint(buf, pos)
+            name = shared[name_ref]
+        guilds[name], pos = record_at(pos)
+
+    member_map, pos = record_at(pos)
+
+    return players, guilds, member_map, journal_seq, schema_version
+
+
+# (players, guilds, member_map, journal_seq, schema_version) of one commit;
+# None marks a removed player or guild and an unchanged member map
+Changes = Tuple[Dict[int, Optional[Tuple[Buffer, Buffer]]],
+                Dict[str, Optional[Buffer]], Optional[Buffer], int, int]
+
+
+def pack_changes(players: Dict[int, Optional[Tuple[Buffer, Buffer]]],
+                 guilds: Dict[str, Optional[Buffer]],
+                 member_map: Optional[Buffer], journal_seq: int,
+                 schema_version: int) -> bytes:
+    """Frame one commit's changed records as a log entry"""
+    body = bytearray()
+    _write_varint(body, journal_seq)
+    _write_varint(body, schema_version)
+
+    _write_varint(body, len(players))
+    for user_id, stored in players.items():
+        _write_varint(body, user_id)
+        if stored is None:
+            _write_varint(body, 0)
+            continue
+        record, summary = stored
+        _write_varint(body, len(record))
+        body += record
+        _write_varint(body, len(summary))
+        body += summary
+
+    _write_varint(body, len(guilds))
+    for name, record in guilds.items():
+        _write_str(body, name)
+        if record is None:
+            _write_varint(body, 0)
+        else:
+            _write_varint(body, len(record))
+            body += record
+
+    if member_map is None:
+        body.append(0)
+    else:
+        body.append(1)
+        _write_varint(body, len(member_map))
+        body += member_map
+
+    return _ENTRY_HEADER.pack(len(body), zlib.crc32(body)) + bytes(body)
+
+
+def unpack_changes(data: bytes) -> Tuple[List[Changes], int]:
+    """
+    Split a change log into its entries, stopping at the first one that is
+    incomplete or fails its checksum (a commit cut short by a crash)
+
+    Returns:
+        Tuple of (entries in commit order, byte length of the intact prefix)
+    """
+    buf = memoryview(data)
+    entries = []
+    pos = 0
+    while pos + _ENTRY_HEADER.size <= len(data):
+        length, crc = _ENTRY_HEADER.unpack_from(buf, pos)
+        start = pos + _ENTRY_HEADER.size
+        body = buf[start:start + length]
+        if len(body) < length or zlib.crc32(body) != crc:
+            break
+
+        at = start
+        journal_seq, at = _read_varint(buf, at)
+        schema_version, at = _read_varint(buf, at)
+
+        players = {}
+        count, at = _read_varint(buf, at)
+        for _ in range(count):
+            user_id, at = _read_varint(buf, at)
+            length, at = _read_varint(buf, at)
+            if length == 0:
+                players[user_id] = None
+                continue
+            record = buf[at:at + length]
+            at += length
+            length, at = _read_varint(buf, at)
+            players[user_id] = (record, buf[at:at + length])
+            at += length
+
+        guilds = {}
+        count, at = _read_varint(buf, at)
+        for _ in range(count):
+            name, at = _read_str(buf, at)
+            length, at = _read_varint(buf, at)
+            guilds[name] = buf[at:at + length] if length else None
+            at += length
+
+        member_map = None
+        if buf[at]:
+            length, at = _read_varint(buf, at + 1)
+            member_map = buf[at:at + length]
+
+        entries.append((players, guilds, member_map, journal_seq,
+                        schema_version))
+        pos = start + len(body)
+
+    return entries, pos
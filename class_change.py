@@ -309,7 +309,7 @@ async def class_change_command(ctx, data_manager: DataManager):
     embed.add_field(
         name=f"Current Class: {player_data.class_name} ({class_data['role']})",
         value=f"**Level:** {player_data.class_level}\n"
-        f"**EXP:** {player_data.class_exp}/{int(100 * (player_data.class_level ** 1.5))}\n"
+        f"**EXP:** {player_data.class_exp}/{player_data.xp_to_next_level()}\n"
         f"**Active Ability:** {class_data['abilities']['active']}\n"
         f"**Passive Ability:** {class_data['abilities']['passive']}",
         inline=False)
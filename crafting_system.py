@@ -5,7 +5,8 @@ import time
 import asyncio
 from typing import Dict, List, Optional, Any, Union, Tuple
 from data_models import DataManager, PlayerData, Item, InventoryItem
-from materials import MATERIAL_CATEGORIES, MATERIAL_RARITIES
+from materials import MATERIAL_CATEGORIES, MATERIAL_RARITIES, rarity_rank, consume_materials
+from xp_curve import CRAFTING_CURVE
 
 # Crafting categories and patterns
 CRAFTING_CATEGORIES = {
@@ -604,21 +605,15 @@ class CraftingSkill:
         self.category = category
         self.level = level
         self.exp = exp
-        self.max_level = 1000
+        self.max_level = CRAFTING_CURVE.max_level
 
     def add_exp(self, amount: int) -> bool:
         """Add experience points and handle level ups. Returns True if leveled up."""
         old_level = self.level
         self.exp += amount
 
-        # Calculate exp needed for next level (scales with level)
-        while True:
-            exp_needed = int(100 * (self.level ** 1.5))
-            if self.exp >= exp_needed and self.level < self.max_level:
-                self.exp -= exp_needed
-                self.level += 1
-            else:
-                break
+        # Apply every level-up the exp pays for at once
+        self.level, self.exp = CRAFTING_CURVE.advance(self.level, self.exp)
 
         return self.level > old_level
 
@@ -1152,23 +1147,15 @@ class CraftingItemView(View):
             return
 
         # Check if player has enough materials
-        material_counts = {}
+        material_counts = self.player.material_totals()
         material_quality = 0.0
         total_materials = 0
 
-        # Count materials in inventory by category
-        for inv_item in self.player.inventory:
-            if "Material:" in inv_item.item.item_type:
-                category = inv_item.item.item_type.split(":")[1]
-                if category not in material_counts:
-                    material_counts[category] = 0
-                material_counts[category] += inv_item.quantity
-
-                # Calculate quality based on rarity
-                rarity = inv_item.item.rarity
-                rarity_value = list(MATERIAL_RARITIES.keys()).index(rarity) / (len(MATERIAL_RARITIES) - 1)
-                material_quality += rarity_value * inv_item.quantity
-                total_materials += inv_item.quantity
+        # Calculate quality based on rarity, one step per material stack
+        for (_, _, rarity), count in self.player.materials.items():
+            rarity_value = rarity_rank(rarity) / (len(MATERIAL_RARITIES) - 1)
+            material_quality += rarity_value * count
+            total_materials += count
 
         # Check if all required materials are available
         missing_materials = []
@@ -1244,25 +1231,9 @@ class CraftingItemView(View):
 
         # Generate and add the item if successful
         if is_success:
-            # Remove materials from inventory
+            # Remove materials, lower quality first (optimization for player)
             for category, count in required_materials.items():
-                remaining = count
-                # Start with lower quality materials first (optimization for player)
-                sorted_inv = sorted(
-                    [item for item in self.player.inventory if "Material:" + category == item.item.item_type],
-                    key=lambda x: list(MATERIAL_RARITIES.keys()).index(x.item.rarity)
-                )
-
-                for inv_item in sorted_inv:
-                    if remaining <= 0:
-                        break
-
-                    if inv_item.quantity <= remaining:
-                        remaining -= inv_item.quantity
-                        self.player.inventory.remove(inv_item)
-                    else:
-                        inv_item.quantity -= remaining
-                        remaining = 0
+                consume_materials(self.player, category, count)
 
             # Generate the crafted item
             crafted_item = generate_crafted_item(
@@ -1275,7 +1246,7 @@ class CraftingItemView(View):
             )
 
             # Add item to inventory
-            self.player.inventory.append(InventoryItem(crafted_item, quantity=1))
+            self.player.add_item(crafted_item)
 
             # Save player data
             self.data_manager.save_data()
@@ -1311,6 +1282,7 @@ class CraftingItemView(View):
             # Add crafting experience
             exp_gained = 10 * (self.selected_tier + 1) * (1 + (0.1 * self.selected_tier))
             level_up = crafting_skill.add_exp(int(exp_gained))
+            self.player.mark_changed()
 
             response_embed.add_field(
                 name="Crafting Experience",
@@ -1323,23 +1295,7 @@ class CraftingItemView(View):
             # Remove half the materials on failure (to create some risk)
             for category, count in required_materials.items():
                 wasted = max(1, count // 2)  # At least 1 material is wasted
-                remaining = wasted
-
-                sorted_inv = sorted(
-                    [item for item in self.player.inventory if "Material:" + category == item.item.item_type],
-                    key=lambda x: list(MATERIAL_RARITIES.keys()).index(x.item.rarity)
-                )
-
-                for inv_item in sorted_inv:
-                    if remaining <= 0:
-                        break
-
-                    if inv_item.quantity <= remaining:
-                        remaining -= inv_item.quantity
-                        self.player.inventory.remove(inv_item)
-                    else:
-                        inv_item.quantity -= remaining
-                        remaining = 0
+                consume_materials(self.player, category, wasted)
 
             # Save player data
             self.data_manager.save_data()
@@ -1356,6 +1312,7 @@ class CraftingItemView(View):
             # Add small amount of crafting experience even on failure
             exp_gained = 5 * (self.selected_tier + 1)
             level_up = crafting_skill.add_exp(int(exp_gained))
+            self.player.mark_changed()
 
             response_embed.add_field(
                 name="Crafting Experience",
@@ -1388,15 +1345,9 @@ class CraftingItemView(View):
 
         # Add required materials section
         materials_text = ""
-        player_materials = {}
 
-        # Count materials in inventory by category
-        for inv_item in self.player.inventory:
-            if "Material:" in inv_item.item.item_type:
-                category = inv_item.item.item_type.split(":")[1]
-                if category not in player_materials:
-                    player_materials[category] = 0
-                player_materials[category] += inv_item.quantity
+        # Count materials by category
+        player_materials = self.player.material_totals()
 
         # Create materials text with current/required counts
         for category, count in required_materials.items():
@@ -1581,7 +1532,7 @@ class CraftingEntryView(View):
         if self.player.crafting_skills:
             for skill in self.player.crafting_skills:
                 # Calculate exp needed for next level
-                exp_needed = int(100 * (skill.level ** 1.5))
+                exp_needed = CRAFTING_CURVE.exp_for_level(skill.level)
                 progress = min(1.0, skill.exp / exp_needed)
 
                 # Create progress bar
@@ -1734,14 +1685,9 @@ async def crafting_command(ctx, data_manager: DataManager):
         inline=True
     )
 
-    total_materials = 0
-    material_types = set()
-
-    # Count materials in inventory
-    for inv_item in player.inventory:
-        if "Material:" in inv_item.item.item_type:
-            total_materials += inv_item.quantity
-            material_types.add(inv_item.item.name)
+    total_materials = sum(player.materials.values())
+    # Each stack is one type and rarity, as separate items were before
+    material_types = player.materials
 
     embed.add_field(
         name="Your Materials",
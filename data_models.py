@@ -1,14 +1,38 @@
+import asyncio
+import concurrent.futures
 import json
 import os
 import datetime
-from typing import Dict, List, Optional, Any, Union
+import pickle
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import (Dict, List, Optional, Any, Union, Set, Iterator, Tuple,
+                    Iterable, Callable)
+
+from storage import open_storage, summarize_record, SUMMARY_FIELDS
+from journal import Journal
+from migrations import SCHEMA_VERSION, migrate_player
+from xp_curve import PLAYER_CURVE
+from ranking import Leaderboards, RANKED_FIELDS
+from population import PopulationStore, POPULATION_FIELDS
+
+
+# Item attributes besides item_id, as stored in a full item record
+ITEM_FIELDS = ("name", "description", "item_type", "rarity", "stats",
+               "level_req", "value")
 
 
 class Item:
 
+    __slots__ = ("item_id", "name", "description", "item_type", "rarity",
+                 "stats", "level_req", "value", "template")
+
     def __init__(self, item_id: str, name: str, description: str,
                  item_type: str, rarity: str, stats: Dict[str, int],
-                 level_req: int, value: int):
+                 level_req: int, value: int,
+                 template: Optional['Item'] = None):
         self.item_id = item_id
         self.name = name
         self.description = description
@@ -17,8 +41,20 @@ class Item:
         self.stats = stats  # power, defense, speed, hp etc.
         self.level_req = level_req
         self.value = value
+        self.template = template  # Catalog entry, see item_catalog.py
 
     def to_dict(self) -> Dict[str, Any]:
+        template = self.template
+        if template is not None:
+            # Catalog item - the key plus whatever differs from the entry
+            record = {"item_id": self.item_id, "key": template.item_id}
+            for field in ITEM_FIELDS:
+                value = getattr(self, field)
+                if value is not getattr(template, field) and value != getattr(
+                        template, field):
+                    record[field] = dict(value) if field == "stats" else value
+            return record
+
         return {
             "item_id": self.item_id,
             "name": self.name,
@@ -32,6 +68,16 @@ class Item:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Item':
+        if "key" in data:
+            # Imported here because the catalog is built from the shop modules
+            from item_catalog import create_item
+            overrides = {
+                field: value
+                for field, value in data.items()
+                if field != "item_id" and field != "key"
+            }
+            return create_item(data["key"], data["item_id"], **overrides)
+
         return cls(item_id=data["item_id"],
                    name=data["name"],
                    description=data["description"],
@@ -44,6 +90,8 @@ class Item:
 
 class InventoryItem:
 
+    __slots__ = ("item", "quantity", "equipped")
+
     def __init__(self, item: Item, quantity: int = 1, equipped: bool = False):
         self.item = item
         self.quantity = quantity
@@ -63,6 +111,185 @@ class InventoryItem:
                    equipped=data["equipped"])
 
 
+class Inventory:
+    """
+    A player's inventory entries, in the order they were added
+
+    Iterates, indexes and takes len() like the list it replaced. It also
+    indexes entries by item_id, name, item_type and rarity and maps each
+    equipment slot (an item_type) to the entry equipped there, so lookups do
+    not scan the inventory. Collection counts (distinct names, distinct names
+    per type, entries per rarity) are kept up to date the same way.
+
+    The indexes only follow changes made through this class: add and remove
+    entries with PlayerData.add_item/remove_item (or append/remove) and equip
+    them with PlayerData.equip_item/unequip_item, never by setting
+    InventoryItem.equipped directly. Item names, types and rarities must not
+    change while the item is in an inventory.
+    """
+
+    __slots__ = ("_entries", "_by_id", "_by_name", "_by_type", "_by_rarity",
+                 "_slots", "_type_names")
+
+    def __init__(self, entries: Iterable[InventoryItem] = ()):
+        self._entries: Dict[int, InventoryItem] = {}  # id() -> entry, in order
+        # Each index maps a key to its entries in order. Buckets are lists
+        # rather than dicts: removing from one scans only that bucket, and a
+        # dict per bucket would cost several hundred bytes per player
+        self._by_id: Dict[str, List[InventoryItem]] = {}
+        self._by_name: Dict[str, List[InventoryItem]] = {}
+        self._by_type: Dict[str, List[InventoryItem]] = {}
+        self._by_rarity: Dict[str, List[InventoryItem]] = {}
+        self._slots: Dict[str, InventoryItem] = {}
+        # item_type -> number of distinct item names of that type
+        self._type_names: Dict[str, int] = {}
+        for inv_item in entries:
+            self.append(inv_item)
+
+    def __iter__(self) -> Iterator[InventoryItem]:
+        # Iterate over a copy so callers may remove entries as they go
+        return iter(list(self._entries.values()))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        return list(self._entries.values())[index]
+
+    def __contains__(self, inv_item: Any) -> bool:
+        return self._entries.get(id(inv_item)) is inv_item
+
+    @staticmethod
+    def _link(index: Dict[str, List[InventoryItem]], key: str,
+              inv_item: InventoryItem) -> None:
+        bucket = index.get(key)
+        if bucket is None:
+            index[key] = [inv_item]
+        else:
+            bucket.append(inv_item)
+
+    @staticmethod
+    def _unlink(index: Dict[str, List[InventoryItem]], key: str,
+                inv_item: InventoryItem) -> None:
+        bucket = index[key]
+        if len(bucket) == 1:
+            del index[key]
+        else:
+            # InventoryItem compares by identity
+            bucket.remove(inv_item)
+
+    def _has_type_name(self, name: str, item_type: str) -> bool:
+        # Name buckets hold a handful of entries at most
+        return any(entry.item.item_type == item_type
+                   for entry in self._by_name.get(name, ()))
+
+    def append(self, inv_item: InventoryItem) -> None:
+        item = inv_item.item
+        if not self._has_type_name(item.name, item.item_type):
+            self._type_names[item.item_type] = self._type_names.get(
+                item.item_type, 0) + 1
+        self._entries[id(inv_item)] = inv_item
+        self._link(self._by_id, item.item_id, inv_item)
+        self._link(self._by_name, item.name, inv_item)
+        self._link(self._by_type, item.item_type, inv_item)
+        self._link(self._by_rarity, item.rarity, inv_item)
+
+        if inv_item.equipped:
+            if item.item_type in self._slots:
+                # A slot holds one item; older records could hold more
+                inv_item.equipped = False
+            else:
+                self._slots[item.item_type] = inv_item
+
+    def remove(self, inv_item: InventoryItem) -> None:
+        """Remove an entry. Raises ValueError if it is not in the inventory."""
+        if inv_item not in self:
+            raise ValueError("entry is not in the inventory")
+
+        item = inv_item.item
+        del self._entries[id(inv_item)]
+        self._unlink(self._by_id, item.item_id, inv_item)
+        self._unlink(self._by_name, item.name, inv_item)
+        self._unlink(self._by_type, item.item_type, inv_item)
+        self._unlink(self._by_rarity, item.rarity, inv_item)
+        if self._slots.get(item.item_type) is inv_item:
+            del self._slots[item.item_type]
+        if not self._has_type_name(item.name, item.item_type):
+            count = self._type_names[item.item_type] - 1
+            if count:
+                self._type_names[item.item_type] = count
+            else:
+                del self._type_names[item.item_type]
+
+    def get(self, item_id: str) -> Optional[InventoryItem]:
+        """The first entry holding the item with this id, if any"""
+        bucket = self._by_id.get(item_id)
+        return bucket[0] if bucket else None
+
+    def find(self, name: str) -> Optional[InventoryItem]:
+        """The first entry holding an item with this name, if any"""
+        bucket = self._by_name.get(name)
+        return bucket[0] if bucket else None
+
+    def by_name(self, name: str) -> List[InventoryItem]:
+        return list(self._by_name.get(name, ()))
+
+    def by_type(self, item_type: str) -> List[InventoryItem]:
+        return list(self._by_type.get(item_type, ()))
+
+    def by_rarity(self, rarity: str) -> List[InventoryItem]:
+        return list(self._by_rarity.get(rarity, ()))
+
+    def names(self) -> Set[str]:
+        """Names of every item in the inventory"""
+        return set(self._by_name)
+
+    def has_name(self, name: str) -> bool:
+        return name in self._by_name
+
+    def distinct_names(self) -> int:
+        """Number of different item names in the inventory"""
+        return len(self._by_name)
+
+    def distinct_names_of_type(self, item_type: str) -> int:
+        """Number of different item names among entries of item_type"""
+        return self._type_names.get(item_type, 0)
+
+    def rarity_count(self, rarity: str) -> int:
+        """Number of entries of a rarity"""
+        return len(self._by_rarity.get(rarity, ()))
+
+    def equipped(self) -> List[InventoryItem]:
+        """Every equipped entry"""
+        return list(self._slots.values())
+
+    def equipped_in(self, slot: str) -> Optional[InventoryItem]:
+        return self._slots.get(slot)
+
+    def equip(self, inv_item: InventoryItem) -> Optional[InventoryItem]:
+        """
+        Equip an entry in the slot named by its item_type
+
+        Returns:
+            The entry that was unequipped to make room, if any
+        """
+        slot = inv_item.item.item_type
+        previous = self._slots.get(slot)
+        if previous is inv_item:
+            return None
+        if previous is not None:
+            previous.equipped = False
+        inv_item.equipped = True
+        self._slots[slot] = inv_item
+        return previous
+
+    def unequip(self, inv_item: InventoryItem) -> None:
+        inv_item.equipped = False
+        slot = inv_item.item.item_type
+        if self._slots.get(slot) is inv_item:
+            del self._slots[slot]
+
+
 class Skill:
 
     def __init__(self, skill_id: str, name: str, description: str,
@@ -179,9 +406,83 @@ class Achievement:
                    completed_at=completed_at)
 
 
+class DerivedStats:
+    """
+    Stats derived from a player's other fields, cached on the player until
+    PlayerData.invalidate_stats() drops them
+    """
+
+    __slots__ = ("class_data", "stats", "effect_boosts")
+
+    def __init__(self):
+        self.class_data = None  # The class table stats was computed with
+        self.stats: Optional[Dict[str, int]] = None
+        self.effect_boosts: Optional[Dict[str, int]] = None
+
+
+# Fields the leaderboards and the population store index, see
+# DataManager.indexed_field_changed()
+INDEXED_FIELDS = RANKED_FIELDS | POPULATION_FIELDS
+
+# PlayerData fields the derived stats are computed from; assigning one drops
+# the cached values, changing one in place needs invalidate_stats()
+STAT_FIELDS = frozenset(("class_name", "allocated_stats", "inventory",
+                         "active_effects", "skill_tree"))
+
+# PlayerData fields QuestManager indexes by quest type; assigning one drops
+# the index, see QuestManager.active_quests()
+QUEST_FIELDS = frozenset(("daily_quests", "weekly_quests", "long_term_quests"))
+
+
+def _tenths_total(level: int) -> int:
+    """Sum of n // 10 for n from 1 to level"""
+    blocks, rest = divmod(level + 1, 10)
+    return 10 * blocks * (blocks - 1) // 2 + rest * blocks
+
+
+def _load_crafting_skills(records: List[Dict[str, Any]]) -> List[Any]:
+    if not records:
+        return []
+    # Imported here because crafting_system imports this module
+    from crafting_system import CraftingSkill
+    return [CraftingSkill.from_dict(record) for record in records]
+
+
 class PlayerData:
 
+    # Slots instead of a per-instance __dict__; see bench_memory.py
+    __slots__ = (
+        "_owner", "user_id", "class_name", "class_level", "class_exp",
+        "user_level", "user_exp", "gold", "max_gold", "cursed_energy",
+        "battle_energy", "max_battle_energy", "energy_training",
+        "unlocked_classes", "inventory", "equipped_items",
+        "equipped_gathering_tools", "achievements", "special_abilities",
+        "active_effects", "training_cooldowns", "skill_points",
+        "allocated_stats", "skill_tree", "skill_points_spent", "wins",
+        "losses", "last_daily", "daily_streak", "last_train",
+        "dungeon_clears", "skill_cooldowns", "technique_grade",
+        "domain_expansion", "pvp_history", "pvp_wins", "pvp_losses",
+        "last_pvp_battle", "earned_roles", "level", "current_hp",
+        "dungeon_damage", "dungeons_completed", "bosses_defeated",
+        "gold_earned", "gold_spent", "training_completed",
+        "advanced_training_completed", "guild_contributions",
+        "guild_dungeons", "class_changes", "daily_claims",
+        "quests_completed", "daily_quests", "weekly_quests",
+        "long_term_quests", "achievement_progress", "crafting_skills",
+        "materials", "level_stamp", "display_name",
+        # Set on demand by advanced training rewards and never saved
+        "effects",
+        # DerivedStats cache, never saved
+        "_derived",
+        # QuestManager's index of active quests by type, never saved
+        "_quest_index",
+        # Lets DataManager find an evicted player that is still referenced
+        "__weakref__")
+
     def __init__(self, user_id: int):
+        object.__setattr__(self, "_owner", None)
+        object.__setattr__(self, "_derived", None)
+        object.__setattr__(self, "_quest_index", None)
         self.user_id = user_id
         self.class_name = None
         self.class_level = 1
@@ -195,21 +496,13 @@ class PlayerData:
         self.max_battle_energy = 100  # Base max battle resource
         self.energy_training = 0  # Additional energy from specialized training
         self.unlocked_classes = []
-        self.inventory = []  # List[InventoryItem]
+        self.inventory = Inventory()
         self.equipped_items = {
             "weapon": None,
             "armor": None,
             "accessory": None
         }
-        # Gathering tools equipment slots
-        self.equipped_gathering_tools = {
-            "Mining": None,
-            "Foraging": None,
-            "Herbs": None,
-            "Hunting": None,
-            "Magical": None
-        }
-        self.achievements = []  # List[Achievement]
+        self.achievements = set()  # Set[str] of earned achievement ids
         self.special_abilities = {}  # Dict[str, Dict[str, Any]]
         self.active_effects = {}  # Dict[str, Dict[str, Any]]
         self.training_cooldowns = {
@@ -252,13 +545,38 @@ class PlayerData:
         self.class_changes = 0
         self.daily_claims = 0
         self.quests_completed = 0
-        # Quest tracking
-        self.daily_quests = {}
-        self.weekly_quests = {}
-        self.long_term_quests = []
+        # Quest progress, see QuestManager. Daily and weekly quests are
+        # rebuilt from the period key and the progress vector stored under it
+        self.daily_quests = {}  # Dict[str, List[int]]
+        self.weekly_quests = {}  # Dict[str, List[int]]
+        self.long_term_quests = {}  # Dict[str, int] (quest_id: progress)
         self.achievement_progress = {}
+        self.crafting_skills = []  # List[CraftingSkill]
+        # Gathered materials as counted stacks, see add_material()
+        self.materials = {}  # Dict[(category, type, rarity), int]
+        # Level and exp as last checked by level_validation, see level_stamp()
+        self.level_stamp = None
+        # Last known Discord display name, see name_resolver.py
+        self.display_name = None
         self.last_pvp_battle = None  # Timestamp of last PvP battle
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name in STAT_FIELDS:
+            object.__setattr__(self, "_derived", None)
+        elif name in QUEST_FIELDS:
+            object.__setattr__(self, "_quest_index", None)
+        # Report the change to the owning DataManager so the next save
+        # re-serializes this player
+        if self._owner is not None:
+            self._owner.player_changed(self)
+            if name in INDEXED_FIELDS:
+                self._owner.indexed_field_changed(self, name)
+            watchers = self._owner.field_watchers.get(name)
+            if watchers:
+                for watcher in watchers:
+                    watcher(self, name, value)
+
     def get_max_battle_energy(self) -> int:
         """
         Calculate the player's maximum battle energy based on level and training.
@@ -342,8 +660,45 @@ class PlayerData:
             # Fully restore HP
             self.current_hp = self.get_max_hp(class_data)
 
+    def invalidate_stats(self) -> None:
+        """
+        Drop the cached get_stats() and get_effect_boosts() results
+
+        Needed after changing allocated_stats, active_effects, skill_tree or
+        an equipped item in place; PlayerData's own methods (equip_item,
+        remove_item...) and assigning those fields call it already. Also
+        reports the change, see mark_changed().
+        """
+        object.__setattr__(self, "_derived", None)
+        self.mark_changed()
+
+    def mark_changed(self) -> None:
+        """
+        Report a change made in place (inside a list, dict or nested object)
+        that no attribute assignment saw, so the next save writes this player
+        """
+        if self._owner is not None:
+            self._owner.player_changed(self)
+
+    def _derived_stats(self) -> DerivedStats:
+        derived = self._derived
+        if derived is None:
+            derived = DerivedStats()
+            object.__setattr__(self, "_derived", derived)
+        return derived
+
     def get_stats(self, class_data: Dict[str, Any]) -> Dict[str, int]:
-        """Calculate total stats based on base class stats, allocated points and equipped items"""
+        """
+        Total stats based on base class stats, allocated points and equipped
+        items. Cached until invalidate_stats(); the caller gets its own copy.
+        """
+        derived = self._derived_stats()
+        if derived.stats is None or derived.class_data is not class_data:
+            derived.stats = self._compute_stats(class_data)
+            derived.class_data = class_data
+        return dict(derived.stats)
+
+    def _compute_stats(self, class_data: Dict[str, Any]) -> Dict[str, int]:
         if not self.class_name or self.class_name not in class_data:
             # Return default stats if no class chosen or class not found
             base_stats = {"power": 10, "defense": 10, "speed": 10, "hp": 100}
@@ -357,14 +712,37 @@ class PlayerData:
                 base_stats[stat] += points
 
         # Add stats from equipped items
-        for inv_item in self.inventory:
-            if inv_item.equipped and hasattr(inv_item.item, 'stats'):
+        for inv_item in self.inventory.equipped():
+            if hasattr(inv_item.item, 'stats'):
                 for stat, value in inv_item.item.stats.items():
                     if stat in base_stats:
                         base_stats[stat] += value
 
         return base_stats
 
+    def get_effect_boosts(self) -> Dict[str, int]:
+        """
+        Flat stat boosts granted in battle by active special item effects.
+        Cached until invalidate_stats(); do not modify the result.
+        """
+        derived = self._derived_stats()
+        if derived.effect_boosts is None:
+            boosts = {}
+            for effect_data in self.active_effects.values():
+                # Dungeon buffs are stored as a bare percentage, not an effect
+                if not isinstance(effect_data, dict):
+                    continue
+
+                effect = effect_data.get("effect")
+                boost_amount = effect_data.get("boost_amount", 0)
+                if effect == "hp_boost":
+                    boosts["hp"] = boosts.get("hp", 0) + boost_amount
+                elif effect == "all_stats_boost":
+                    for stat in ("power", "defense", "speed", "hp"):
+                        boosts[stat] = boosts.get(stat, 0) + boost_amount
+            derived.effect_boosts = boosts
+        return derived.effect_boosts
+
     def add_gold(self, amount: int) -> int:
         """Add gold with no maximum limit. Returns the amount added."""
         if amount <= 0:
@@ -374,6 +752,7 @@ class PlayerData:
         self.gold += amount
         # Track for achievements
         self.gold_earned += amount
+        self._journal("gold", d=amount)
         return amount
 
     def remove_gold(self, amount: int) -> bool:
@@ -385,9 +764,127 @@ class PlayerData:
             self.gold -= amount
             # Track for achievements
             self.gold_spent += amount
+            self._journal("gold", d=-amount)
             return True
         return False
 
+    def add_item(self, item: Item, quantity: int = 1,
+                 stack: bool = False) -> InventoryItem:
+        """
+        Add an item to the inventory. Returns the inventory entry it went into.
+
+        With stack=True the quantity is added to an existing entry with the
+        same name, if there is one.
+        """
+        self._journal("item_add", item=item.to_dict(), q=quantity, stack=stack)
+
+        if stack:
+            inv_item = self.inventory.find(item.name)
+            if inv_item is not None:
+                inv_item.quantity += quantity
+                return inv_item
+
+        inv_item = InventoryItem(item=item, quantity=quantity, equipped=False)
+        self.inventory.append(inv_item)
+        if self._owner is not None:
+            self._owner.item_added(self.user_id, item.item_id)
+        return inv_item
+
+    def remove_item(self, inv_item: InventoryItem,
+                    quantity: Optional[int] = None) -> None:
+        """
+        Remove quantity of an inventory entry, dropping the entry once it is
+        used up. With no quantity the whole entry is removed.
+        """
+        self._journal("item_remove", id=inv_item.item.item_id, q=quantity)
+
+        if quantity is not None and inv_item.quantity > quantity:
+            inv_item.quantity -= quantity
+        else:
+            self.inventory.remove(inv_item)
+            if inv_item.equipped:
+                self.unequip_item(inv_item)
+            item_id = inv_item.item.item_id
+            if self._owner is not None and self.inventory.get(item_id) is None:
+                self._owner.item_removed(self.user_id, item_id)
+
+    def equip_item(self, inv_item: InventoryItem) -> Optional[InventoryItem]:
+        """
+        Equip an inventory entry in the slot named by its item type
+
+        Returns:
+            The entry that was unequipped to make room, if any
+        """
+        previous = self.inventory.equip(inv_item)
+        self.equipped_items[inv_item.item.item_type] = inv_item.item.item_id
+        self.invalidate_stats()
+        return previous
+
+    def unequip_item(self, inv_item: InventoryItem) -> None:
+        self.inventory.unequip(inv_item)
+        self.invalidate_stats()
+        slot = inv_item.item.item_type
+        if self.equipped_items.get(slot) == inv_item.item.item_id:
+            self.equipped_items[slot] = None
+
+    def add_material(self, category: str, material_type: str, rarity: str,
+                     quantity: int = 1) -> int:
+        """Add to a material stack. Returns the new stack size."""
+        self._journal("material_add", m=[category, material_type, rarity],
+                      q=quantity)
+
+        key = (category, material_type, rarity)
+        count = self.materials.get(key, 0) + quantity
+        self.materials[key] = count
+        return count
+
+    def remove_material(self, category: str, material_type: str, rarity: str,
+                        quantity: int = 1) -> bool:
+        """
+        Take quantity from a material stack, dropping the stack once empty
+
+        Returns:
+            False (and changes nothing) if the stack is too small
+        """
+        key = (category, material_type, rarity)
+        count = self.materials.get(key, 0)
+        if count < quantity:
+            return False
+
+        self._journal("material_remove", m=[category, material_type, rarity],
+                      q=quantity)
+        if count == quantity:
+            del self.materials[key]
+        else:
+            self.materials[key] = count - quantity
+        return True
+
+    def unique_item_count(self) -> int:
+        """Number of different items collected, materials included"""
+        # Every material stack is a different "<rarity> <type>" name
+        return self.inventory.distinct_names() + len(self.materials)
+
+    def material_totals(self) -> Dict[str, int]:
+        """Total material count per category"""
+        totals = {}
+        for (category, _, _), count in self.materials.items():
+            totals[category] = totals.get(category, 0) + count
+        return totals
+
+    def _journal(self, op: str, **fields: Any) -> None:
+        """Record a mutation in the owning DataManager's journal"""
+        if self._owner is not None:
+            self._owner.journal_op(op, u=self.user_id, **fields)
+
+    def pin(self) -> None:
+        """Keep this player in the DataManager cache until unpin() is called"""
+        if self._owner is not None:
+            self._owner.pin_player(self.user_id)
+
+    def unpin(self) -> None:
+        if self._owner is not None:
+            self._owner.unpin_player(self.user_id)
+
     # Legacy method for backward compatibility
     def add_cursed_energy(self, amount: int) -> int:
         """Legacy method that calls add_gold"""
@@ -413,10 +910,7 @@ class PlayerData:
         Calculate XP needed to level up from a specific level
         This is the canonical XP formula that should be used throughout the game
         """
-        # Updated to match the easier progression formula in level_validation.py
-        base_xp = 75  # Reduced from 100 to make progression easier
-        level_exponent = 1.35  # Reduced from 1.5 to flatten the curve for high levels
-        return int(base_xp * (level**level_exponent))
+        return PLAYER_CURVE.exp_for_level(level)
 
     def xp_to_next_level(self) -> int:
         """Calculate XP needed for the next level."""
@@ -455,39 +949,33 @@ class PlayerData:
             adjusted_exp = int(exp_amount * level_penalty)
 
         self.class_exp += adjusted_exp
-
-        # Calculate the required XP for the current level
-        MAX_LEVEL = 1000  # Maximum level cap
-        leveled_up = False
-
-        if self.class_level >= MAX_LEVEL:
+        self._journal("exp", a=adjusted_exp)
+
+        # Apply every level-up the XP pays for at once (capped at
+        # PLAYER_CURVE.max_level)
+        old_level = self.class_level
+        new_level, self.class_exp = PLAYER_CURVE.advance(old_level,
+                                                         self.class_exp)
+        levels = new_level - old_level
+        if levels <= 0:
             return False
-
-        # Calculate XP needed for next level using the standard formula
-        xp_needed = self.calculate_xp_for_level(self.class_level)
-
-        # Level up while player has enough XP
-        while self.class_exp >= xp_needed and self.class_level < MAX_LEVEL:
-            self.class_exp -= xp_needed
-            self.class_level += 1
-            leveled_up = True
-
-            # Increase rewards at level-up
-            self.skill_points += 3
-            self.max_gold += 200
-            self.gold = min(self.gold + 150, self.max_gold)
-
-            # Increase max battle energy on level up
-            battle_energy_increase = 5 + (self.class_level // 10)
-            self.max_battle_energy += battle_energy_increase
-            # Refill battle energy on level up
-            self.battle_energy = self.max_battle_energy
-
-            # Set a flag to check achievements after the whole leveling process
-
-            # Calculate XP needed for the next level if not at max level
-            if self.class_level < MAX_LEVEL:
-                xp_needed = self.calculate_xp_for_level(self.class_level)
+        self.class_level = new_level
+        leveled_up = True
+
+        # Rewards for every level gained, as if granted one level at a time
+        self.skill_points += 3 * levels
+        # Gold grows by 150 per level; only the first level can be capped
+        # since max_gold grows faster
+        self.max_gold += 200
+        self.gold = min(self.gold + 150, self.max_gold)
+        self.max_gold += 200 * (levels - 1)
+        self.gold += 150 * (levels - 1)
+
+        # Max battle energy grows by 5 + level // 10 for each new level,
+        # then battle energy refills
+        self.max_battle_energy += 5 * levels + (_tenths_total(new_level) -
+                                                _tenths_total(old_level))
+        self.battle_energy = self.max_battle_energy
 
         # The leveled_up flag will be returned
         # When handling this in the calling code, make sure to check achievements
@@ -513,16 +1001,25 @@ class PlayerData:
             "max_gold":
             self.max_gold,
             "cursed_energy":
-            self.cursed_energy,  # Store actual cursed energy
-            "max_cursed_energy":
-            self.max_gold,  # For backward compatibility
+            self.cursed_energy,
+            "battle_energy":
+            self.battle_energy,
+            "max_battle_energy":
+            self.max_battle_energy,
+            "energy_training":
+            self.energy_training,
             "unlocked_classes":
             self.unlocked_classes,
-            "inventory": [item.to_dict() for item in self.inventory],
             "equipped_items":
             self.equipped_items,
-            "achievements":
-            [achievement.to_dict() for achievement in self.achievements],
+            "equipped_gathering_tools":
+            self.equipped_gathering_tools,
+            "special_abilities":
+            self.special_abilities,
+            "active_effects":
+            self.active_effects,
+            "training_cooldowns":
+            self.training_cooldowns,
             "skill_points":
             self.skill_points,
             "allocated_stats":
@@ -535,28 +1032,10 @@ class PlayerData:
             self.wins,
             "losses":
             self.losses,
-            "last_daily":
-            self.last_daily.isoformat() if self.last_daily else None,
             "daily_streak":
             self.daily_streak,
-            "last_train":
-            self.last_train.isoformat() if self.last_train else None,
             "dungeon_clears":
             self.dungeon_clears,
-            "skill_cooldowns": {
-                k: v.isoformat()
-                for k, v in self.skill_cooldowns.items()
-            } if self.skill_cooldowns else {},
-            "special_abilities":
-            self.special_abilities,
-            "active_effects":
-            self.active_effects,
-            "training_cooldowns":
-            self.training_cooldowns,
-            "battle_energy":
-            self.battle_energy,
-            "max_battle_energy":
-            self.max_battle_energy,
             "technique_grade":
             self.technique_grade,
             "domain_expansion":
@@ -567,181 +1046,994 @@ class PlayerData:
             self.pvp_wins,
             "pvp_losses":
             self.pvp_losses,
+            "earned_roles":
+            self.earned_roles,
+            "level":
+            self.level,
+            "current_hp":
+            self.current_hp,
+            "dungeon_damage":
+            self.dungeon_damage,
+            "dungeons_completed":
+            self.dungeons_completed,
+            "bosses_defeated":
+            self.bosses_defeated,
+            "gold_earned":
+            self.gold_earned,
+            "gold_spent":
+            self.gold_spent,
+            "training_completed":
+            self.training_completed,
+            "advanced_training_completed":
+            self.advanced_training_completed,
+            "guild_contributions":
+            self.guild_contributions,
+            "guild_dungeons":
+            self.guild_dungeons,
+            "class_changes":
+            self.class_changes,
+            "daily_claims":
+            self.daily_claims,
+            "quests_completed":
+            self.quests_completed,
+            "daily_quests":
+            self.daily_quests,
+            "weekly_quests":
+            self.weekly_quests,
+            "long_term_quests":
+            self.long_term_quests,
+            "achievement_progress":
+            self.achievement_progress,
+            "inventory":
+            [item.to_dict() for item in self.inventory],
+            "achievements":
+            sorted(self.achievements),
+            "last_daily":
+            self.last_daily.isoformat() if self.last_daily else None,
+            "last_train":
+            self.last_train.isoformat() if self.last_train else None,
             "last_pvp_battle":
             self.last_pvp_battle.isoformat() if self.last_pvp_battle else None,
-            "equipped_gathering_tools":
-            self.equipped_gathering_tools
+            "skill_cooldowns": {
+                k: v.isoformat()
+                for k, v in self.skill_cooldowns.items()
+            },
+            "crafting_skills":
+            [skill.to_dict() for skill in self.crafting_skills],
+            "materials": [[category, material_type, rarity, count]
+                          for (category, material_type, rarity), count
+                          in self.materials.items()],
+            "level_stamp": self.level_stamp,
+            "display_name": self.display_name
         }
 
     @classmethod
     def from_dict(cls, user_id: int, data: Dict[str, Any]) -> 'PlayerData':
-        player = cls(user_id)
-
-        # Handle currency conversion (from cursed_energy to gold)
-        if "gold" in data:
-            player.gold = data["gold"]
-        elif "cursed_energy" in data:
-            # Convert old cursed_energy to gold
-            player.gold = data["cursed_energy"]
-
-        # Load actual cursed energy (used for special abilities)
-        if "cursed_energy" in data:
-            player.cursed_energy = data["cursed_energy"]
-
-        # Handle maximum currency
-        if "max_gold" in data:
-            player.max_gold = data["max_gold"]
-        elif "max_cursed_energy" in data:
-            # Convert old max_cursed_energy to max_gold
-            player.max_gold = data["max_cursed_energy"]
-
-        # Set simple attributes
-        for attr in [
-                "class_name",
-                "class_level",
-                "class_exp",
-                "user_level",
-                "user_exp",
-                "battle_energy",
-                "max_battle_energy",
-                "technique_grade",
-                "domain_expansion",
-                "unlocked_classes",
-                "equipped_items",
-                "skill_points",
-                "allocated_stats",
-                "skill_tree",
-                "skill_points_spent",
-                "wins",
-                "losses",
-                "daily_streak",
-                "dungeon_clears",
-                "special_abilities",
-                "active_effects",
-                "training_cooldowns",
-                "pvp_history",
-                "pvp_wins",
-                "pvp_losses",
-                "energy_training",
-                "equipped_gathering_tools"  # Make sure we load equipped tools
-        ]:
-            if attr in data:
-                setattr(player, attr, data[attr])
-
-        # Convert inventory
-        if "inventory" in data:
-            player.inventory = [
-                InventoryItem.from_dict(item_data)
-                for item_data in data["inventory"]
-            ]
-
-        # Convert achievements
-        if "achievements" in data:
-            player.achievements = [
-                Achievement.from_dict(achievement_data)
-                for achievement_data in data["achievements"]
-            ]
-
-        # Convert datetime objects
-        for dt_attr in ["last_daily", "last_train", "last_pvp_battle"]:
-            if dt_attr in data and data[dt_attr]:
-                try:
-                    setattr(player, dt_attr,
-                            datetime.datetime.fromisoformat(data[dt_attr]))
-                except (ValueError, TypeError):
-                    setattr(player, dt_attr, None)
-
-        # Convert skill cooldowns
-        if "skill_cooldowns" in data:
-            player.skill_cooldowns = {}
-            for skill_id, timestamp in data["skill_cooldowns"].items():
-                try:
-                    player.skill_cooldowns[
-                        skill_id] = datetime.datetime.fromisoformat(timestamp)
-                except (ValueError, TypeError):
-                    continue
+        """Build a player from a record at the current SCHEMA_VERSION
 
+        Older records are upgraded once by migrations.migrate_player() when
+        their snapshot is opened, so every field is present here.
+        """
+        fromisoformat = datetime.datetime.fromisoformat
+        player = cls.__new__(cls)
+        object.__setattr__(player, "_owner", None)
+        object.__setattr__(player, "_derived", None)
+        object.__setattr__(player, "_quest_index", None)
+        player.user_id = user_id
+        player.class_name = data["class_name"]
+        player.class_level = data["class_level"]
+        player.class_exp = data["class_exp"]
+        player.user_level = data["user_level"]
+        player.user_exp = data["user_exp"]
+        player.gold = data["gold"]
+        player.max_gold = data["max_gold"]
+        player.cursed_energy = data["cursed_energy"]
+        player.battle_energy = data["battle_energy"]
+        player.max_battle_energy = data["max_battle_energy"]
+        player.energy_training = data["energy_training"]
+        player.unlocked_classes = data["unlocked_classes"]
+        player.equipped_items = data["equipped_items"]
+        player.equipped_gathering_tools = data["equipped_gathering_tools"]
+        player.special_abilities = data["special_abilities"]
+        player.active_effects = data["active_effects"]
+        player.training_cooldowns = data["training_cooldowns"]
+        player.skill_points = data["skill_points"]
+        player.allocated_stats = data["allocated_stats"]
+        player.skill_tree = data["skill_tree"]
+        player.skill_points_spent = data["skill_points_spent"]
+        player.wins = data["wins"]
+        player.losses = data["losses"]
+        player.daily_streak = data["daily_streak"]
+        player.dungeon_clears = data["dungeon_clears"]
+        player.technique_grade = data["technique_grade"]
+        player.domain_expansion = data["domain_expansion"]
+        player.pvp_history = data["pvp_history"]
+        player.pvp_wins = data["pvp_wins"]
+        player.pvp_losses = data["pvp_losses"]
+        player.earned_roles = data["earned_roles"]
+        player.level = data["level"]
+        player.current_hp = data["current_hp"]
+        player.dungeon_damage = data["dungeon_damage"]
+        player.dungeons_completed = data["dungeons_completed"]
+        player.bosses_defeated = data["bosses_defeated"]
+        player.gold_earned = data["gold_earned"]
+        player.gold_spent = data["gold_spent"]
+        player.training_completed = data["training_completed"]
+        player.advanced_training_completed = data["advanced_training_completed"]
+        player.guild_contributions = data["guild_contributions"]
+        player.guild_dungeons = data["guild_dungeons"]
+        player.class_changes = data["class_changes"]
+        player.daily_claims = data["daily_claims"]
+        player.quests_completed = data["quests_completed"]
+        player.daily_quests = data["daily_quests"]
+        player.weekly_quests = data["weekly_quests"]
+        player.long_term_quests = data["long_term_quests"]
+        player.achievement_progress = data["achievement_progress"]
+        player.inventory = Inventory(
+            InventoryItem.from_dict(item_data)
+            for item_data in data["inventory"])
+        player.achievements = set(data["achievements"])
+        player.last_daily = (fromisoformat(data["last_daily"])
+                             if data["last_daily"] else None)
+        player.last_train = (fromisoformat(data["last_train"])
+                             if data["last_train"] else None)
+        player.last_pvp_battle = (fromisoformat(data["last_pvp_battle"])
+                                  if data["last_pvp_battle"] else None)
+        player.skill_cooldowns = {
+            skill_id: fromisoformat(timestamp)
+            for skill_id, timestamp in data["skill_cooldowns"].items()
+        }
+        player.crafting_skills = _load_crafting_skills(data["crafting_skills"])
+        player.materials = {
+            (category, material_type, rarity): count
+            for category, material_type, rarity, count in data["materials"]
+        }
+        player.level_stamp = data["level_stamp"]
+        player.display_name = data["display_name"]
         return player
 
 
+class PlayerSummary:
+    """Read-only projection of a player for leaderboards and player lists"""
+
+    def __init__(self, user_id: int, fields: Dict[str, Any]):
+        self.user_id = user_id
+        self.__dict__.update(fields)
+
+    @classmethod
+    def from_player(cls, player: PlayerData) -> 'PlayerSummary':
+        fields = {}
+        for field, default in SUMMARY_FIELDS.items():
+            value = getattr(player, field, default)
+            if isinstance(value, datetime.datetime):
+                value = value.isoformat()
+            fields[field] = value
+        return cls(player.user_id, fields)
+
+
 class DataManager:
 
-    def __init__(self):
-        self.players: Dict[int, PlayerData] = {}
+    # Players touched in the last this many seconds are not evicted from the
+    # cache, since views may still be working on them, see _trim_cache()
+    RETAIN_WINDOW = 900
+
+    # Default write-behind interval in seconds, see save_data()
+    SAVE_INTERVAL = 5.0
+
+    # Default number of hydrated players kept in memory, see _trim_cache()
+    PLAYER_CACHE_SIZE = 10000
+
+    def __init__(self,
+                 backend: Optional[str] = None,
+                 save_interval: Optional[float] = None,
+                 cache_size: Optional[int] = None,
+                 cache_bytes: Optional[int] = None):
+        # Hydrated players, least recently used first
+        self.players: 'OrderedDict[int, PlayerData]' = OrderedDict()
         self.dungeons = {}  # Will be populated with dungeon data
         self.active_events = {}  # Active server events
         self.member_guild_map = {}  # Maps member IDs to guild IDs
         self.guild_data = {}  # Guild data storage
         self.player_data = {}  # For compatibility with existing code
         self.achievement_tracker = None  # Will be initialized after imports
+        self.quest_manager = None  # Will be initialized after imports
+
+        # Dirty tracking - encoded records as last written to storage, plus
+        # the players/guilds that may have changed since
+        self._player_records: Dict[int, Any] = {}
+        self._guild_records: Dict[str, Any] = {}
+        self._guild_map_record = "{}"
+        self._dirty_players: Set[int] = set()  # Changed since the last save
+        self._touched: Dict[int, float] = {}  # user_id -> last touched
+        self._dirty_guilds: Set[str] = set()
+        self._guild_map_dirty = False
+
+        # JSON document or SQLite rows, see storage.py
+        self.storage = open_storage(backend)
+
+        # Mutations between snapshots, see journal.py
+        self.journal = Journal()
+        self._replaying = False
+        # Last journal entry the stored snapshot includes
+        self._stored_journal_seq = 0
+
+        # Write-behind - save_data() only schedules a flush, at most one per
+        # interval. 0 writes synchronously on every save_data() call.
+        if save_interval is None:
+            save_interval = float(
+                os.getenv("SAVE_INTERVAL", self.SAVE_INTERVAL))
+        self.save_interval = save_interval
+        self._flush_task: Optional[asyncio.Task] = None
+        # Set by save_data() while _flush_task runs, see _flush_later()
+        self._save_again = False
+
+        # Encoding and disk writes run on a single worker thread; the lock
+        # keeps a synchronous flush() from interleaving with it
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="data-save")
+        self._write_lock = threading.Lock()
+        self._pending_write: Optional[concurrent.futures.Future] = None
+
+        # LRU cap on hydrated players - a player count and an optional
+        # approximate byte budget (encoded record sizes). 0 means no limit.
+        if cache_size is None:
+            cache_size = int(
+                os.getenv("PLAYER_CACHE_SIZE", self.PLAYER_CACHE_SIZE))
+        if cache_bytes is None:
+            cache_bytes = int(os.getenv("PLAYER_CACHE_BYTES", 0))
+        self.cache_size = cache_size
+        self.cache_bytes = cache_bytes
+        self._cache_weights: Dict[int, int] = {}
+        self._cache_bytes_used = 0
+        self._pins: Dict[int, int] = {}  # user_id -> pin count
+        # Dirty players evicted before their changes were written, and the
+        # players whose records are in a write that has not committed yet
+        self._evicted: Dict[int, Dict[str, Any]] = {}
+        self._writing: Set[int] = set()
+        # Every PlayerData object still referenced anywhere, cached or not.
+        # Reloading an evicted player returns the object views already hold,
+        # so there is only ever one instance per user to write to.
+        self._live: 'weakref.WeakValueDictionary[int, PlayerData]' = (
+            weakref.WeakValueDictionary())
+
+        # item_id -> owner over every player, built by build_item_index() or
+        # else on first use, see find_item(). Ids held by more than one player keep their first
+        # holder there and list the others in _duplicate_items.
+        self._item_owners: Optional[Dict[str, int]] = None
+        self._duplicate_items: Dict[str, List[int]] = {}
+        # Players whose items changed while build_item_index() scans storage
+        self._item_scan: Optional[Set[int]] = None
+
+        # Ranked indexes for the leaderboards, built on first use, see
+        # leaderboard_page()
+        self._leaderboards: Optional[Leaderboards] = None
+        # Hot numeric fields of every player as columns, built on first use,
+        # see population()
+        self._population: Optional[PopulationStore] = None
+
+        # PlayerData field -> callbacks run as (player, field, value) after
+        # every assignment to it, see watch_field()
+        self.field_watchers: Dict[str, List[Callable[[PlayerData, str, Any],
+                                                     None]]] = {}
 
-        if not os.path.exists('player_data.json'):
-            with open('player_data.json', 'w') as f:
-                json.dump({}, f)
         self.load_data()
         self.load_dungeons()
 
+    def mark_player_dirty(self, user_id: int) -> None:
+        """Flag a player so the next save re-serializes their record"""
+        self._dirty_players.add(user_id)
+        self._touched[user_id] = time.monotonic()
+
+    def player_changed(self, player: PlayerData) -> None:
+        """Called by PlayerData on every attribute change"""
+        user_id = player.user_id
+        cached = self.players.get(user_id)
+        if cached is None:
+            # Evicted while someone still held a reference - take it back
+            # so the change is not lost
+            self._evicted.pop(user_id, None)
+            self._register_player(player)
+        elif cached is player:
+            self.players.move_to_end(user_id)
+        self.mark_player_dirty(user_id)
+
+    def pin_player(self, user_id: int) -> None:
+        """Keep a player cached while a view holds on to it"""
+        self._pins[user_id] = self._pins.get(user_id, 0) + 1
+
+    def unpin_player(self, user_id: int) -> None:
+        count = self._pins.get(user_id, 0) - 1
+        if count > 0:
+            self._pins[user_id] = count
+        else:
+            self._pins.pop(user_id, None)
+        self._trim_cache()
+
+    def mark_guild_dirty(self, guild_name: str) -> None:
+        """Flag a guild (created, changed or removed) for the next save"""
+        self._dirty_guilds.add(guild_name)
+
+    def mark_guild_map_dirty(self) -> None:
+        """Flag the member -> guild mapping for the next save"""
+        self._guild_map_dirty = True
+
+    @staticmethod
+    def _copy_record(record: Any) -> Any:
+        # pickle round-trips plain dict/list data in C, far cheaper than
+        # copy.deepcopy and enough to detach the record from live objects
+        return pickle.loads(pickle.dumps(record, pickle.HIGHEST_PROTOCOL))
+
+    def _snapshot_changes(self) -> Tuple[Dict[int, Dict[str, Any]],
+                                         Dict[str, Optional[Dict[str, Any]]],
+                                         Optional[Dict[int, str]], int]:
+        """Copy every record that may have changed. Runs on the event loop.
+
+        Returns:
+            Tuple of (players, guilds, member_map, journal_seq); None marks a
+            removed guild, member_map is None when the mapping is unchanged
+            and journal_seq is the last journal entry the copy includes
+        """
+        journal_seq = self.journal.seq
+        # Evicted records are already detached copies
+        players = dict(self._evicted)
+
+        # Only players changed since the last snapshot; a failed write puts
+        # them back, see _written()
+        for user_id in self._dirty_players:
+            player = self.players.get(user_id)
+            if player is not None:
+                players[user_id] = self._copy_record(player.to_dict())
+        self._dirty_players = set()
+
+        self._writing.update(players)
+
+        guilds = {
+            guild_name: self._copy_record(self.guild_data[guild_name])
+            if guild_name in self.guild_data else None
+            for guild_name in self._dirty_guilds
+        }
+        self._dirty_guilds.clear()
+
+        member_map = None
+        if self._guild_map_dirty:
+            member_map = dict(self.member_guild_map)
+            self._guild_map_dirty = False
+
+        return players, guilds, member_map, journal_seq
+
+    def _write_changes(self, players: Dict[int, Dict[str, Any]],
+                       guilds: Dict[str, Optional[Dict[str, Any]]],
+                       member_map: Optional[Dict[int, str]],
+                       journal_seq: int) -> bool:
+        """Encode a snapshot and write the records that actually changed.
+
+        Safe to run in a worker thread. Returns True if anything was written.
+        """
+        changed = False
+
+        with self._write_lock:
+            for user_id, record in players.items():
+                encoded = self.storage.encode_record(record)
+                if encoded != self._player_records.get(user_id):
+                    self._player_records[user_id] = encoded
+                    self.storage.put_player(user_id, encoded,
+                                            summarize_record(record))
+                    changed = True
+
+            for guild_name, record in guilds.items():
+                if record is None:
+                    if self._guild_records.pop(guild_name, None) is not None:
+                        self.storage.put_guild(guild_name, None)
+                        changed = True
+                    continue
+
+                encoded = self.storage.encode_record(record)
+                if encoded != self._guild_records.get(guild_name):
+                    self._guild_records[guild_name] = encoded
+                    self.storage.put_guild(guild_name, encoded)
+                    changed = True
+
+            if member_map is not None:
+                encoded = json.dumps({str(k): v for k, v in member_map.items()},
+                                     separators=(",", ":"))
+                if encoded != self._guild_map_record:
+                    self._guild_map_record = encoded
+                    self.storage.put_member_map(member_map)
+                    changed = True
+
+            # Journal entries whose effects left every record as it was
+            # still have to be marked as included, or a replay would apply
+            # them a second time
+            if changed or journal_seq > self._stored_journal_seq:
+                self.storage.set_journal_seq(journal_seq)
+                self.storage.commit()
+                self.journal.compact(journal_seq)
+                self._stored_journal_seq = journal_seq
+
+        return changed
+
+    def _written(self, players: Dict[int, Dict[str, Any]],
+                 committed: bool) -> None:
+        """Forget evicted players once a write has committed their records,
+        or flag the players again if it failed"""
+        for user_id, record in players.items():
+            self._writing.discard(user_id)
+            if not committed:
+                if user_id in self.players:
+                    self._dirty_players.add(user_id)
+                continue
+            if self._evicted.get(user_id) is record:
+                del self._evicted[user_id]
+            if user_id not in self.players:
+                self._player_records.pop(user_id, None)
+
+    def journal_op(self, op: str, **fields: Any) -> None:
+        """Append a mutation to the journal (ignored while replaying it)"""
+        if not self._replaying:
+            self.journal.append({"op": op, **fields})
+            # The next snapshot must include the change the entry records,
+            # whether or not an attribute assignment reported it
+            if op == "guild_contribution":
+                self.mark_guild_dirty(fields["g"])
+            else:
+                self.mark_player_dirty(fields["u"])
+
+    def _replay_journal(self, snapshot_seq: int) -> int:
+        """
+        Re-apply journal entries newer than the loaded snapshot
+
+        Returns:
+            The number of entries replayed
+        """
+        entries = self.journal.open(snapshot_seq)
+        if not entries:
+            return 0
+
+        self._replaying = True
+        try:
+            for entry in entries:
+                op = entry["op"]
+
+                if op == "guild_contribution":
+                    guild = self.guild_data.get(entry["g"])
+                    if guild is None:
+                        continue
+                    guild["bank"] += entry["amount"]
+                    day = guild["daily_contributions"].setdefault(entry["day"], {})
+                    day[str(entry["u"])] = day.get(str(entry["u"]),
+                                                   0) + entry["amount"] // 10
+                    self.mark_guild_dirty(entry["g"])
+                    continue
+
+                player = (self._load_player(entry["u"])
+                          or self._create_player(entry["u"]))
+                self.mark_player_dirty(player.user_id)
+
+                if op == "gold":
+                    if entry["d"] >= 0:
+                        player.add_gold(entry["d"])
+                    else:
+                        player.remove_gold(-entry["d"])
+                elif op == "exp":
+                    player.add_exp(entry["a"], bypass_penalty=True)
+                elif op == "item_add":
+                    player.add_item(Item.from_dict(entry["item"]), entry["q"],
+                                    stack=entry["stack"])
+                elif op == "item_remove":
+                    inv_item = player.inventory.get(entry["id"])
+                    if inv_item is not None:
+                        player.remove_item(inv_item, entry["q"])
+                elif op == "material_add":
+                    player.add_material(*entry["m"], entry["q"])
+                elif op == "material_remove":
+                    player.remove_material(*entry["m"], entry["q"])
+        finally:
+            self._replaying = False
+
+        return len(entries)
+
     def save_data(self):
+        """Request a save of everything that changed.
+
+        Inside the running bot this returns immediately and a background task
+        flushes after save_interval seconds, so bursts of saves (a battle,
+        quest and achievement updates) coalesce into one write. Outside an
+        event loop, or with write-behind disabled, it flushes right away.
+        """
+        if self.save_interval > 0:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+
+            if loop is not None:
+                if self._flush_task is None or self._flush_task.done():
+                    self._flush_task = loop.create_task(self._flush_later())
+                else:
+                    self._save_again = True
+                return
+
+        self.flush()
+
+    async def _flush_later(self):
+        # A save requested once the snapshot is taken (while the write is in
+        # progress) is not part of it, so go round again for that save
+        self._save_again = True
+        while self._save_again:
+            await asyncio.sleep(self.save_interval)
+            self._save_again = False
+            await self.flush_async()
+
+    async def flush_async(self, sweep: bool = False):
+        """Write pending changes without blocking the event loop.
+
+        The snapshot is taken here on the loop; encoding and disk I/O run on
+        the storage worker thread. With sweep every cached player is
+        compared with its stored record, so changes made in place that
+        nobody reported are written too.
+        """
         try:
-            # Save player data
-            player_data = {}
-            for user_id, player in self.players.items():
-                player_data[str(user_id)] = player.to_dict()
-
-            # Create complete data object with both player and guild data
-            complete_data = {
-                "players": player_data,
-                "guilds": self.guild_data,
-                "member_guild_map": self.member_guild_map
-            }
+            if sweep:
+                self._dirty_players.update(self.players)
+            snapshot = self._snapshot_changes()
+            self._pending_write = self._executor.submit(
+                self._write_changes, *snapshot)
+            committed = False
+            try:
+                if await asyncio.wrap_future(self._pending_write):
+                    print("Successfully saved player and guild data")
+                committed = True
+            finally:
+                self._written(snapshot[0], committed)
+        except Exception as e:
+            print(f"Error saving data: {e}")
 
-            with open('player_data.json', 'w') as f:
-                json.dump(complete_data, f, indent=4)
+    def flush(self, sweep: bool = False):
+        """Write pending changes now. Use on shutdown and from admin commands.
+        sweep works as for flush_async()."""
+        try:
+            # Let a background write land first so writes stay in order
+            if self._pending_write is not None:
+                concurrent.futures.wait([self._pending_write])
+
+            if sweep:
+                self._dirty_players.update(self.players)
 
-            print("Successfully saved player and guild data")
+            snapshot = self._snapshot_changes()
+            committed = False
+            try:
+                if self._write_changes(*snapshot):
+                    print("Successfully saved player and guild data")
+                committed = True
+            finally:
+                self._written(snapshot[0], committed)
         except Exception as e:
             print(f"Error saving data: {e}")
 
     def load_data(self):
         try:
-            with open('player_data.json', 'r') as f:
-                data = json.load(f)
-
-            # Check if we have the new format with separate players and guilds
-            if isinstance(data, dict) and "players" in data:
-                # New format
-                player_data = data.get("players", {})
-                self.guild_data = data.get("guilds", {})
-                self.member_guild_map = data.get("member_guild_map", {})
-
-                # Convert string keys to int for member_guild_map
-                if self.member_guild_map:
-                    self.member_guild_map = {
-                        int(k): v
-                        for k, v in self.member_guild_map.items()
-                    }
-
-                for user_id, p_data in player_data.items():
-                    self.players[int(user_id)] = PlayerData.from_dict(
-                        int(user_id), p_data)
-            else:
-                # Old format - only player data
-                for user_id, player_data in data.items():
-                    self.players[int(user_id)] = PlayerData.from_dict(
-                        int(user_id), player_data)
+            data = self.storage.load()
+
+            self.guild_data = data["guilds"]
+            # Convert string keys to int for member_guild_map
+            self.member_guild_map = {
+                int(k): v
+                for k, v in data["member_guild_map"].items()
+            }
+
+            if data["schema_version"] < SCHEMA_VERSION:
+                self._migrate_storage(data["schema_version"])
 
+            # Players stay as stored records until get_player() asks for them
             print(
-                f"Loaded {len(self.players)} players and {len(self.guild_data)} guilds"
+                f"Loaded {self.storage.player_count()} players and {len(self.guild_data)} guilds"
             )
+
+            self._stored_journal_seq = data["journal_seq"]
+            replayed = self._replay_journal(data["journal_seq"])
+            if replayed:
+                print(f"Replayed {replayed} journal entries")
+                self.flush()
         except Exception as e:
             print(f"Error loading data: {e}")
 
+    def _migrate_storage(self, version: int) -> None:
+        """Upgrade every stored player record to SCHEMA_VERSION, once"""
+        rows = list(self.storage.iter_player_rows())
+        for user_id, record in rows:
+            record = migrate_player(self.storage.decode_record(record), version)
+            self.storage.put_player(user_id, self.storage.encode_record(record),
+                                    summarize_record(record))
+
+        self.storage.set_schema_version(SCHEMA_VERSION)
+        self.storage.commit()
+        print(f"Migrated {len(rows)} players from schema version {version} "
+              f"to {SCHEMA_VERSION}")
+
+    def _register_player(self, player: PlayerData,
+                         record: Any = None) -> None:
+        """Track a player and let it report its own changes"""
+        user_id = player.user_id
+        object.__setattr__(player, "_owner", self)
+        self._live[user_id] = player
+        self.players[user_id] = player
+        self.players.move_to_end(user_id)
+
+        if self.cache_bytes:
+            if record is None:
+                record = self.storage.encode_record(player.to_dict())
+            self._cache_bytes_used += len(record) - self._cache_weights.get(
+                user_id, 0)
+            self._cache_weights[user_id] = len(record)
+
+        self._trim_cache()
+
+    def _trim_cache(self) -> None:
+        """Evict least recently used players until the cache fits its limits"""
+        excess = len(self.players) - self.cache_size if self.cache_size else 0
+        excess_bytes = (self._cache_bytes_used -
+                        self.cache_bytes if self.cache_bytes else 0)
+        if excess <= 0 and excess_bytes <= 0:
+            return
+
+        newest = next(reversed(self.players))
+        retain_after = time.monotonic() - self.RETAIN_WINDOW
+        victims = []
+        for user_id in self.players:
+            if excess <= 0 and excess_bytes <= 0:
+                break
+            if self._touched.get(user_id, 0) > retain_after:
+                # Players after this one were used even more recently
+                break
+            if user_id in self._pins or user_id == newest:
+                continue
+            victims.append(user_id)
+            excess -= 1
+            excess_bytes -= self._cache_weights.get(user_id, 0)
+
+        unsaved = [user_id for user_id in victims if self._evict_player(user_id)]
+        # The journal replay flushes once it is done
+        if unsaved and not self._replaying:
+            self.save_data()
+
+    def _evict_player(self, user_id: int) -> bool:
+        """
+        Drop a player from memory
+
+        Returns:
+            True if the player had changes that still need to be written
+        """
+        player = self.players.pop(user_id)
+        self._cache_bytes_used -= self._cache_weights.pop(user_id, 0)
+
+        self._touched.pop(user_id, None)
+
+        record = player.to_dict()
+        if (user_id in self._dirty_players or user_id in self._writing
+                # Changed in place without anyone reporting it
+                or self.storage.encode_record(record) !=
+                self._player_records.get(user_id)):
+            # Storage may not have this player's latest state yet
+            self._dirty_players.discard(user_id)
+            self._evicted[user_id] = self._copy_record(record)
+            return True
+
+        self._player_records.pop(user_id, None)
+        return False
+
+    def _hydrate_player(self, user_id: int, record: Any) -> PlayerData:
+        """Build a player from a stored record and start tracking it"""
+        player = PlayerData.from_dict(user_id,
+                                      self.storage.decode_record(record))
+        self._player_records[user_id] = record
+        self._register_player(player, record)
+        return player
+
+    def _load_player(self, user_id: int) -> Optional[PlayerData]:
+        """Get a player from memory or storage. Returns None if not stored."""
+        player = self.players.get(user_id)
+        if player is not None:
+            self.players.move_to_end(user_id)
+            return player
+
+        player = self._live.get(user_id)
+        if player is not None:
+            # Evicted while a view still held it - take the same object back
+            if self._evicted.pop(user_id, None) is not None:
+                self.mark_player_dirty(user_id)
+            self._register_player(player)
+        elif user_id in self._evicted:
+            # Evicted with changes that have not been written yet
+            player = PlayerData.from_dict(
+                user_id, self._copy_record(self._evicted.pop(user_id)))
+            self._register_player(player)
+            self.mark_player_dirty(user_id)
+        else:
+            # Lazy backends keep players in storage until first requested
+            record = self.storage.load_player(user_id)
+            if record is not None:
+                player = self._hydrate_player(user_id, record)
+        return player
+
+    def _create_player(self, user_id: int) -> PlayerData:
+        player = PlayerData(user_id)
+        self._register_player(player)
+        if self._leaderboards is not None:
+            for field in RANKED_FIELDS:
+                self._leaderboards.update(user_id, field,
+                                          getattr(player, field))
+        if self._population is not None:
+            self._population.set_player(user_id, player)
+        return player
+
     def get_player(self, user_id: int) -> PlayerData:
         """Get a player or create a new one if not exists"""
-        if user_id not in self.players:
-            self.players[user_id] = PlayerData(user_id)
+        player = self._load_player(user_id)
+        if player is None:
+            player = self._create_player(user_id)
+            self.mark_player_dirty(user_id)
             self.save_data()
-        return self.players[user_id]
+        else:
+            # Callers usually mutate the player they fetched
+            self.mark_player_dirty(user_id)
+        return player
+
+    def iter_players(self) -> Iterator[Tuple[int, PlayerData]]:
+        """Yield (user_id, player) for every player.
+
+        Players are hydrated one at a time and may be evicted again once the
+        caller moves on. For read-only views over the whole population use
+        iter_player_summaries() instead.
+        """
+        seen = set()
+        for user_id in list(self.players) + list(self._evicted):
+            player = self._load_player(user_id)
+            if player is not None:
+                seen.add(user_id)
+                yield user_id, player
+
+        for user_id, record in self.storage.iter_player_rows():
+            if user_id in seen:
+                continue
+            seen.add(user_id)
+            if user_id in self.players or user_id in self._evicted:
+                yield user_id, self._load_player(user_id)
+            else:
+                yield user_id, self._hydrate_player(user_id, record)
+
+    def iter_player_summaries(self) -> Iterator[Tuple[int, 'PlayerSummary']]:
+        """Yield (user_id, summary) for every player without loading them"""
+        held = self.held_player_summaries()
+        yield from self.iter_stored_summaries({user_id for user_id, _ in held})
+        yield from held
+
+    def held_player_summaries(self) -> List[Tuple[int, 'PlayerSummary']]:
+        """
+        Summaries of the players whose latest state is in memory: cached, or
+        evicted before their changes were written. Call on the event loop.
+
+        Returns:
+            List of (user_id, summary)
+        """
+        held = [(user_id, PlayerSummary(user_id, summarize_record(record)))
+                for user_id, record in self._evicted.items()
+                if user_id not in self.players]
+        held.extend((user_id, PlayerSummary.from_player(player))
+                    for user_id, player in self.players.items())
+        return held
+
+    def iter_stored_summaries(self, skip: Set[int]
+                              ) -> Iterator[Tuple[int, 'PlayerSummary']]:
+        """Yield (user_id, summary) from storage for every player not in
+        skip. Reads only storage, so it may run in a worker thread."""
+        for user_id, summary in self.storage.iter_summaries():
+            if user_id not in skip:
+                yield user_id, PlayerSummary(user_id, summary)
+
+    async def build_item_index(self) -> None:
+        """
+        Build the find_item() index without blocking the event loop
+
+        Stored records are decoded in a worker thread that reads nothing but
+        storage. Players held in memory, and players whose items change while
+        it runs, are indexed from their current state on the loop.
+        """
+        if self._item_owners is not None or self._item_scan is not None:
+            return
+
+        held = set(self.players) | set(self._evicted)
+        self._item_scan = set()
+        try:
+            stored = await asyncio.to_thread(self._scan_stored_items, held)
+        finally:
+            changed, self._item_scan = self._item_scan, None
+        if self._item_owners is None:
+            # Skipped players may have been evicted since
+            self._index_items(stored, changed | held)
+
+    def _build_item_index(self) -> None:
+        # Used when find_item() runs before build_item_index() has finished
+        self._index_items(self._scan_stored_items(set()), set())
+
+    def _scan_stored_items(self, skip: Set[int]) -> Dict[int, List[str]]:
+        """Item ids of every stored player not in skip. Reads only storage,
+        so it may run in a worker thread."""
+        return {
+            user_id: self._record_item_ids(self.storage.decode_record(record))
+            for user_id, record in self.storage.iter_player_rows()
+            if user_id not in skip
+        }
+
+    @staticmethod
+    def _record_item_ids(record: Dict[str, Any]) -> List[str]:
+        return [inv_item["item"]["item_id"] for inv_item in record["inventory"]]
+
+    def _index_items(self, stored: Dict[int, List[str]],
+                     refresh: Set[int]) -> None:
+        """Build the item index from the players in memory and the scanned
+        stored item ids; players in refresh are read from storage again"""
+        self._item_owners = {}
+        self._duplicate_items = {}
+        for user_id, player in list(self.players.items()):
+            for inv_item in player.inventory:
+                self.item_added(user_id, inv_item.item.item_id)
+
+        for user_id, record in self._evicted.items():
+            if user_id not in self.players:
+                for item_id in self._record_item_ids(record):
+                    self.item_added(user_id, item_id)
+
+        for user_id in refresh:
+            if user_id in self.players or user_id in self._evicted:
+                continue
+            encoded = self.storage.load_player(user_id)
+            if encoded is None:
+                stored.pop(user_id, None)
+            else:
+                stored[user_id] = self._record_item_ids(
+                    self.storage.decode_record(encoded))
+
+        for user_id, item_ids in stored.items():
+            if user_id not in self.players and user_id not in self._evicted:
+                for item_id in item_ids:
+                    self.item_added(user_id, item_id)
+
+    def item_added(self, user_id: int, item_id: str) -> None:
+        """Called by PlayerData when an inventory entry is added"""
+        if self._item_scan is not None:
+            self._item_scan.add(user_id)
+        if self._item_owners is None:
+            return
+
+        owner = self._item_owners.setdefault(item_id, user_id)
+        if owner == user_id:
+            return
+        holders = self._duplicate_items.setdefault(item_id, [])
+        if user_id not in holders:
+            holders.append(user_id)
+            print(f"Duplicate item id {item_id}: held by {owner} and {user_id}")
+
+    def item_removed(self, user_id: int, item_id: str) -> None:
+        """Called by PlayerData once a player holds no entry with item_id"""
+        if self._item_scan is not None:
+            self._item_scan.add(user_id)
+        if self._item_owners is None:
+            return
+
+        holders = self._duplicate_items.get(item_id)
+        if self._item_owners.get(item_id) == user_id:
+            if holders:
+                # Hand the id to the next holder
+                self._item_owners[item_id] = holders.pop(0)
+            else:
+                del self._item_owners[item_id]
+        elif holders and user_id in holders:
+            holders.remove(user_id)
+        if holders is not None and not holders:
+            del self._duplicate_items[item_id]
+
+    def find_item(self, item_id: str) -> Optional[Tuple[int, InventoryItem]]:
+        """
+        Look up an item anywhere on the server
+
+        Returns:
+            Tuple of (owner_id, inventory entry), or None if nobody holds it
+        """
+        if self._item_owners is None:
+            self._build_item_index()
+
+        owner_id = self._item_owners.get(item_id)
+        if owner_id is None:
+            return None
+        owner = self._load_player(owner_id)
+        inv_item = owner.inventory.get(item_id) if owner else None
+        return (owner_id, inv_item) if inv_item is not None else None
+
+    def duplicate_item_ids(self) -> Dict[str, List[int]]:
+        """
+        Item ids held by more than one player
+
+        Returns:
+            Dict of item_id -> every player holding it, first holder first
+        """
+        if self._item_owners is None:
+            self._build_item_index()
+        return {
+            item_id: [self._item_owners[item_id]] + holders
+            for item_id, holders in self._duplicate_items.items()
+        }
+
+    def watch_field(self, field: str,
+                    watcher: Callable[[PlayerData, str, Any], None]) -> None:
+        """Call watcher(player, field, value) whenever a player's field is set"""
+        self.field_watchers.setdefault(field, []).append(watcher)
+
+    def indexed_field_changed(self, player: PlayerData, field: str) -> None:
+        """Called by PlayerData when a field in INDEXED_FIELDS changes"""
+        value = getattr(player, field)
+        if self._leaderboards is not None and field in RANKED_FIELDS:
+            self._leaderboards.update(player.user_id, field, value)
+        if self._population is not None and field in POPULATION_FIELDS:
+            self._population.update(player.user_id, field, value)
+
+    def population(self) -> PopulationStore:
+        """Column store of every player's hot fields, for server-wide stats"""
+        if self._population is None:
+            population = PopulationStore()
+            for user_id, summary in self.iter_player_summaries():
+                population.set_player(user_id, summary)
+            self._population = population
+        return self._population
+
+    def _get_leaderboards(self) -> Leaderboards:
+        if self._leaderboards is None:
+            values = {field: {} for field in RANKED_FIELDS}
+            for user_id, summary in self.iter_player_summaries():
+                for field, field_values in values.items():
+                    field_values[user_id] = getattr(summary, field)
+            self._leaderboards = Leaderboards(values)
+        return self._leaderboards
+
+    def leaderboard_page(self, category: str, start: int,
+                         stop: int) -> List[Tuple[int, int]]:
+        """
+        Players ranked start to stop (0-based, stop excluded) in a
+        leaderboard category, see ranking.LEADERBOARD_FIELDS
+
+        Returns:
+            List of (user_id, value), best first
+        """
+        return self._get_leaderboards().page(category, start, stop)
+
+    def leaderboard_size(self) -> int:
+        """Number of players on the leaderboards"""
+        return self._get_leaderboards().size()
+
+    def player_rank(self, category: str, user_id: int) -> Optional[int]:
+        """1-based leaderboard rank of a player, None if they have no data"""
+        return self._get_leaderboards().rank(category, user_id)
+
+    def remember_display_name(self, user_id: int, name: str) -> None:
+        """Save a player's current display name; non-players are ignored"""
+        summary = self.get_player_summary(user_id)
+        if summary is None or summary.display_name == name:
+            return
+        self._load_player(user_id).display_name = name
+        self.save_data()
+
+    def get_player_summary(self, user_id: int) -> Optional['PlayerSummary']:
+        """Summary of one player without loading them, None if not stored"""
+        player = self.players.get(user_id)
+        if player is not None:
+            return PlayerSummary.from_player(player)
+        record = self._evicted.get(user_id)
+        if record is not None:
+            return PlayerSummary(user_id, summarize_record(record))
+        # Stored with the record, so the record itself is never decoded
+        summary = self.storage.load_summary(user_id)
+        if summary is None:
+            return None
+        return PlayerSummary(user_id, summary)
 
     def check_player_achievements(self, player: PlayerData) -> List[Dict[str, Any]]:
         """Check for new achievements and return any that were earned
@@ -750,12 +2042,10 @@ class DataManager:
         trigger an achievement (leveling up, winning battles, etc.)
         """
         # We need to import here to avoid circular imports
-        if self.achievement_tracker is None:
-            from achievements import AchievementTracker
-            self.achievement_tracker = AchievementTracker(self)
+        from achievements import get_achievement_tracker
 
         # Check for new achievements
-        new_achievements = self.achievement_tracker.check_achievements(player)
+        new_achievements = get_achievement_tracker(self).check_achievements(player)
 
         # If any achievements were earned, save the data
         if new_achievements:
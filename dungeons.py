@@ -248,6 +248,11 @@ class DungeonProgressView(View):
         self.player_current_hp = self.team_current_hp.get(self.player_data.user_id, 0)
         self.player_current_energy = self.team_current_energy.get(self.player_data.user_id, 0)
 
+        # Keep every team member's data cached until the run ends
+        self.pinned_players = list(self.team_player_data)
+        for team_member in self.pinned_players:
+            team_member.pin()
+
         # Add continue button
         self.continue_btn = Button(
             label="Proceed to Next Floor", 
@@ -275,6 +280,19 @@ class DungeonProgressView(View):
         self.retreat_btn.callback = self.retreat_callback
         self.add_item(self.retreat_btn)
 
+    def release_players(self):
+        for team_member in self.pinned_players:
+            team_member.unpin()
+        self.pinned_players = []
+
+    def stop(self):
+        self.release_players()
+        super().stop()
+
+    async def on_timeout(self):
+        self.release_players()
+        await super().on_timeout()
+
     async def next_floor_callback(self, interaction: discord.Interaction):
         """Handle moving to the next floor"""
         # Increment floor
@@ -466,15 +484,8 @@ class DungeonProgressView(View):
 
                     # Consume the item if successfully used
                     if item_used:
-                        # Decrement item quantity
-                        item_data['quantity'] = max(0, item_data.get('quantity', 1) - 1)
-
-                        # Remove item if quantity is 0
-                        if item_data['quantity'] <= 0:
-                            self.dungeon_view.player_data.inventory = [
-                                item for i, item in enumerate(self.dungeon_view.player_data.inventory) 
-                                if i != selected_index
-                            ]
+                        # Use up one of the item, dropping the entry once empty
+                        self.dungeon_view.player_data.remove_item(item_data, 1)
 
                         # Save player data
                         self.dungeon_view.data_manager.save_data()
@@ -925,10 +936,11 @@ class DungeonProgressView(View):
                 self.player_data.dungeon_clears[self.dungeon_name] = 1
             else:
                 self.player_data.dungeon_clears[self.dungeon_name] += 1
+            self.player_data.mark_changed()
 
             # Update quest progress for dungeons
-            from achievements import QuestManager
-            quest_manager = QuestManager(self.data_manager)
+            from achievements import get_quest_manager
+            quest_manager = get_quest_manager(self.data_manager)
 
             # Update daily dungeon quests
             completed_daily_quests = quest_manager.update_quest_progress(self.player_data, "daily_dungeons")
@@ -1040,8 +1052,8 @@ class DungeonProgressView(View):
 
             # Handle quest progression
             # Update quest progress for all participants
-            from achievements import QuestManager
-            quest_manager = QuestManager(self.data_manager)
+            from achievements import get_quest_manager
+            quest_manager = get_quest_manager(self.data_manager)
 
             if self.is_team_dungeon:
                 # Update for all team members
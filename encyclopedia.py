@@ -396,8 +396,9 @@ class EncyclopediaView(View):
                     color_value = MATERIAL_RARITIES[item["rarity"]].get("color", 0xFFFFFF)
                     color_name = item["rarity"]
 
-                # Format name with rarity coloring 
-                name = f"[{color_name}] {item['name']} (Lvl {item['level_req']}+)"
+                # Format name with rarity coloring, marking what the player has collected
+                collected = "✅ " if self.is_collected(item) else ""
+                name = f"{collected}[{color_name}] {item['name']} (Lvl {item['level_req']}+)"
 
                 # Format value with type info
                 value = f"**Type:** {item['type']}\n**Description:** {item['description']}"
@@ -409,10 +410,20 @@ class EncyclopediaView(View):
                 )
 
         # Set footer with player info
-        embed.set_footer(text=f"Player: {self.player.name} | Level: {self.player.level}")
+        embed.set_footer(text=f"Player: {self.player.display_name or self.player.user_id} | "
+                              f"Level: {self.player.class_level} | ✅ = collected")
 
         return embed
 
+    def is_collected(self, item: Dict[str, Any]) -> bool:
+        """Whether the player holds an item of this encyclopedia entry"""
+        if item["type"].startswith("Material:"):
+            # Materials are named "<rarity> <type>" and kept as stacks
+            material_type = item["name"][len(item["rarity"]) + 1:]
+            key = (item["type"].split(":", 1)[1], material_type, item["rarity"])
+            return key in self.player.materials
+        return self.player.inventory.has_name(item["name"])
+
 class EncyclopediaExploreView(View):
     def __init__(self, player_data: PlayerData, data_manager: DataManager):
         super().__init__(timeout=60)
@@ -6,6 +6,7 @@ from typing import Dict, List, Optional, Any
 
 from data_models import PlayerData, DataManager, Item, InventoryItem
 from user_restrictions import RestrictedView, get_target_user, create_restricted_embed_footer
+from item_catalog import catalog_key, create_item
 
 # Shop items database - organized by level tiers
 SHOP_ITEMS = {
@@ -471,16 +472,7 @@ def generate_random_item(level: int) -> Item:
     item_data = random.choice(item_pool)
 
     # Create and return the item
-    return Item(
-        item_id=generate_item_id(),
-        name=item_data["name"],
-        description=item_data["description"],
-        item_type=item_data["item_type"],
-        rarity=item_data["rarity"],
-        stats=item_data["stats"],
-        level_req=item_data["level_req"],
-        value=item_data["value"]
-    )
+    return create_item(catalog_key("shop", item_data["name"]), generate_item_id())
 
 def generate_rare_item(level: int) -> Item:
     """Generate a rare item from dungeon drops"""
@@ -495,29 +487,11 @@ def generate_rare_item(level: int) -> Item:
     item_data = random.choice(eligible_items)
 
     # Create and return the item
-    return Item(
-        item_id=generate_item_id(),
-        name=item_data["name"],
-        description=item_data["description"],
-        item_type=item_data["item_type"],
-        rarity=item_data["rarity"],
-        stats=item_data["stats"],
-        level_req=item_data["level_req"],
-        value=item_data["value"]
-    )
+    return create_item(catalog_key("rare", item_data["name"]), generate_item_id())
 
 def add_item_to_inventory(player: PlayerData, item: Item) -> None:
     """Add an item to player's inventory, stacking consumables"""
-    # For consumables, check if we already have this item
-    if item.item_type == "consumable":
-        for inv_item in player.inventory:
-            if inv_item.item.name == item.name:
-                # Stack consumables
-                inv_item.quantity += 1
-                return
-
-    # Otherwise, add as new item
-    player.inventory.append(InventoryItem(item=item, quantity=1, equipped=False))
+    player.add_item(item, stack=item.item_type == "consumable")
 
 class ItemActionView(View):
     def __init__(self, player_data: PlayerData, inventory_item: InventoryItem, data_manager: DataManager):
@@ -560,13 +534,8 @@ class ItemActionView(View):
     async def equip_callback(self, interaction: discord.Interaction):
         """Handle equipping/unequipping an item"""
         if self.inventory_item.equipped:
-            # Unequip
-            self.inventory_item.equipped = False
-
-            # Also remove from equipped_items dictionary
-            for slot, item_id in self.player_data.equipped_items.items():
-                if item_id == self.inventory_item.item.item_id:
-                    self.player_data.equipped_items[slot] = None
+            # Unequip (also clears its equipped_items slot)
+            self.player_data.unequip_item(self.inventory_item)
 
             await interaction.response.edit_message(
                 content=f"✅ {self.inventory_item.item.name} has been unequipped.",
@@ -583,16 +552,8 @@ class ItemActionView(View):
                 slot = "accessory"
 
             if slot:
-                # Unequip any previous item in this slot
-                if self.player_data.equipped_items[slot]:
-                    # Find the equipped item and unequip it
-                    for inv_item in self.player_data.inventory:
-                        if hasattr(inv_item.item, "item_id") and inv_item.item.item_id == self.player_data.equipped_items[slot]:
-                            inv_item.equipped = False
-
-                # Equip this item
-                self.inventory_item.equipped = True
-                self.player_data.equipped_items[slot] = self.inventory_item.item.item_id
+                # Equip this item, unequipping any previous item in this slot
+                self.player_data.equip_item(self.inventory_item)
 
                 await interaction.response.edit_message(
                     content=f"✅ {self.inventory_item.item.name} has been equipped as your {slot}.",
@@ -624,17 +585,17 @@ class ItemActionView(View):
             return
 
         # Process sale - earn gold from selling items
-        self.player_data.gold += item_value
+        self.player_data.add_gold(item_value)
 
         # Remove from inventory (or decrease quantity for consumables)
         if self.inventory_item.item.item_type == "consumable" and self.inventory_item.quantity > 1:
-            self.inventory_item.quantity -= 1
+            self.player_data.remove_item(self.inventory_item, 1)
             await interaction.response.edit_message(
                 content=f"💰 Sold 1x {item_name} for {item_value} gold. {self.inventory_item.quantity}x remaining.",
                 view=None
             )
         else:
-            self.player_data.inventory.remove(self.inventory_item)
+            self.player_data.remove_item(self.inventory_item)
             await interaction.response.edit_message(
                 content=f"💰 Sold {item_name} for {item_value} gold.",
                 view=None
@@ -693,9 +654,9 @@ class InventoryView(RestrictedView):
     def get_filtered_items(self):
         """Get items filtered by selected type"""
         if self.selected_type == "all":
-            return self.player_data.inventory
+            return list(self.player_data.inventory)
         else:
-            return [item for item in self.player_data.inventory if item.item.item_type == self.selected_type]
+            return self.player_data.inventory.by_type(self.selected_type)
 
     def update_buttons(self):
         """Update item buttons based on current page and filter"""
@@ -909,7 +870,7 @@ class InventoryView(RestrictedView):
             )
 
         # Add equipped items summary
-        equipped_items = [item for item in self.player_data.inventory if item.equipped]
+        equipped_items = self.player_data.inventory.equipped()
 
         if equipped_items:
             equipped_text = "\n".join([f"**{item.item.item_type.title()}**: {item.item.name}" for item in equipped_items])
@@ -997,16 +958,8 @@ class ShopView(RestrictedView):
                     # Filter by category if needed
                     if self.selected_category == "all" or item_data["item_type"] == self.selected_category:
                         # Convert to Item object
-                        item = Item(
-                            item_id=generate_item_id(),
-                            name=item_data["name"],
-                            description=item_data["description"],
-                            item_type=item_data["item_type"],
-                            rarity=item_data["rarity"],
-                            stats=item_data["stats"],
-                            level_req=item_data["level_req"],
-                            value=item_data["value"]
-                        )
+                        item = create_item(catalog_key("shop", item_data["name"]),
+                                        generate_item_id())
                         available_items.append(item)
 
         # Sort by level requirement and then by value
@@ -1267,16 +1220,8 @@ async def buy_command(ctx, item_name: str, data_manager: DataManager):
     player_data.remove_gold(item_data["value"])
 
     # Create and add item to inventory
-    new_item = Item(
-        item_id=generate_item_id(),
-        name=item_data["name"],
-        description=item_data["description"],
-        item_type=item_data["item_type"],
-        rarity=item_data["rarity"],
-        stats=item_data["stats"],
-        level_req=item_data["level_req"],
-        value=item_data["value"]
-    )
+    new_item = create_item(catalog_key("shop", item_data["name"]),
+                           generate_item_id())
 
     add_item_to_inventory(player_data, new_item)
 
@@ -7,6 +7,7 @@ import math
 from typing import Dict, List, Optional, Tuple, Any, Union
 
 from data_models import PlayerData, DataManager
+from xp_curve import GUILD_CURVE
 from user_restrictions import RestrictedView
 
 class Guild:
@@ -113,10 +114,10 @@ class Guild:
         """Add experience to guild and handle level ups. Returns True if leveled up."""
         self.exp += exp_amount
 
-        # Check for level up
-        exp_required = calculate_guild_exp_for_level(self.level)
-        if self.exp >= exp_required:
-            self.level += 1
+        # Guild exp is a running total; take every level it has reached
+        new_level, _ = GUILD_CURVE.level_for_total(self.exp)
+        if new_level > self.level:
+            self.level = new_level
             self.max_members = 20 + (5 * (self.level - 1))  # Increase max members with level
             return True
 
@@ -366,10 +367,30 @@ class GuildManager:
             # Load member -> guild mapping
             self.member_guild_map = self.data_manager.member_guild_map.copy()
 
-    def save_guilds(self):
-        """Save guild data to data manager"""
-        self.data_manager.guild_data = {name: guild.to_dict() for name, guild in self.guilds.items()}
-        self.data_manager.member_guild_map = self.member_guild_map.copy()
+    def save_guilds(self, *guild_names: str, members_changed: bool = False):
+        """Save guild data to data manager
+
+        Only the named guilds are re-serialized. With no names every guild is
+        saved. Pass members_changed=True when the member -> guild map changed.
+        """
+        if guild_names:
+            names = set(guild_names)
+        else:
+            names = set(self.guilds) | set(self.data_manager.guild_data)
+            members_changed = True
+
+        for name in names:
+            guild = self.guilds.get(name)
+            if guild:
+                self.data_manager.guild_data[name] = guild.to_dict()
+            else:
+                self.data_manager.guild_data.pop(name, None)
+            self.data_manager.mark_guild_dirty(name)
+
+        if members_changed:
+            self.data_manager.member_guild_map = self.member_guild_map.copy()
+            self.data_manager.mark_guild_map_dirty()
+
         self.data_manager.save_data()
 
     def create_guild(self, name: str, leader_id: int, player_data: PlayerData) -> Tuple[bool, str]:
@@ -401,7 +422,7 @@ class GuildManager:
         player_data.remove_gold(1000)
 
         # Save data
-        self.save_guilds()
+        self.save_guilds(name, members_changed=True)
         self.data_manager.save_data()  # Save player data with updated cursed energy
 
         return True, f"Guild '{name}' has been created for 1000 cursed energy! You are now the leader."
@@ -437,7 +458,7 @@ class GuildManager:
         self.member_guild_map[player_id] = guild_name
 
         # Save data
-        self.save_guilds()
+        self.save_guilds(guild_name, members_changed=True)
 
         return True, f"You have joined the guild '{guild_name}'!"
 
@@ -453,7 +474,7 @@ class GuildManager:
             # Inconsistent state - fix by removing player from mapping
             if player_id in self.member_guild_map:
                 del self.member_guild_map[player_id]
-                self.save_guilds()
+                self.save_guilds(guild_name, members_changed=True)
             return False, "Guild not found. Your guild membership has been reset."
 
         # Check if player is the leader
@@ -465,7 +486,7 @@ class GuildManager:
                 # Last member is leaving, disband the guild
                 del self.guilds[guild_name]
                 del self.member_guild_map[player_id]
-                self.save_guilds()
+                self.save_guilds(guild_name, members_changed=True)
                 return True, f"As the last member, you have disbanded the guild '{guild_name}'."
 
         # Remove from guild
@@ -473,7 +494,7 @@ class GuildManager:
         del self.member_guild_map[player_id]
 
         # Save data
-        self.save_guilds()
+        self.save_guilds(guild_name, members_changed=True)
 
         return True, f"You have left the guild '{guild_name}'."
 
@@ -504,7 +525,7 @@ class GuildManager:
         guild.promote_member(target_id)
 
         # Save data
-        self.save_guilds()
+        self.save_guilds(guild_name)
 
         return True, "Member has been promoted to guild officer."
 
@@ -535,7 +556,7 @@ class GuildManager:
             guild.officers.append(leader_id)
 
         # Save data
-        self.save_guilds()
+        self.save_guilds(guild_name)
 
         return True, "Guild leadership has been transferred."
 
@@ -578,7 +599,7 @@ class GuildManager:
         del self.guilds[guild_name]
 
         # Save data
-        self.save_guilds()
+        self.save_guilds(guild_name, new_name, members_changed=True)
 
         return True, f"Guild has been renamed from '{guild_name}' to '{new_name}'."
 
@@ -611,8 +632,12 @@ class GuildManager:
         contribution_points = contribution_amount // 10
         guild.daily_contributions[today][str(player_id)] += contribution_points
 
+        self.data_manager.journal_op("guild_contribution", u=player_id,
+                                     g=guild_name, amount=contribution_amount,
+                                     day=today)
+
         # Save data
-        self.save_guilds()
+        self.save_guilds(guild_name)
 
         return True, f"You contributed {contribution_amount} 💰 gold to the guild bank.", contribution_points
 
@@ -627,7 +652,7 @@ class GuildManager:
         leveled_up = guild.add_exp(exp_amount)
 
         # Save data
-        self.save_guilds()
+        self.save_guilds(guild_name)
 
         return True, leveled_up
 
@@ -732,13 +757,13 @@ class GuildInfoView(RestrictedView):
             color=discord.Color(self.guild.color)
         )
 
-        # Get member data from bot
+        # Resolve every member's name in one batch
         bot = interaction.client
+        names = await bot.name_resolver.resolve(self.guild.members)
 
         # Leader section
         leader_id = self.guild.leader_id
-        leader_user = await bot.fetch_user(leader_id)
-        leader_name = leader_user.display_name if leader_user else f"User ID: {leader_id}"
+        leader_name = names.get(leader_id, f"User ID: {leader_id}")
 
         members_embed.add_field(
             name="👑 Leader",
@@ -750,9 +775,7 @@ class GuildInfoView(RestrictedView):
         if self.guild.officers:
             officer_names = []
             for officer_id in self.guild.officers:
-                officer_user = await bot.fetch_user(officer_id)
-                officer_name = officer_user.display_name if officer_user else f"User ID: {officer_id}"
-                officer_names.append(officer_name)
+                officer_names.append(names.get(officer_id, f"User ID: {officer_id}"))
 
             members_embed.add_field(
                 name="🔰 Officers",
@@ -765,9 +788,7 @@ class GuildInfoView(RestrictedView):
         if regular_members:
             member_names = []
             for member_id in regular_members:
-                member_user = await bot.fetch_user(member_id)
-                member_name = member_user.display_name if member_user else f"User ID: {member_id}"
-                member_names.append(member_name)
+                member_names.append(names.get(member_id, f"User ID: {member_id}"))
 
             # Split into columns if many members
             if len(member_names) > 10:
@@ -913,7 +934,7 @@ class GuildInfoView(RestrictedView):
                     self.guild.bank -= cost
 
                     # Save changes
-                    self.guild_manager.save_guilds()
+                    self.guild_manager.save_guilds(self.guild.name)
 
                     # Get the new stats
                     upgrade_info = GUILD_UPGRADES[upgrade_id]
@@ -1244,7 +1265,7 @@ class GuildManageView(View):
             async def on_submit(self, modal_interaction: discord.Interaction):
                 # Update guild description
                 self.manage_view.guild.description = self.description_input.value
-                self.manage_view.guild_manager.save_guilds()
+                self.manage_view.guild_manager.save_guilds(self.manage_view.guild.name)
 
                 # Send success message
                 await modal_interaction.response.send_message(
@@ -1311,7 +1332,7 @@ class GuildManageView(View):
             async def on_submit(self, modal_interaction: discord.Interaction):
                 # Update guild MOTD
                 self.manage_view.guild.motd = self.motd_input.value
-                self.manage_view.guild_manager.save_guilds()
+                self.manage_view.guild_manager.save_guilds(self.manage_view.guild.name)
 
                 # Send success message
                 await modal_interaction.response.send_message(
@@ -1415,18 +1436,15 @@ class GuildManageView(View):
         bot = interaction.client
         regular_members = []
         officer_members = []
+        names = await bot.name_resolver.resolve(self.guild.members)
 
         for member_id in self.guild.members:
             if member_id != self.guild.leader_id:
-                try:
-                    member = await bot.fetch_user(member_id)
-                    if member_id in self.guild.officers:
-                        officer_members.append((member_id, member.display_name))
-                    else:
-                        regular_members.append((member_id, member.display_name))
-                except discord.NotFound:
-                    # Skip members that can't be found
-                    pass
+                display_name = names.get(member_id, f"User ID: {member_id}")
+                if member_id in self.guild.officers:
+                    officer_members.append((member_id, display_name))
+                else:
+                    regular_members.append((member_id, display_name))
 
         # Create selection options
         member_options = []
@@ -1477,7 +1495,7 @@ class GuildManageView(View):
             if action == "promote":
                 # Promote member to officer
                 if self.guild.promote_member(member_id):
-                    self.guild_manager.save_guilds()
+                    self.guild_manager.save_guilds(self.guild.name)
                     await select_interaction.response.send_message(
                         "Member promoted to officer successfully!",
                         ephemeral=True
@@ -1490,7 +1508,7 @@ class GuildManageView(View):
             elif action == "demote":
                 # Demote officer to regular member
                 if self.guild.demote_officer(member_id):
-                    self.guild_manager.save_guilds()
+                    self.guild_manager.save_guilds(self.guild.name)
                     await select_interaction.response.send_message(
                         "Officer demoted to regular member successfully!",
                         ephemeral=True
@@ -1548,21 +1566,17 @@ class GuildManageView(View):
         # Get non-leader guild members
         bot = interaction.client
         member_options = []
+        names = await bot.name_resolver.resolve(self.guild.members)
 
         for member_id in self.guild.members:
             if member_id != self.guild.leader_id:
-                try:
-                    member = await bot.fetch_user(member_id)
-                    member_options.append(
-                        discord.SelectOption(
-                            label=member.display_name,
-                            value=str(member_id),
-                            description=f"Transfer leadership to this member"
-                        )
+                member_options.append(
+                    discord.SelectOption(
+                        label=names.get(member_id, f"User ID: {member_id}"),
+                        value=str(member_id),
+                        description=f"Transfer leadership to this member"
                     )
-                except discord.NotFound:
-                    # Skip members that can't be found
-                    pass
+                )
 
         # Check if we have any members to display
         if not member_options:
@@ -1658,8 +1672,8 @@ class GuildManageView(View):
             confirm_view.add_item(cancel_btn)
 
             # Get new leader name
-            new_leader = await bot.fetch_user(new_leader_id)
-            new_leader_name = new_leader.display_name if new_leader else f"User ID: {new_leader_id}"
+            names = await bot.name_resolver.resolve([new_leader_id])
+            new_leader_name = names.get(new_leader_id, f"User ID: {new_leader_id}")
 
             # Show confirmation
             await select_interaction.response.edit_message(
@@ -2201,19 +2215,21 @@ class GuildTeamDungeonView(View):
         member_select = discord.utils.get(self.children, custom_id="member_select")
 
         if member_select:
+            member_ids = [int(option.value) for option in member_select.options
+                          if option.value.isdigit()]
+            names = await bot.name_resolver.resolve(member_ids)
+
             updated_options = []
             for option in member_select.options:
-                try:
-                    member_id = int(option.value)
-                    member = await bot.fetch_user(member_id)
+                if option.value.isdigit() and int(option.value) in names:
                     updated_options.append(
                         discord.SelectOption(
-                            label=member.display_name,
+                            label=names[int(option.value)],
                             value=option.value,
                             description="Add to dungeon team"
                         )
                     )
-                except (ValueError, discord.NotFound):
+                else:
                     # Keep original option if can't update
                     updated_options.append(option)
 
@@ -2234,18 +2250,15 @@ class GuildTeamDungeonView(View):
 
         # Add team members section
         team_members_text = ""
+        names = await bot.name_resolver.resolve(self.team_members)
         for i, member_id in enumerate(self.team_members):
-            try:
-                member = await bot.fetch_user(member_id)
-                name = member.display_name
+            name = names.get(member_id, f"User ID: {member_id}")
 
-                # Add ready status
-                if member_id in self.ready_members:
-                    team_members_text += f"{i+1}. {name} ✅\n"
-                else:
-                    team_members_text += f"{i+1}. {name}\n"
-            except discord.NotFound:
-                team_members_text += f"{i+1}. User ID: {member_id}\n"
+            # Add ready status
+            if member_id in self.ready_members:
+                team_members_text += f"{i+1}. {name} ✅\n"
+            else:
+                team_members_text += f"{i+1}. {name}\n"
 
         team_embed.add_field(
             name=f"Team Members ({len(self.team_members)}/{self.max_team_size})",
@@ -2446,12 +2459,9 @@ class GuildTeamDungeonView(View):
 
             # Show team members who are ready
             members_str = ""
+            names = await interaction.client.name_resolver.resolve(self.team_members)
             for i, member_id in enumerate(self.team_members):
-                try:
-                    member = await interaction.client.fetch_user(member_id)
-                    members_str += f"{i+1}. {member.display_name} ✅\n"
-                except:
-                    members_str += f"{i+1}. Member ID: {member_id} ✅\n"
+                members_str += f"{i+1}. {names.get(member_id, f'Member ID: {member_id}')} ✅\n"
 
             dungeon_embed.add_field(
                 name="Team Members",
@@ -2473,7 +2483,7 @@ class GuildTeamDungeonView(View):
             self.guild.achievements_progress["dungeon_conquerors"] = 1
 
         # Save guild data
-        self.guild_manager.save_guilds()
+        self.guild_manager.save_guilds(self.guild.name)
 
         # Create dungeon start embed
         dungeon_embed = discord.Embed(
@@ -2653,10 +2663,9 @@ async def guild_command(ctx, action: str = None, *args):
 
         if success:
             # Remove charter from inventory
-            for i, inv_item in enumerate(player_data.inventory):
-                if inv_item.item.name == "Guild Charter":
-                    player_data.inventory.pop(i)
-                    break
+            charter = player_data.inventory.find("Guild Charter")
+            if charter is not None:
+                player_data.remove_item(charter)
 
             # Save data
             data_manager.save_data()
@@ -2744,13 +2753,12 @@ async def guild_command(ctx, action: str = None, *args):
         )
 
         # Add guilds to embed
+        names = await bot.name_resolver.resolve(
+            guild_info["leader_id"] for guild_info in top_guilds)
         for i, guild_info in enumerate(top_guilds):
             # Get leader name
-            try:
-                leader = await bot.fetch_user(guild_info["leader_id"])
-                leader_name = leader.display_name
-            except discord.NotFound:
-                leader_name = f"User ID: {guild_info['leader_id']}"
+            leader_name = names.get(guild_info["leader_id"],
+                                    f"User ID: {guild_info['leader_id']}")
 
             list_embed.add_field(
                 name=f"{i+1}. {guild_info['emblem']} {guild_info['name']} (Level {guild_info['level']})",
@@ -2822,12 +2830,12 @@ async def guild_command(ctx, action: str = None, *args):
 
         if purchase_success:
             # Save guild data
-            guild_manager.save_guilds()
+            guild_manager.save_guilds(guild.name)
             await ctx.send(f"✅ Successfully purchased {item['name']} for 💰 {item['price']:,} Gold!")
         else:
             # Refund if the purchase function returned False
             guild.bank += item["price"]
-            guild_manager.save_guilds()
+            guild_manager.save_guilds(guild.name)
 
     elif action.lower() == "dungeon":
         # Check if in a guild
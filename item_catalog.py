@@ -0,0 +1,137 @@
+"""
+Interned catalog of the fixed items the game sells and drops
+
+Every entry of SHOP_ITEMS, RARE_ITEMS, ADVANCED_SHOP_ITEMS,
+TRANSFORMATION_ITEMS and SPECIAL_CONSUMABLES becomes one shared template Item,
+keyed "<source>:<name>" (the same name can appear in more than one source).
+A template's item_id is its key and its stats are read-only.
+
+Items created from the catalog point at their template and share its name,
+description and stats objects, so a thousand Health Potions cost a thousand
+small slot objects rather than a thousand copies. They are saved as their key
+plus any fields that differ from the template (see Item.to_dict()).
+
+The catalog is built on first use; the shop modules import data_models, so
+this module must not import them at load time.
+"""
+
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional
+
+from data_models import Item, ITEM_FIELDS
+
+_catalog: Optional[Dict[str, Item]] = None
+_by_name: Dict[str, List[Item]] = {}
+_retired: Dict[str, Item] = {}
+
+
+def catalog_key(source: str, name: str) -> str:
+    return f"{source}:{name}"
+
+
+def _add(catalog: Dict[str, Item], source: str, name: str,
+         data: Dict[str, Any], item_type: str, stats: Dict[str, int]) -> None:
+    key = catalog_key(source, name)
+    if key in catalog:
+        return
+
+    template = Item(item_id=key,
+                    name=name,
+                    description=data["description"],
+                    item_type=item_type,
+                    rarity=data["rarity"],
+                    stats=MappingProxyType(dict(stats)),
+                    level_req=data["level_req"],
+                    value=data["value"])
+    catalog[key] = template
+    _by_name.setdefault(name, []).append(template)
+
+
+def get_catalog() -> Dict[str, Item]:
+    """Return every template by key, building the catalog on first use"""
+    global _catalog
+    if _catalog is not None:
+        return _catalog
+
+    from equipment import SHOP_ITEMS, RARE_ITEMS
+    from advanced_shop import ADVANCED_SHOP_ITEMS
+    from special_items import TRANSFORMATION_ITEMS, SPECIAL_CONSUMABLES
+
+    catalog = {}
+    for items in SHOP_ITEMS.values():
+        for data in items:
+            _add(catalog, "shop", data["name"], data, data["item_type"],
+                 data["stats"])
+    for data in RARE_ITEMS:
+        _add(catalog, "rare", data["name"], data, data["item_type"],
+             data["stats"])
+    for items in ADVANCED_SHOP_ITEMS.values():
+        for data in items:
+            _add(catalog, "advanced", data["name"], data, data["item_type"],
+                 data.get("stats", {}))
+    for name, data in TRANSFORMATION_ITEMS.items():
+        _add(catalog, "transformation", name, data, "special",
+             data.get("stats_boost", {}))
+    for name, data in SPECIAL_CONSUMABLES.items():
+        # Consumables don't have permanent stat boosts
+        _add(catalog, "consumable", name, data, "special_consumable", {})
+
+    _catalog = catalog
+    return catalog
+
+
+def _template(key: str) -> Item:
+    template = get_catalog().get(key)
+    if template is None:
+        # The entry was removed from the game; items saved with its key keep
+        # their name and whatever fields were stored as overrides
+        template = _retired.get(key)
+        if template is None:
+            template = Item(key, key.split(":", 1)[-1], "", "misc", "common",
+                            MappingProxyType({}), 1, 0)
+            _retired[key] = template
+    return template
+
+
+def create_item(key: str, item_id: str, **overrides: Any) -> Item:
+    """
+    Create an item from a catalog entry
+
+    Returns:
+        An Item sharing the template's fields, with overrides (for example
+        level_req) applied on top
+    """
+    template = _template(key)
+    item = Item(item_id=item_id,
+                name=template.name,
+                description=template.description,
+                item_type=template.item_type,
+                rarity=template.rarity,
+                stats=template.stats,
+                level_req=template.level_req,
+                value=template.value,
+                template=template)
+    for field, value in overrides.items():
+        setattr(item, field, value)
+    return item
+
+
+def intern_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a full item record into catalog form if a template has its name
+
+    Returns:
+        The keyed record, or the given record for items outside the catalog
+    """
+    get_catalog()
+    candidates = _by_name.get(record.get("name"), [])
+    if not candidates:
+        return record
+
+    # Same name in several sources: pick the entry the item differs least from
+    template = min(candidates,
+                   key=lambda t: sum(record.get(field) != getattr(t, field)
+                                     for field in ITEM_FIELDS))
+    item = Item.from_dict(record)
+    item.template = template
+    return item.to_dict()
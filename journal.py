@@ -0,0 +1,83 @@
+"""
+Append-only operation journal for player and guild state
+
+Mutations made through the journaled methods (PlayerData.add_gold,
+remove_gold, add_exp, add_item, remove_item, add_material, remove_material
+and guild contributions) are appended here as one compact JSON line each, so
+they survive a crash before the next snapshot is written. On startup the entries newer than the last
+snapshot are replayed; every committed snapshot compacts the journal down to
+the entries it does not include yet.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Any, List, Tuple
+
+JOURNAL_PATH = 'player_data.journal'
+
+
+class Journal:
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        self.seq = 0  # Sequence number of the last appended entry
+        self._tail: List[Tuple[int, str]] = []  # Entries not yet compacted
+        self._lock = threading.Lock()
+        self._file = None
+
+    def open(self, snapshot_seq: int) -> List[Dict[str, Any]]:
+        """
+        Read the journal and start appending to it
+
+        Returns:
+            The entries newer than snapshot_seq, in order
+        """
+        self.seq = snapshot_seq
+        entries = []
+
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn final line from a crash mid-append
+                        break
+
+                    if entry["s"] > snapshot_seq:
+                        entries.append(entry)
+                        self._tail.append((entry["s"], line.rstrip("\n")))
+                    self.seq = max(self.seq, entry["s"])
+
+        self._file = open(self.path, 'a')
+        return entries
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """Append one entry and flush it to the OS. Returns its sequence number."""
+        with self._lock:
+            self.seq += 1
+            line = json.dumps({"s": self.seq, **entry}, separators=(",", ":"))
+            self._tail.append((self.seq, line))
+            if self._file is not None:
+                self._file.write(line + "\n")
+                self._file.flush()
+            return self.seq
+
+    def compact(self, snapshot_seq: int) -> None:
+        """Drop every entry already included in the snapshot at snapshot_seq"""
+        with self._lock:
+            self._tail = [(seq, line) for seq, line in self._tail
+                          if seq > snapshot_seq]
+
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                for _, line in self._tail:
+                    f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            if self._file is not None:
+                self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, 'a')
@@ -1,19 +1,20 @@
 import discord
 from discord.ui import Button, View, Select
 from typing import Dict, List, Any, Optional
-import operator
 from data_models import PlayerData, DataManager
 
 
 class LeaderboardView(View):
 
-    def __init__(self, data_manager: DataManager, category: str = "level", bot=None):
+    def __init__(self, data_manager: DataManager, category: str = "level", bot=None,
+                 viewer_id: Optional[int] = None):
         super().__init__(timeout=60)
         self.data_manager = data_manager
         self.category = category
         self.page = 0
         self.per_page = 5
         self.bot = bot  # Store the bot instance to look up usernames
+        self.viewer_id = viewer_id  # Player whose rank is shown in the footer
 
         self.add_category_select()
         self.add_navigation_buttons()
@@ -65,6 +66,11 @@ class LeaderboardView(View):
         next_button.callback = self.next_page_callback
         self.add_item(next_button)
 
+        rank_button = Button(label="🎯 My Rank",
+                             style=discord.ButtonStyle.primary)
+        rank_button.callback = self.my_rank_callback
+        self.add_item(rank_button)
+
     async def category_callback(self, interaction: discord.Interaction):
         """Handle category selection"""
         # Safely get the selected value
@@ -75,50 +81,51 @@ class LeaderboardView(View):
                 self.page = 0  # Reset to first page on category change
 
         await interaction.response.edit_message(
-            embed=self.create_leaderboard_embed(), view=self)
+            embed=await self.create_leaderboard_embed(), view=self)
 
     async def prev_page_callback(self, interaction: discord.Interaction):
         """Handle previous page button"""
         if self.page > 0:
             self.page -= 1
         await interaction.response.edit_message(
-            embed=self.create_leaderboard_embed(), view=self)
+            embed=await self.create_leaderboard_embed(), view=self)
 
     async def next_page_callback(self, interaction: discord.Interaction):
         """Handle next page button"""
-        total_players = len(self.get_sorted_players())
+        total_players = self.data_manager.leaderboard_size()
         max_pages = (total_players + self.per_page - 1) // self.per_page
 
         if self.page < max_pages - 1:
             self.page += 1
         await interaction.response.edit_message(
-            embed=self.create_leaderboard_embed(), view=self)
+            embed=await self.create_leaderboard_embed(), view=self)
+
+    async def my_rank_callback(self, interaction: discord.Interaction):
+        """Jump to the page with the clicking player's rank"""
+        self.viewer_id = interaction.user.id
+        rank = self.data_manager.player_rank(self.category, self.viewer_id)
+        if rank is None:
+            await interaction.response.send_message(
+                "You're not on the leaderboard yet!", ephemeral=True)
+            return
+
+        self.page = (rank - 1) // self.per_page
+        await interaction.response.edit_message(
+            embed=await self.create_leaderboard_embed(), view=self)
 
-    def get_sorted_players(self) -> List[tuple]:
-        """Get players sorted by the selected category"""
+    def get_page_players(self) -> List[tuple]:
+        """Get the current page of players ranked by the selected category"""
+        start_idx = self.page * self.per_page
         players = []
-        for user_id, player in self.data_manager.players.items():
-            if self.category == "level":
-                value = player.class_level  # Fixed: changed from user_level to class_level
-            elif self.category == "gold":
-                value = player.gold
-            elif self.category == "wins":
-                value = player.wins
-            elif self.category == "pvp_wins":
-                value = player.pvp_wins
-            elif self.category == "dungeons_completed":
-                value = player.dungeons_completed
-            elif self.category == "bosses_defeated":
-                value = player.bosses_defeated
-            else:
-                value = 0
-
-            players.append((user_id, player, value))
-
-        # Sort in descending order by the value
-        return sorted(players, key=operator.itemgetter(2), reverse=True)
-
-    def create_leaderboard_embed(self) -> discord.Embed:
+        for offset, (user_id, value) in enumerate(
+                self.data_manager.leaderboard_page(
+                    self.category, start_idx, start_idx + self.per_page)):
+            player = self.data_manager.get_player_summary(user_id)
+            if player is not None:
+                players.append((start_idx + offset, user_id, player, value))
+        return players
+
+    async def create_leaderboard_embed(self) -> discord.Embed:
         """Create the leaderboard embed"""
         category_display = {
             "level": "Level",
@@ -129,7 +136,9 @@ class LeaderboardView(View):
             "bosses_defeated": "Bosses Defeated"
         }
 
-        sorted_players = self.get_sorted_players()
+        if self.category not in category_display:
+            self.category = "level"
+        page_players = self.get_page_players()
 
         embed = discord.Embed(
             title=
@@ -137,19 +146,19 @@ class LeaderboardView(View):
             description="Top players in the realm!",
             color=discord.Color.gold())
 
-        # Calculate start and end indices for the current page
-        start_idx = self.page * self.per_page
-        end_idx = min(start_idx + self.per_page, len(sorted_players))
-
-        if not sorted_players:
+        if not page_players:
             embed.add_field(name="No Data",
                             value="No players found.",
                             inline=False)
             return embed
 
-        for i in range(start_idx, end_idx):
-            user_id, player, value = sorted_players[i]
+        # Display names for the whole page in one batch
+        names = {}
+        if self.bot:
+            names = await self.bot.name_resolver.resolve(
+                user_id for _, user_id, _, _ in page_players)
 
+        for i, user_id, player, value in page_players:
             # Get medal for top 3
             medal = ""
             if i == 0:
@@ -168,16 +177,9 @@ class LeaderboardView(View):
             else:
                 value_display = str(value)
 
-            # Try to get username from discord, or fall back to player ID
-            username = f"User {user_id}"
-            try:
-                if self.bot:
-                    user = self.bot.get_user(int(user_id))
-                    if user:
-                        username = user.display_name
-            except (ValueError, TypeError, AttributeError):
-                # If there's any error converting user_id or finding the user, just use the ID
-                pass
+            # Fall back to the saved name, then to the player ID
+            username = (names.get(user_id) or player.display_name
+                        or f"User {user_id}")
 
             embed.add_field(
                 name=f"{medal}Rank #{rank}: {username}",
@@ -187,13 +189,16 @@ class LeaderboardView(View):
                 f"**Level:** {player.class_level}",
                 inline=False)
 
-        total_players = len(sorted_players)
+        total_players = self.data_manager.leaderboard_size()
         max_pages = (total_players + self.per_page - 1) // self.per_page
 
-        embed.set_footer(
-            text=
-            f"Page {self.page + 1}/{max_pages} • Total Players: {total_players}"
-        )
+        footer = f"Page {self.page + 1}/{max_pages} • Total Players: {total_players}"
+        if self.viewer_id is not None:
+            viewer_rank = self.data_manager.player_rank(self.category,
+                                                        self.viewer_id)
+            if viewer_rank is not None:
+                footer += f" • Your Rank: #{viewer_rank}"
+        embed.set_footer(text=footer)
         return embed
 
 
@@ -210,7 +215,8 @@ async def leaderboard_command(ctx,
         category = "level"  # Default to level if invalid category
 
     # Pass the bot instance to the view so it can look up usernames
-    view = LeaderboardView(data_manager, category=category.lower(), bot=ctx.bot)
-    embed = view.create_leaderboard_embed()
+    view = LeaderboardView(data_manager, category=category.lower(), bot=ctx.bot,
+                           viewer_id=ctx.author.id)
+    embed = await view.create_leaderboard_embed()
 
     await ctx.send(embed=embed, view=view)
@@ -2,15 +2,16 @@
 Level validation system to ensure players are at the correct level based on their XP
 """
 
-from typing import Dict, Any, Tuple
+import asyncio
+import zlib
+from typing import Dict, Any, Iterable, List, Tuple
 from data_models import PlayerData, DataManager
+from xp_curve import PLAYER_CURVE
 
 # Consistent XP formula to use throughout the game
 def calculate_xp_for_level(level: int) -> int:
     """Calculate XP needed to reach a specific level using the standard formula"""
-    base_xp = 75  # Reduced from 100 to make progression easier
-    level_exponent = 1.35  # Reduced from 1.5 to flatten the curve for high levels
-    return int(base_xp * (level ** level_exponent))
+    return PLAYER_CURVE.exp_for_level(level)
 
 def validate_player_level(player: PlayerData) -> Tuple[bool, int, int]:
     """
@@ -38,13 +39,8 @@ def calculate_total_xp(player: PlayerData) -> int:
     Calculate the total XP a player has accumulated throughout their progression
     This includes XP already "spent" on levels plus their current XP
     """
-    total_xp = player.class_exp
-
-    # Add XP from all previous levels
-    for level in range(1, player.class_level):
-        total_xp += calculate_xp_for_level(level)
-
-    return total_xp
+    # XP from all previous levels comes from the cumulative table
+    return PLAYER_CURVE.total_exp(player.class_level, player.class_exp)
 
 def calculate_level_from_xp(total_xp: int) -> Tuple[int, int]:
     """
@@ -53,26 +49,9 @@ def calculate_level_from_xp(total_xp: int) -> Tuple[int, int]:
     Returns:
         Tuple of (level, remaining_xp)
     """
-    level = 1
-    remaining_xp = total_xp
-
-    # Keep leveling up until we can't anymore
-    while True:
-        xp_needed = calculate_xp_for_level(level)
-
-        if remaining_xp >= xp_needed:
-            remaining_xp -= xp_needed
-            level += 1
-        else:
-            break
-
-    # Enforce maximum level cap if needed
-    MAX_LEVEL = 1000  # Match the cap in the rest of the game
-    if level > MAX_LEVEL:
-        level = MAX_LEVEL
-        remaining_xp = 0
-
-    return level, remaining_xp
+    # Binary search over the cumulative table; past the level cap this is
+    # (PLAYER_CURVE.max_level, 0)
+    return PLAYER_CURVE.level_for_total(total_xp)
 
 def validate_all_players(data_manager: DataManager) -> Dict[int, Tuple[int, int]]:
     """
@@ -83,7 +62,18 @@ def validate_all_players(data_manager: DataManager) -> Dict[int, Tuple[int, int]
     """
     corrections = {}
 
-    for user_id, player in data_manager.players.items():
+    # Find the inconsistent players from the level/exp columns and only load
+    # those
+    population = data_manager.population()
+    candidates = [
+        user_id for user_id, level, exp in zip(
+            population.user_ids, population.columns["class_level"],
+            population.columns["class_exp"])
+        if not level_is_consistent(level, exp)
+    ]
+
+    for user_id in candidates:
+        player = data_manager.get_player(user_id)
         was_corrected, old_level, new_level = validate_player_level(player)
 
         if was_corrected:
@@ -95,6 +85,62 @@ def validate_all_players(data_manager: DataManager) -> Dict[int, Tuple[int, int]
 
     return corrections
 
+def level_is_consistent(level: int, exp: int) -> bool:
+    """Whether level and exp are what validate_player_level() would keep"""
+    return calculate_level_from_xp(PLAYER_CURVE.total_exp(level, exp)) == (level, exp)
+
+def level_stamp(level: int, exp: int) -> int:
+    """
+    Checksum of a validated level and exp under the current XP curve
+
+    A player whose stored level_stamp no longer matches was changed outside
+    add_exp() or last checked against a different curve, and is validated
+    again at the next startup.
+    """
+    return zlib.crc32(f"{PLAYER_CURVE.checksum}:{level}:{exp}".encode())
+
+def _stale_players(summaries: Iterable[Tuple[int, Any]]) -> List[int]:
+    return [user_id
+            for user_id, summary in summaries
+            if summary.level_stamp != level_stamp(summary.class_level,
+                                                  summary.class_exp)]
+
+async def validate_stale_players(data_manager: DataManager,
+                                 batch_size: int = 100,
+                                 pause: float = 0.05) -> Dict[int, Tuple[int, int]]:
+    """
+    Validate only the players whose level_stamp is stale, without blocking
+    the bot
+
+    The stamps are compared from the summaries, so up-to-date players are
+    never loaded: players held in memory on the event loop, the stored ones
+    in a worker thread that reads nothing but storage. Stale players are then
+    validated on the event loop in batches of batch_size, stamped and saved,
+    pause seconds apart.
+
+    Returns:
+        Dictionary mapping player IDs to tuples of (old_level, new_level) for players whose levels were corrected
+    """
+    held = data_manager.held_player_summaries()
+    skip = {user_id for user_id, _ in held}
+    stale = _stale_players(held) + await asyncio.to_thread(
+        lambda: _stale_players(data_manager.iter_stored_summaries(skip)))
+
+    corrections = {}
+    for start in range(0, len(stale), batch_size):
+        for user_id in stale[start:start + batch_size]:
+            player = data_manager.get_player(user_id)
+            was_corrected, old_level, new_level = validate_player_level(player)
+            if was_corrected:
+                corrections[user_id] = (old_level, new_level)
+            player.level_stamp = level_stamp(player.class_level,
+                                             player.class_exp)
+        data_manager.save_data()
+        # Let commands run between batches
+        await asyncio.sleep(pause)
+
+    return corrections
+
 def auto_correct_player_level(player: PlayerData) -> bool:
     """
     Automatically corrects a player's level based on their XP.
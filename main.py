@@ -29,6 +29,8 @@ from achievements import (
     achieve_command,
     ach_command,
     q_command,
+    get_achievement_tracker,
+    get_quest_manager,
 )
 from materials import materials_command, gather_command, tools_command
 from crafting_system import crafting_command, CraftingEntryView
@@ -42,6 +44,8 @@ from encyclopedia import (
 from skill_tree import skill_tree_command, skills_tree_command
 from trading_system import trade_command, t_command, slash_trade
 from leaderboard import leaderboard_command
+from name_resolver import NameResolver
+from scheduler import Scheduler
 from level_validation import validate_player_level, auto_correct_player_level
 from dotenv import load_dotenv
 
@@ -66,6 +70,10 @@ WELCOME_MESSAGE = f"Welcome to {GAME_NAME}"
 # Admin user ID - only this user can use admin commands
 ADMIN_USER_ID = 759434349069860945  # Your user ID for admin permissions
 
+# Seconds between scheduled flushes and between cache compactions
+FLUSH_INTERVAL = 300
+CACHE_COMPACTION_INTERVAL = 3600
+
 
 # Define a custom check for admin commands
 def is_admin():
@@ -163,22 +171,57 @@ bot.remove_command("help")  # Remove default help command
 data_manager = DataManager()
 bot.data_manager = data_manager  # Make it accessible across commands
 
+# Display names for leaderboards and member lists
+bot.name_resolver = NameResolver(bot, data_manager)
 
-@bot.event
-async def on_ready():
-    """Called when the bot is ready to start operating"""
-    print(f"Logged in as {bot.user.name} ({bot.user.id})")
-    print("------")
+# Start listening for achievement progress before any command runs
+get_achievement_tracker(data_manager)
+
+# Time-based upkeep runs from one timer queue, started in on_ready
+bot.scheduler = Scheduler()
+# Quest day/week rollover and event expiry
+get_quest_manager(data_manager).schedule(bot.scheduler)
+# Sweeping flush: players changed in place without being reported are
+# written even if nothing calls save_data()
+bot.scheduler.call_every(FLUSH_INTERVAL,
+                         lambda: data_manager.flush_async(sweep=True), "flush")
+# Drop expired display names from the name cache
+bot.scheduler.call_every(CACHE_COMPACTION_INTERVAL,
+                         bot.name_resolver.purge_expired,
+                         "name cache compaction")
+
+
+@bot.before_invoke
+async def remember_author_name(ctx):
+    """Keep the invoking player's saved display name current"""
+    bot.name_resolver.remember(ctx.author.id, ctx.author.display_name)
 
-    # Validate all player levels to ensure they match their XP
-    from level_validation import validate_all_players
 
-    corrections = validate_all_players(data_manager)
+level_validation_task = None
+
+
+async def validate_player_levels():
+    """Re-check players whose level changed since they were last validated"""
+    from level_validation import validate_stale_players
+
+    try:
+        corrections = await validate_stale_players(data_manager)
+    except Exception as e:
+        print(f"Level validation failed: {e}")
+        return
+
     if corrections:
         print(f"Corrected level inconsistencies for {len(corrections)} players:")
         for user_id, (old_level, new_level) in corrections.items():
             print(f"Player {user_id}: Level {old_level} → {new_level}")
 
+
+@bot.event
+async def on_ready():
+    """Called when the bot is ready to start operating"""
+    print(f"Logged in as {bot.user.name} ({bot.user.id})")
+    print("------")
+
     # Sync slash commands with Discord
     try:
         synced = await bot.tree.sync()
@@ -186,6 +229,19 @@ async def on_ready():
     except Exception as e:
         print(f"Failed to sync commands: {e}")
 
+    # Validate player levels in the background; on_ready runs again after
+    # reconnects, so only one pass runs at a time
+    global level_validation_task
+    if level_validation_task is None or level_validation_task.done():
+        level_validation_task = asyncio.create_task(validate_player_levels())
+
+    # Index item ids for find_item and trades in the background (a no-op
+    # once built)
+    asyncio.create_task(data_manager.build_item_index())
+
+    # Start the scheduled jobs (a no-op after reconnects)
+    bot.scheduler.start()
+
     # Send domain expansion startup scene to a specific channel (preferably welcome or general)
     for guild in bot.guilds:
         # Look for ideal channels first (welcome or general)
@@ -469,11 +525,11 @@ async def p_cmd(ctx, member: discord.Member = None):
 async def check_secret_cutscene(ctx, player_data):
     """Check if player has completed all requirements for the secret cutscene"""
     # Check if player has completed all achievements
-    from achievements import AchievementTracker, QuestManager
+    from achievements import get_achievement_tracker, get_quest_manager
 
     # Create achievement tracker and quest manager
-    achievement_tracker = AchievementTracker(data_manager)
-    quest_manager = QuestManager(data_manager)
+    achievement_tracker = get_achievement_tracker(data_manager)
+    quest_manager = get_quest_manager(data_manager)
 
     # Get all player achievements
     player_achievements = achievement_tracker.get_player_achievements(player_data)
@@ -627,7 +683,7 @@ async def profile_command(ctx, member: discord.Member = None):
 
     # Add equipped items
     equipped_text = "None"
-    equipped_items = [item for item in player.inventory if item.equipped]
+    equipped_items = player.inventory.equipped()
 
     if equipped_items:
         equipped_text = "\n".join(
@@ -639,6 +695,21 @@ async def profile_command(ctx, member: discord.Member = None):
 
     embed.add_field(name="🎒 Equipped Items", value=equipped_text, inline=True)
 
+    # Add collection counts
+    rare_items = sum(
+        player.inventory.rarity_count(rarity)
+        for rarity in ("rare", "epic", "legendary", "mythic")
+    )
+    embed.add_field(
+        name="🗃️ Collection",
+        value=f"**Unique Items:** {player.unique_item_count()}\n"
+        f"**Weapons:** {player.inventory.distinct_names_of_type('weapon')} | "
+        f"**Armor:** {player.inventory.distinct_names_of_type('armor')} | "
+        f"**Accessories:** {player.inventory.distinct_names_of_type('accessory')}\n"
+        f"**Rare or better:** {rare_items}",
+        inline=True,
+    )
+
     # Add dungeon clear info
     dungeon_text = "None cleared yet"
     if player.dungeon_clears:
@@ -883,9 +954,7 @@ async def use_item_command(ctx, *, item_name: str = None):
 
     # If successfully used, remove from inventory
     if success:
-        item_found.quantity -= 1
-        if item_found.quantity <= 0:
-            player.inventory.remove(item_found)
+        player.remove_item(item_found, 1)
 
         # Save player data
         data_manager.save_data()
@@ -1081,7 +1150,15 @@ async def pvp_history_command(ctx):
             else player.pvp_history
         )
 
+        # Opponents' current names, falling back to the name at battle time
+        names = await bot.name_resolver.resolve(
+            battle["opponent_id"] for battle in recent_battles
+            if "opponent_id" in battle)
+
         for battle in reversed(recent_battles):
+            opponent_name = names.get(battle.get("opponent_id"),
+                                      battle.get("opponent_name", "Unknown"))
+
             # Calculate time ago
             battle_time = datetime.datetime.fromisoformat(
                 battle.get("timestamp", datetime.datetime.now().isoformat())
@@ -1097,7 +1174,7 @@ async def pvp_history_command(ctx):
                 )
 
             battles_list.append(
-                f"vs {battle.get('opponent_name', 'Unknown')} (Lvl {battle.get('opponent_level', '?')}) - {time_ago} ago\n   {reward_info}"
+                f"vs {opponent_name} (Lvl {battle.get('opponent_level', '?')}) - {time_ago} ago\n   {reward_info}"
             )
 
         embed.add_field(
@@ -1250,11 +1327,11 @@ async def world_boss_cmd(ctx):
         return
 
     # Import necessary modules
-    from achievements import QuestManager
+    from achievements import get_quest_manager
     import random
 
     # Initialize quest manager
-    quest_manager = QuestManager(data_manager)
+    quest_manager = get_quest_manager(data_manager)
 
     # Get active events
     active_events = quest_manager.get_active_events()
@@ -1758,7 +1835,7 @@ class EnhancedAmountInputModal(discord.ui.Modal):
             color = discord.Color.green()
 
             if self.resource_type == "gold":
-                player.gold += amount
+                player.add_gold(amount)
                 success_message = f"Added **{amount}** gold to {self.target_member.mention}.\nNew balance: **{player.gold}** 💰"
                 title = "💰 Gold Added"
 
@@ -1890,6 +1967,7 @@ class StatsAmountModal(discord.ui.Modal):
                         f"❌ Unable to find stat attribute: {stat_attr}", ephemeral=True
                     )
                     return
+            player.invalidate_stats()
 
             # Save player data
             data_manager.save_data()
@@ -2131,7 +2209,7 @@ async def give_gold_cmd(ctx, member: discord.Member, amount: int):
 
     player = data_manager.get_player(member.id)
     player.add_gold(amount)
-    data_manager.save_data()
+    data_manager.flush()
 
     embed = discord.Embed(
         title="💰 Gold Added",
@@ -2152,7 +2230,7 @@ async def give_xp_cmd(ctx, member: discord.Member, amount: int):
 
     player = data_manager.get_player(member.id)
     leveled_up = player.add_exp(amount)
-    data_manager.save_data()
+    data_manager.flush()
 
     # Create an embed for the XP award
     embed = discord.Embed(
@@ -2918,9 +2996,9 @@ async def balance_cmd(ctx):
 
     # Show achievement points if any
     if hasattr(player, "achievements"):
-        from achievements import AchievementTracker
+        from achievements import get_achievement_tracker
 
-        achievement_tracker = AchievementTracker(data_manager)
+        achievement_tracker = get_achievement_tracker(data_manager)
         points = achievement_tracker.get_player_achievement_points(player)
         if points > 0:
             embed.add_field(
@@ -3630,6 +3708,43 @@ async def sync_command(ctx):
         await ctx.send(f"❌ Error syncing commands: {str(e)}")
 
 
+@bot.command(name="save")
+@commands.check(admin_check)
+async def save_cmd(ctx):
+    """[Admin] Write all pending player and guild changes to disk now"""
+    data_manager.flush(sweep=True)
+    await ctx.send("✅ Player and guild data saved.")
+
+
+@bot.command(name="find_item")
+@commands.check(admin_check)
+async def find_item_cmd(ctx, item_id: str = None):
+    """[Admin] Show who holds an item id, or list item ids held by several players"""
+    if not item_id:
+        duplicates = data_manager.duplicate_item_ids()
+        if not duplicates:
+            await ctx.send("✅ No item id is held by more than one player.")
+            return
+
+        lines = [
+            f"`{dup_id}`: " + ", ".join(f"<@{holder}>" for holder in holders)
+            for dup_id, holders in list(duplicates.items())[:20]
+        ]
+        await ctx.send(f"⚠️ {len(duplicates)} duplicated item ids:\n" +
+                       "\n".join(lines))
+        return
+
+    found = data_manager.find_item(item_id)
+    if not found:
+        await ctx.send(f"❌ No player holds an item with id `{item_id}`.")
+        return
+
+    owner_id, inv_item = found
+    await ctx.send(
+        f"🔎 `{item_id}` is **{inv_item.item.name}** (x{inv_item.quantity}), "
+        f"held by <@{owner_id}>.")
+
+
 @bot.command(name="players", aliases=["playerlist", "pl"])
 async def players_cmd(ctx):
     """[Owner] Show all players who have recently played"""
@@ -3638,38 +3753,47 @@ async def players_cmd(ctx):
         await ctx.send("❌ You don't have permission to use this command.")
         return
 
-    all_players = data_manager.players
+    population = data_manager.population()
 
-    if not all_players:
+    if not len(population):
         await ctx.send("No player data found.")
         return
 
     import datetime
 
     now = datetime.datetime.now()
-    player_rows = []
 
-    for uid, p in all_players.items():
-        name = getattr(p, "name", None) or f"User#{str(uid)[-4:]}"
-        class_name = p.class_name or "No class"
-        level = p.class_level
-        wins = p.wins
+    # Most recently active first, straight from the activity column; an
+    # embed holds 25 fields, one of which is the population summary
+    recent = population.top("last_active", 24)
+    names = await bot.name_resolver.resolve(uid for uid, _ in recent)
 
-        timestamps = []
-        for field in ["last_daily", "last_train", "last_pvp_battle"]:
-            val = getattr(p, field, None)
-            if val:
-                try:
-                    if isinstance(val, str):
-                        timestamps.append(datetime.datetime.fromisoformat(val))
-                    else:
-                        timestamps.append(val)
-                except:
-                    pass
+    embed = discord.Embed(
+        title="👥 Player List",
+        description=f"All registered players ({len(population)} total)",
+        color=discord.Color.dark_purple(),
+    )
 
-        if timestamps:
-            last_seen = max(timestamps)
-            delta = now - last_seen
+    class_counts = sorted(population.class_counts().items(),
+                          key=lambda entry: entry[1], reverse=True)
+    classes = ", ".join(f"{class_name or 'No class'}: {count}"
+                        for class_name, count in class_counts[:10])
+    active_today = population.count("last_active", now.timestamp() - 86400)
+    embed.add_field(
+        name="📈 Population",
+        value=f"**Active (24h):** {active_today} | **Avg Lv:** {population.mean('class_level'):.1f} | "
+        f"**Median Lv:** {population.percentile('class_level', 50)} | "
+        f"**90th pct Lv:** {population.percentile('class_level', 90)}\n**Classes:** {classes}",
+        inline=False,
+    )
+
+    for uid, last_active in recent:
+        p = data_manager.get_player_summary(uid)
+        name = names.get(uid) or p.display_name or f"User#{str(uid)[-4:]}"
+        class_name = p.class_name or "No class"
+
+        if last_active:
+            delta = now - datetime.datetime.fromtimestamp(last_active)
             if delta.days > 0:
                 last_str = f"{delta.days}d ago"
             elif delta.seconds >= 3600:
@@ -3679,34 +3803,11 @@ async def players_cmd(ctx):
             else:
                 last_str = "just now"
         else:
-            last_seen = None
             last_str = "never"
 
-        player_rows.append(
-            (
-                last_seen or datetime.datetime.min,
-                str(uid),
-                name,
-                class_name,
-                level,
-                wins,
-                last_str,
-            )
-        )
-
-    # Sort by most recently active first
-    player_rows.sort(key=lambda x: x[0], reverse=True)
-
-    embed = discord.Embed(
-        title="👥 Player List",
-        description=f"All registered players ({len(player_rows)} total)",
-        color=discord.Color.dark_purple(),
-    )
-
-    for _, uid, name, class_name, level, wins, last_str in player_rows:
         embed.add_field(
             name=f"{name}",
-            value=f"**Class:** {class_name} | **Lv:** {level} | **Wins:** {wins}\n**Last active:** {last_str} | **ID:** `{uid}`",
+            value=f"**Class:** {class_name} | **Lv:** {p.class_level} | **Wins:** {p.wins}\n**Last active:** {last_str} | **ID:** `{uid}`",
             inline=False,
         )
 
@@ -3735,3 +3836,6 @@ if __name__ == "__main__":
 
         # Continue with development tasks without running the bot
         print("\nContinuing with skill tree and trading system development...")
+    finally:
+        # Write out anything still waiting on the write-behind timer
+        data_manager.flush(sweep=True)
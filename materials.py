@@ -1,7 +1,7 @@
 import discord
 from discord.ui import Button, View, Select
 import random
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Tuple
 from data_models import DataManager, PlayerData, Item, InventoryItem
 from user_restrictions import RestrictedView
 
@@ -54,6 +54,8 @@ MATERIAL_RARITIES = {
     },  # Deep purple
 }
 
+_RARITY_RANKS = {rarity: i for i, rarity in enumerate(MATERIAL_RARITIES)}
+
 # Material categories and types
 
 # Define gathering tool categories, types, and efficiency tiers
@@ -773,10 +775,8 @@ def generate_material(level: int, category: str = None) -> Item:
         weights = [1 / (i + 1) for i in range(len(available_tiers))]
         tier_idx = random.choices(available_tiers, weights=weights, k=1)[0]
 
-    # Select material type and base value from the chosen tier
+    # Select material type from the chosen tier
     material_type = category_data["types"][tier_idx]
-    base_value = category_data["base_values"][tier_idx]
-    level_req = category_data["level_ranges"][tier_idx][0]
 
     # Determine rarity with weighted randomization
     rarities = list(MATERIAL_RARITIES.keys())
@@ -785,26 +785,59 @@ def generate_material(level: int, category: str = None) -> Item:
     ]
     rarity = random.choices(rarities, weights=rarity_weights, k=1)[0]
 
-    # Calculate final value based on rarity
-    value = int(base_value * MATERIAL_RARITIES[rarity]["value_multiplier"])
+    return material_item(category, material_type, rarity)
 
-    # Generate item_id
-    import uuid
-    item_id = str(uuid.uuid4())
 
-    # Create the material item
-    material = Item(
-        item_id=item_id,
+def material_item(category: str, material_type: str, rarity: str) -> Item:
+    """Build the Item describing one unit of a material stack"""
+    category_data = MATERIAL_CATEGORIES[category]
+    tier_idx = category_data["types"].index(material_type)
+    base_value = category_data["base_values"][tier_idx]
+
+    # Materials live in PlayerData.materials, so the id only names the stack
+    return Item(
+        item_id=f"material:{category}:{material_type}:{rarity}",
         name=f"{rarity} {material_type}",
         description=
         f"A {rarity.lower()} quality {material_type.lower()} used in crafting.",
         item_type=f"Material:{category}",
         rarity=rarity,
         stats={},  # Materials don't have stats directly
-        level_req=level_req,
-        value=value)
+        level_req=category_data["level_ranges"][tier_idx][0],
+        value=int(base_value * MATERIAL_RARITIES[rarity]["value_multiplier"]))
+
+
+def material_key(material: Item) -> Tuple[str, str, str]:
+    """The (category, type, rarity) stack a material_item() belongs to"""
+    _, category, material_type, rarity = material.item_id.split(":", 3)
+    return category, material_type, rarity
+
 
-    return material
+def rarity_rank(rarity: str) -> int:
+    """Position of a material rarity, from 0 for Common upwards"""
+    return _RARITY_RANKS[rarity]
+
+
+def consume_materials(player: PlayerData, category: str, count: int) -> int:
+    """
+    Remove up to count materials of a category, lowest rarity first
+
+    Returns:
+        The number of materials actually removed
+    """
+    stacks = sorted(
+        ((key, stack) for key, stack in player.materials.items()
+         if key[0] == category),
+        key=lambda entry: rarity_rank(entry[0][2]))
+
+    taken = 0
+    for key, stack in stacks:
+        if taken >= count:
+            break
+        amount = min(stack, count - taken)
+        player.remove_material(*key, amount)
+        taken += amount
+    return taken
 
 
 # Get materials for a specific gathering action based on player level and tool
@@ -954,11 +987,17 @@ class MaterialsView(View):
                 if len(rarities_text) > 3:
                     value_text += "\n..."
 
+                # How many the player holds, over all rarities
+                owned = sum(
+                    self.player.materials.get(
+                        (self.category, material_type, rarity), 0)
+                    for rarity in MATERIAL_RARITIES)
+
                 embed.add_field(
                     name=
                     f"{material_type} (Level {level_range[0]}-{level_range[1]})",
                     value=
-                    f"**Base Value:** {base_value} gold\n**Rarity Values:**\n{value_text}",
+                    f"**Base Value:** {base_value} gold\n**Rarity Values:**\n{value_text}\n**You have:** {owned}",
                     inline=True)
 
             # Add pagination info to footer
@@ -1044,22 +1083,22 @@ class GatheringView(View):
 
         if equipped_tool_name:
             # Find the equipped tool in the player's inventory
-            for inv_item in self.player.inventory:
-                if inv_item.item.name == equipped_tool_name:
-                    # Get the tool tier and type to determine efficiency
-                    for tool_type in GATHERING_TOOLS.get(category, {}).get(
-                            "Tool Types", []):
-                        if tool_type in inv_item.item.name:
-                            # Extract the tier name (e.g., "Copper" from "Copper Pickaxe")
-                            tier_name = inv_item.item.name.replace(
-                                f" {tool_type}", "")
-
-                            # Find the efficiency for this tier
-                            for tier in GATHERING_TOOLS.get(category, {}).get(
-                                    "Tiers", []):
-                                if tier["name"] == tier_name:
-                                    return (inv_item.item.name,
-                                            tier["efficiency"])
+            inv_item = self.player.inventory.find(equipped_tool_name)
+            if inv_item is not None:
+                # Get the tool tier and type to determine efficiency
+                for tool_type in GATHERING_TOOLS.get(category, {}).get(
+                        "Tool Types", []):
+                    if tool_type in inv_item.item.name:
+                        # Extract the tier name (e.g., "Copper" from "Copper Pickaxe")
+                        tier_name = inv_item.item.name.replace(
+                            f" {tool_type}", "")
+
+                        # Find the efficiency for this tier
+                        for tier in GATHERING_TOOLS.get(category, {}).get(
+                                "Tiers", []):
+                            if tier["name"] == tier_name:
+                                return (inv_item.item.name,
+                                        tier["efficiency"])
 
         # If no equipped tool found or if efficiency couldn't be determined, return None
         return None
@@ -1081,20 +1120,9 @@ class GatheringView(View):
         materials = gather_materials(self.player, self.selected_category,
                                      efficiency)
 
-        # Add materials to player inventory
+        # Add materials to the player's material stacks
         for material in materials:
-            # Check if player already has this material (by name)
-            found = False
-            for inv_item in self.player.inventory:
-                if inv_item.item.name == material.name:
-                    inv_item.quantity += 1
-                    found = True
-                    break
-
-            if not found:
-                # Add new material to inventory
-                self.player.inventory.append(
-                    InventoryItem(material, quantity=1, equipped=False))
+            self.player.add_material(*material_key(material))
 
         # Save player data
         self.data_manager.save_data()
@@ -1277,26 +1305,14 @@ class GatheringToolsView(View):
         """Get all player's tools for a category with their efficiencies"""
         tools = []
 
-        for inv_item in self.player.inventory:
-            # Skip if not an item
-            if not hasattr(inv_item, 'item') or not hasattr(
-                    inv_item.item, 'name'):
-                continue
-
-            # Check if this is a tool for the selected category
-            for tool_type in GATHERING_TOOLS.get(category,
-                                                 {}).get("Tool Types", []):
-                if tool_type in inv_item.item.name:
-                    # Extract the tier name (e.g., "Copper" from "Copper Pickaxe")
-                    tier_name = inv_item.item.name.replace(f" {tool_type}", "")
-
-                    # Find the efficiency for this tier
-                    for tier in GATHERING_TOOLS.get(category,
-                                                    {}).get("Tiers", []):
-                        if tier["name"] == tier_name:
-                            tools.append(
-                                (inv_item.item.name, tier["efficiency"]))
-                            break
+        # Look up every tool of the selected category by name
+        # (e.g. "Copper Pickaxe" is the Copper tier of the Pickaxe)
+        for tool_type in GATHERING_TOOLS.get(category,
+                                             {}).get("Tool Types", []):
+            for tier in GATHERING_TOOLS.get(category, {}).get("Tiers", []):
+                for inv_item in self.player.inventory.by_name(
+                        f"{tier['name']} {tool_type}"):
+                    tools.append((inv_item.item.name, tier["efficiency"]))
 
         # Sort by efficiency (highest first)
         return sorted(tools, key=lambda x: x[1], reverse=True)
@@ -1336,6 +1352,7 @@ class GatheringToolsView(View):
                 color=discord.Color.green())
 
         # Save player data
+        self.player.mark_changed()
         self.data_manager.save_data()
 
         # Update UI
@@ -0,0 +1,226 @@
+"""
+Schema versions and one-time migrations for stored player records
+
+Every snapshot records the schema version its player records were written
+with. When DataManager opens a snapshot older than SCHEMA_VERSION it passes
+every record through the migrations below, in order, and writes the result
+back, so PlayerData.from_dict() and to_dict() only ever see current records.
+
+Version 1 is everything written before snapshots were versioned.
+
+To change the record layout: bump SCHEMA_VERSION and append a step that
+upgrades a record from the previous version. Never edit a released step;
+old snapshots still have to go through it unchanged.
+"""
+
+import datetime
+from typing import Dict, Any, Callable, List
+
+SCHEMA_VERSION = 9
+
+
+def _valid_timestamp(value: Any) -> bool:
+    try:
+        datetime.datetime.fromisoformat(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+# Every field a version 2 record carries, with the value used when an older
+# record lacks it
+_V2_DEFAULTS = {
+    "class_name": None,
+    "class_level": 1,
+    "class_exp": 0,
+    "user_level": 1,
+    "user_exp": 0,
+    "gold": 100,
+    "max_gold": 1000000,
+    "cursed_energy": 0,
+    "battle_energy": 100,
+    "max_battle_energy": 100,
+    "energy_training": 0,
+    "unlocked_classes": [],
+    "inventory": [],
+    "equipped_items": {"weapon": None, "armor": None, "accessory": None},
+    "equipped_gathering_tools": {},
+    "achievements": [],
+    "special_abilities": {},
+    "active_effects": {},
+    "training_cooldowns": {},
+    "skill_points": 0,
+    "allocated_stats": {"power": 0, "defense": 0, "speed": 0, "hp": 0},
+    "skill_tree": {},
+    "skill_points_spent": {},
+    "wins": 0,
+    "losses": 0,
+    "last_daily": None,
+    "daily_streak": 0,
+    "last_train": None,
+    "dungeon_clears": {},
+    "skill_cooldowns": {},
+    "technique_grade": "Grade 3",
+    "domain_expansion": None,
+    "pvp_history": [],
+    "pvp_wins": 0,
+    "pvp_losses": 0,
+    "last_pvp_battle": None,
+    "earned_roles": [],
+    "level": 1,
+    "current_hp": 100,
+    "dungeon_damage": 0,
+    "dungeons_completed": 0,
+    "bosses_defeated": 0,
+    "gold_earned": 0,
+    "gold_spent": 0,
+    "training_completed": 0,
+    "advanced_training_completed": 0,
+    "guild_contributions": 0,
+    "guild_dungeons": 0,
+    "class_changes": 0,
+    "daily_claims": 0,
+    "quests_completed": 0,
+    "daily_quests": {},
+    "weekly_quests": {},
+    "long_term_quests": [],
+    "achievement_progress": {},
+    "crafting_skills": []
+}
+
+
+def _v1_to_v2(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold the legacy currency fields into gold, drop unparseable
+    timestamps and give every record the full version 2 field set"""
+    # Currency used to be stored as cursed_energy
+    if "gold" not in record and "cursed_energy" in record:
+        record["gold"] = record["cursed_energy"]
+    if "max_gold" not in record and "max_cursed_energy" in record:
+        record["max_gold"] = record["max_cursed_energy"]
+    record.pop("max_cursed_energy", None)
+
+    for field in ("last_daily", "last_train", "last_pvp_battle"):
+        if not _valid_timestamp(record.get(field)):
+            record[field] = None
+    record["skill_cooldowns"] = {
+        skill_id: timestamp
+        for skill_id, timestamp in (record.get("skill_cooldowns") or {}).items()
+        if _valid_timestamp(timestamp)
+    }
+
+    for field, default in _V2_DEFAULTS.items():
+        if field not in record:
+            # Defaults are shared, so hand each record its own copy
+            record[field] = (default.copy()
+                             if isinstance(default, (dict, list)) else default)
+
+    return record
+
+
+def _v2_to_v3(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Store catalog items in inventories by catalog key"""
+    # Imported here because the catalog is built from the shop modules
+    from item_catalog import intern_record
+
+    for inv_item in record["inventory"]:
+        inv_item["item"] = intern_record(inv_item["item"])
+    return record
+
+
+def _v3_to_v4(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Move gathered materials out of the inventory into counted stacks"""
+    stacks = {}
+    inventory = []
+    for inv_item in record["inventory"]:
+        item = inv_item["item"]
+        item_type = item.get("item_type") or ""
+        if not item_type.startswith("Material:"):
+            inventory.append(inv_item)
+            continue
+
+        # Materials are named "<rarity> <type>"
+        rarity = item["rarity"]
+        material_type = item["name"][len(rarity) + 1:]
+        key = (item_type.split(":", 1)[1], material_type, rarity)
+        stacks[key] = stacks.get(key, 0) + inv_item["quantity"]
+
+    record["inventory"] = inventory
+    record["materials"] = [[*key, count] for key, count in stacks.items()]
+    return record
+
+
+def _v4_to_v5(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the level validation stamp; every player is checked once more"""
+    record["level_stamp"] = None
+    return record
+
+
+def _v5_to_v6(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the last known display name"""
+    record["display_name"] = None
+    return record
+
+
+def _v6_to_v7(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Store earned achievements as a list of ids"""
+    ids = []
+    for achievement in record["achievements"]:
+        # Older records hold full Achievement records
+        if isinstance(achievement, dict):
+            achievement = achievement.get("achievement_id")
+        if achievement and achievement not in ids:
+            ids.append(achievement)
+    record["achievements"] = ids
+    return record
+
+
+def _v7_to_v8(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Store quest progress instead of generated quests. Daily and weekly
+    quests are drawn again from the seeded tables, so their progress for
+    the current day and week starts over."""
+    record["daily_quests"] = {}
+    record["weekly_quests"] = {}
+    record["long_term_quests"] = {
+        quest["id"]: quest["progress"]
+        for quest in record["long_term_quests"]
+        if quest.get("progress")
+    }
+    return record
+
+
+def _v8_to_v9(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Stamp players whose level and exp already agree with the XP curve.
+    _v4_to_v5 cleared every stamp, so otherwise the first validation pass
+    loads and rewrites every player."""
+    # Imported here because level_validation imports data_models
+    from level_validation import level_stamp, level_is_consistent
+
+    level, exp = record["class_level"], record["class_exp"]
+    if record["level_stamp"] is None and level_is_consistent(level, exp):
+        record["level_stamp"] = level_stamp(level, exp)
+    return record
+
+
+# MIGRATIONS[n] upgrades a record from version n + 1 to n + 2
+MIGRATIONS: List[Callable[[Dict[str, Any]], Dict[str, Any]]] = [
+    _v1_to_v2,
+    _v2_to_v3,
+    _v3_to_v4,
+    _v4_to_v5,
+    _v5_to_v6,
+    _v6_to_v7,
+    _v7_to_v8,
+    _v8_to_v9,
+]
+
+
+def migrate_player(record: Dict[str, Any], version: int) -> Dict[str, Any]:
+    """
+    Upgrade a stored player record to SCHEMA_VERSION
+
+    Returns:
+        The upgraded record (the given one, modified in place)
+    """
+    for migration in MIGRATIONS[version - 1:]:
+        record = migration(record)
+    return record
@@ -0,0 +1,189 @@
+"""
+Display-name resolution for leaderboards, rosters and histories
+
+Views that list many players used to call bot.get_user() or fetch_user() once
+per row, falling back to "User <id>" or waiting on the API for every name.
+NameResolver answers from, in order:
+
+    1. its own LRU cache of recently resolved names (entries expire after
+       ttl seconds)
+    2. the gateway's user cache (bot.get_user(), no API call)
+    3. the last-known display name saved on the player record, which is
+       returned at once and refreshed from the API in the background
+    4. fetch_user(), at most max_fetches calls per resolve() and concurrency
+       at a time; ids over the cap are fetched in the background
+
+Names learned from the gateway or the API are saved back on the player record
+(PlayerData.display_name), so the next render after a restart has them too.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import discord
+
+
+class NameResolver:
+
+    # Seconds a resolved name is trusted before it is looked up again
+    TTL = 3600
+
+    # Number of names kept in memory
+    CACHE_SIZE = 10000
+
+    # API calls a single resolve() may wait on, and how many run at once
+    MAX_FETCHES = 10
+    CONCURRENCY = 5
+
+    def __init__(self, bot, data_manager,
+                 ttl: Optional[float] = None,
+                 cache_size: Optional[int] = None):
+        self.bot = bot
+        self.data_manager = data_manager
+        if ttl is None:
+            ttl = float(os.getenv("NAME_CACHE_TTL", self.TTL))
+        if cache_size is None:
+            cache_size = int(os.getenv("NAME_CACHE_SIZE", self.CACHE_SIZE))
+        self.ttl = ttl
+        self.cache_size = cache_size
+
+        # user_id -> (name or None if the user does not exist, expiry),
+        # least recently used first
+        self._cache: 'OrderedDict[int, Tuple[Optional[str], float]]' = OrderedDict()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Ids waiting for a background refresh, and the task working on them
+        self._refresh_ids: Set[int] = set()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _cached(self, user_id: int) -> Tuple[bool, Optional[str]]:
+        """(True, name) for a fresh cache entry, (False, None) otherwise"""
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return False, None
+        if entry[1] < time.monotonic():
+            del self._cache[user_id]
+            return False, None
+        self._cache.move_to_end(user_id)
+        return True, entry[0]
+
+    def _store(self, user_id: int, name: Optional[str]) -> None:
+        self._cache[user_id] = (name, time.monotonic() + self.ttl)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def remember(self, user_id: int, name: str) -> None:
+        """Record a display name seen elsewhere (for example a command author)"""
+        found, cached = self._cached(user_id)
+        if found and cached == name:
+            return
+        self._store(user_id, name)
+        self.data_manager.remember_display_name(user_id, name)
+
+    def purge_expired(self) -> int:
+        """
+        Drop expired cache entries
+
+        Returns:
+            Number of entries dropped
+        """
+        now = time.monotonic()
+        expired = [user_id for user_id, (_, expiry) in self._cache.items()
+                   if expiry < now]
+        for user_id in expired:
+            del self._cache[user_id]
+        return len(expired)
+
+    def cached_name(self, user_id: int) -> Optional[str]:
+        """Best name available without an API call, None if there is none"""
+        found, name = self._cached(user_id)
+        if found:
+            return name
+
+        user = self.bot.get_user(user_id)
+        if user is not None:
+            self.remember(user_id, user.display_name)
+            return user.display_name
+
+        summary = self.data_manager.get_player_summary(user_id)
+        return summary.display_name if summary is not None else None
+
+    async def _fetch(self, user_id: int) -> Optional[str]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.CONCURRENCY)
+        async with self._semaphore:
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.NotFound:
+                # Deleted account - don't ask again until the entry expires
+                self._store(user_id, None)
+                return None
+            except discord.HTTPException as e:
+                print(f"Failed to fetch user {user_id}: {e}")
+                return None
+
+        self.remember(user_id, user.display_name)
+        return user.display_name
+
+    def _schedule_refresh(self, user_ids: Iterable[int]) -> None:
+        self._refresh_ids.update(user_ids)
+        if self._refresh_ids and (self._refresh_task is None
+                                  or self._refresh_task.done()):
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        while self._refresh_ids:
+            batch = [self._refresh_ids.pop()
+                     for _ in range(min(self.MAX_FETCHES,
+                                        len(self._refresh_ids)))]
+            await asyncio.gather(*(self._fetch(user_id) for user_id in batch))
+
+    async def resolve(self, user_ids: Iterable[int],
+                      max_fetches: Optional[int] = None) -> Dict[int, str]:
+        """
+        Look up display names for a render
+
+        Waits on at most max_fetches API calls (default MAX_FETCHES), and only
+        for users with no name on record at all.
+
+        Returns:
+            Dict of user_id -> display name for every user a name was found
+            for; callers supply their own fallback for the rest
+        """
+        if max_fetches is None:
+            max_fetches = self.MAX_FETCHES
+
+        names = {}
+        stale = []
+        missing: List[int] = []
+        for user_id in dict.fromkeys(user_ids):
+            found, name = self._cached(user_id)
+            if found:
+                if name is not None:
+                    names[user_id] = name
+                continue
+
+            user = self.bot.get_user(user_id)
+            if user is not None:
+                self.remember(user_id, user.display_name)
+                names[user_id] = user.display_name
+                continue
+
+            summary = self.data_manager.get_player_summary(user_id)
+            if summary is not None and summary.display_name:
+                names[user_id] = summary.display_name
+                stale.append(user_id)
+            else:
+                missing.append(user_id)
+
+        fetched = await asyncio.gather(
+            *(self._fetch(user_id) for user_id in missing[:max_fetches]))
+        for user_id, name in zip(missing, fetched):
+            if name is not None:
+                names[user_id] = name
+
+        self._schedule_refresh(stale + missing[max_fetches:])
+        return names
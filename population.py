@@ -0,0 +1,175 @@
+"""
+Column store of hot numeric player fields for server-wide scans
+
+Averages, percentiles, top-k queries and class counts over every player used
+to walk one Python object per player to read one or two ints. PopulationStore
+keeps those fields as parallel array.array columns instead (one row per
+player). Column totals are kept up to date on every write, so means cost
+nothing. Percentiles and threshold counts read a sorted copy of the column,
+built on first use and then kept sorted on writes (a bisect and a memmove
+per change), so they are a lookup or a binary search. Top-k and class
+counts are single builtin passes (heapq.nlargest(), Counter()).
+
+DataManager builds the store from the player summaries on first use and
+PlayerData reports every change to a stored field, see
+DataManager.indexed_field_changed().
+"""
+
+import datetime
+import heapq
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Column -> array typecode. last_active is derived from the timestamps below.
+COLUMNS = {
+    "class_level": "q",
+    "class_exp": "q",
+    "gold": "q",
+    "wins": "q",
+    "pvp_wins": "q",
+    "last_active": "d",
+}
+
+# Player fields whose latest value is the player's last activity
+ACTIVITY_FIELDS = ("last_daily", "last_train", "last_pvp_battle")
+
+# Every PlayerData field the store reads
+POPULATION_FIELDS = frozenset(
+    [field for field in COLUMNS if field != "last_active"] +
+    list(ACTIVITY_FIELDS) + ["class_name"])
+
+
+def _timestamp(value: Any) -> float:
+    """Seconds since the epoch of a datetime or ISO string, 0.0 if unset"""
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return 0.0
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    return 0.0
+
+
+class PopulationStore:
+
+    def __init__(self):
+        self.user_ids = array("q")
+        self.columns: Dict[str, array] = {
+            column: array(typecode) for column, typecode in COLUMNS.items()
+        }
+        # Class names are stored as small codes into class_names
+        self.class_codes = array("h")
+        self.class_names: List[Optional[str]] = []
+        self._class_index: Dict[Optional[str], int] = {}
+        self._rows: Dict[int, int] = {}  # user_id -> row
+        # Running sum of every column, see mean()
+        self._totals: Dict[str, Any] = {column: 0 for column in COLUMNS}
+        # Sorted copies of the columns queried so far, see _sorted_column()
+        self._sorted: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._rows
+
+    def _class_code(self, class_name: Optional[str]) -> int:
+        code = self._class_index.get(class_name)
+        if code is None:
+            code = len(self.class_names)
+            self.class_names.append(class_name)
+            self._class_index[class_name] = code
+        return code
+
+    def set_player(self, user_id: int, source: Any) -> None:
+        """Add or overwrite a player's row from a PlayerData or PlayerSummary"""
+        row = self._rows.get(user_id)
+        if row is None:
+            row = len(self.user_ids)
+            self._rows[user_id] = row
+            self.user_ids.append(user_id)
+            for column in self.columns.values():
+                column.append(0)
+            for ordered in self._sorted.values():
+                insort(ordered, 0)
+            self.class_codes.append(0)
+
+        for column in self.columns:
+            if column != "last_active":
+                self._set(column, row, int(getattr(source, column) or 0))
+        self._set("last_active", row, max(
+            _timestamp(getattr(source, field)) for field in ACTIVITY_FIELDS))
+        self.class_codes[row] = self._class_code(source.class_name)
+
+    def _set(self, column: str, row: int, value: Any) -> None:
+        """Write one cell, keeping the total and any sorted copy current"""
+        values = self.columns[column]
+        old = values[row]
+        values[row] = value
+        self._totals[column] += value - old
+        ordered = self._sorted.get(column)
+        if ordered is not None:
+            del ordered[bisect_left(ordered, old)]
+            insort(ordered, value)
+
+    def _sorted_column(self, column: str) -> array:
+        ordered = self._sorted.get(column)
+        if ordered is None:
+            ordered = array(COLUMNS[column], sorted(self.columns[column]))
+            self._sorted[column] = ordered
+        return ordered
+
+    def update(self, user_id: int, field: str, value: Any) -> None:
+        """Copy one changed PlayerData field into the player's row"""
+        row = self._rows.get(user_id)
+        if row is None:
+            return
+        if field in ACTIVITY_FIELDS:
+            # Activity timestamps only move forward
+            timestamp = _timestamp(value)
+            if timestamp > self.columns["last_active"][row]:
+                self._set("last_active", row, timestamp)
+        elif field == "class_name":
+            self.class_codes[row] = self._class_code(value)
+        else:
+            self._set(field, row, int(value or 0))
+
+    def mean(self, column: str) -> Optional[float]:
+        """Average of a column, None if there are no players"""
+        if not self.user_ids:
+            return None
+        return self._totals[column] / len(self.user_ids)
+
+    def percentile(self, column: str, percent: float) -> Optional[float]:
+        """Value below which percent% of a column falls (nearest rank)"""
+        ordered = self._sorted_column(column)
+        if not ordered:
+            return None
+        rank = max(0, min(len(ordered) - 1,
+                          int(round(percent / 100 * (len(ordered) - 1)))))
+        return ordered[rank]
+
+    def top(self, column: str, count: int) -> List[Tuple[int, Any]]:
+        """
+        Players with the highest values in a column
+
+        Returns:
+            List of (user_id, value), highest first
+        """
+        values = self.columns[column]
+        rows = heapq.nlargest(count, range(len(values)),
+                              key=values.__getitem__)
+        return [(self.user_ids[row], values[row]) for row in rows]
+
+    def count(self, column: str, minimum: Any) -> int:
+        """Number of players whose column value is at least minimum"""
+        ordered = self._sorted_column(column)
+        return len(ordered) - bisect_left(ordered, minimum)
+
+    def class_counts(self) -> Dict[Optional[str], int]:
+        """Number of players per class name (None for players without one)"""
+        return {self.class_names[code]: count
+                for code, count in Counter(self.class_codes).items()}
@@ -0,0 +1,204 @@
+"""
+Ranked indexes over player stats for leaderboards
+
+RankedIndex keeps (value, user_id) entries in descending order as a list of
+sorted buckets plus a Fenwick tree over the bucket sizes, so inserting or
+removing a player, finding a player's rank and jumping to a page position
+all cost O(log n), and reading a page then walks page-size entries.
+
+Leaderboards keeps one RankedIndex per leaderboard category. DataManager
+builds it from the player summaries on first use and PlayerData reports
+every change to a ranked field, see DataManager.indexed_field_changed().
+"""
+
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Leaderboard category -> PlayerData field it ranks by
+LEADERBOARD_FIELDS = {
+    "level": "class_level",
+    "gold": "gold",
+    "wins": "wins",
+    "pvp_wins": "pvp_wins",
+    "dungeons_completed": "dungeons_completed",
+    "bosses_defeated": "bosses_defeated",
+}
+
+RANKED_FIELDS = frozenset(LEADERBOARD_FIELDS.values())
+
+# Highest value first; equal values rank by user id
+RankKey = Tuple[int, int]
+
+
+def rank_key(user_id: int, value: int) -> RankKey:
+    return (-value, user_id)
+
+
+class RankedIndex:
+
+    # Buckets are split once they hold twice this many entries
+    LOAD = 500
+
+    def __init__(self, keys: Iterable[RankKey] = ()):
+        keys = sorted(keys)
+        self._buckets: List[List[RankKey]] = [
+            keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)
+        ]
+        self._maxes: List[RankKey] = [bucket[-1] for bucket in self._buckets]
+        self._len = len(keys)
+        self._rebuild_tree()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _rebuild_tree(self) -> None:
+        # 1-based Fenwick tree over bucket sizes
+        tree = [0] + [len(bucket) for bucket in self._buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _tree_add(self, bucket_index: int, delta: int) -> None:
+        i = bucket_index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _entries_before(self, bucket_index: int) -> int:
+        """Number of entries in the buckets before bucket_index"""
+        total = 0
+        i = bucket_index
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, position: int) -> Tuple[int, int]:
+        """Bucket index and offset in it of the entry at position"""
+        bucket_index = 0
+        step = 1 << (len(self._tree).bit_length() - 1)
+        while step:
+            i = bucket_index + step
+            if i < len(self._tree) and self._tree[i] <= position:
+                bucket_index = i
+                position -= self._tree[i]
+            step >>= 1
+        return bucket_index, position
+
+    def add(self, key: RankKey) -> None:
+        if not self._buckets:
+            self._buckets.append([key])
+            self._maxes.append(key)
+            self._len = 1
+            self._rebuild_tree()
+            return
+
+        bucket_index = min(bisect_left(self._maxes, key),
+                           len(self._buckets) - 1)
+        bucket = self._buckets[bucket_index]
+        insort(bucket, key)
+        self._maxes[bucket_index] = bucket[-1]
+        self._len += 1
+
+        if len(bucket) > 2 * self.LOAD:
+            self._buckets.insert(bucket_index + 1, bucket[self.LOAD:])
+            del bucket[self.LOAD:]
+            self._maxes.insert(bucket_index, bucket[-1])
+            self._rebuild_tree()
+        else:
+            self._tree_add(bucket_index, 1)
+
+    def remove(self, key: RankKey) -> None:
+        """Remove key; raises ValueError if it is not in the index"""
+        bucket_index = bisect_left(self._maxes, key)
+        if bucket_index == len(self._buckets):
+            raise ValueError(f"{key} is not ranked")
+        bucket = self._buckets[bucket_index]
+        offset = bisect_left(bucket, key)
+        if offset == len(bucket) or bucket[offset] != key:
+            raise ValueError(f"{key} is not ranked")
+
+        del bucket[offset]
+        self._len -= 1
+        if bucket:
+            self._maxes[bucket_index] = bucket[-1]
+            self._tree_add(bucket_index, -1)
+        else:
+            del self._buckets[bucket_index]
+            del self._maxes[bucket_index]
+            self._rebuild_tree()
+
+    def position(self, key: RankKey) -> int:
+        """0-based position key has or would have in the ranking"""
+        bucket_index = bisect_left(self._maxes, key)
+        if bucket_index == len(self._buckets):
+            return self._len
+        return (self._entries_before(bucket_index) +
+                bisect_left(self._buckets[bucket_index], key))
+
+    def page(self, start: int, stop: int) -> List[RankKey]:
+        """Entries from position start up to (not including) stop"""
+        start = max(start, 0)
+        stop = min(stop, self._len)
+        if start >= stop:
+            return []
+
+        bucket_index, offset = self._locate(start)
+        entries = []
+        while len(entries) < stop - start:
+            bucket = self._buckets[bucket_index]
+            entries.extend(bucket[offset:offset + stop - start - len(entries)])
+            bucket_index += 1
+            offset = 0
+        return entries
+
+
+class Leaderboards:
+
+    def __init__(self, values: Dict[str, Dict[int, int]]):
+        """values maps each ranked field to {user_id: value}"""
+        self._values = {field: dict(values.get(field, {}))
+                        for field in RANKED_FIELDS}
+        self._indexes = {
+            field: RankedIndex(rank_key(user_id, value)
+                               for user_id, value in field_values.items())
+            for field, field_values in self._values.items()
+        }
+
+    def update(self, user_id: int, field: str, value: int) -> None:
+        """Move a player to their new place in the ranking by field"""
+        field_values = self._values[field]
+        old_value = field_values.get(user_id)
+        if old_value == value:
+            return
+
+        index = self._indexes[field]
+        if old_value is not None:
+            index.remove(rank_key(user_id, old_value))
+        index.add(rank_key(user_id, value))
+        field_values[user_id] = value
+
+    def size(self) -> int:
+        return len(self._indexes["class_level"])
+
+    def page(self, category: str, start: int,
+             stop: int) -> List[Tuple[int, int]]:
+        """
+        Players ranked start to stop (0-based, stop excluded) in a category
+
+        Returns:
+            List of (user_id, value), best first
+        """
+        index = self._indexes[LEADERBOARD_FIELDS[category]]
+        return [(user_id, -negated)
+                for negated, user_id in index.page(start, stop)]
+
+    def rank(self, category: str, user_id: int) -> Optional[int]:
+        """1-based rank of a player in a category, None if not ranked"""
+        field = LEADERBOARD_FIELDS[category]
+        value = self._values[field].get(user_id)
+        if value is None:
+            return None
+        return self._indexes[field].position(rank_key(user_id, value)) + 1
@@ -0,0 +1,129 @@
+"""
+Timer queue for the bot's time-based maintenance
+
+Event expiry, the daily quest rollover, periodic flushes and cache
+compaction used to be checked lazily wherever the state happened to be read,
+so every read paid for the check (QuestManager parsed every event's end time
+each time it was created). Scheduler keeps every job in one min-heap ordered
+by due time and a single task sleeps until the earliest job is due, so each
+job runs once at its due time and the read paths only look state up.
+
+Due times are wall-clock seconds (time.time()), since the game's deadlines
+are dates: event end times and local midnight.
+"""
+
+import asyncio
+import heapq
+import inspect
+import itertools
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class Job:
+
+    __slots__ = ("when", "callback", "interval", "name", "cancelled")
+
+    def __init__(self, when: float, callback: Callable[[], Any],
+                 interval: Optional[float], name: str):
+        self.when = when
+        self.callback = callback
+        self.interval = interval  # None for one-shot jobs
+        self.name = name
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Drop the job; it is discarded when it reaches the front"""
+        self.cancelled = True
+
+
+class Scheduler:
+
+    # Longest single sleep in seconds, so wall clock changes are noticed
+    MAX_SLEEP = 60.0
+
+    def __init__(self):
+        # (when, insertion order, job); the order keeps ties first in first out
+        self._queue: List[Tuple[float, int, Job]] = []
+        self._order = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return sum(1 for _, _, job in self._queue if not job.cancelled)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _push(self, job: Job) -> None:
+        earliest = self._queue[0][0] if self._queue else None
+        heapq.heappush(self._queue, (job.when, next(self._order), job))
+        # Wake the runner if it is sleeping towards a later job
+        if self._wakeup is not None and (earliest is None
+                                         or job.when < earliest):
+            self._wakeup.set()
+
+    def call_at(self, when: float, callback: Callable[[], Any],
+                name: str = "job") -> Job:
+        """Run callback once at when (seconds since the epoch)"""
+        job = Job(when, callback, None, name)
+        self._push(job)
+        return job
+
+    def call_later(self, delay: float, callback: Callable[[], Any],
+                   name: str = "job") -> Job:
+        """Run callback once after delay seconds"""
+        return self.call_at(time.time() + delay, callback, name)
+
+    def call_every(self, interval: float, callback: Callable[[], Any],
+                   name: str = "job", first: Optional[float] = None) -> Job:
+        """Run callback every interval seconds, first at first (default: one
+        interval from now)"""
+        if first is None:
+            first = time.time() + interval
+        job = Job(first, callback, interval, name)
+        self._push(job)
+        return job
+
+    def start(self) -> None:
+        """Start running jobs on the current event loop; no-op if running"""
+        if not self.running:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            now = time.time()
+            while self._queue and self._queue[0][0] <= now:
+                _, _, job = heapq.heappop(self._queue)
+                if job.cancelled:
+                    continue
+                await self._fire(job)
+                if job.interval is not None and not job.cancelled:
+                    # Skip runs missed while the loop was busy rather than
+                    # running them back to back
+                    job.when = max(job.when + job.interval, time.time())
+                    self._push(job)
+
+            delay = self.MAX_SLEEP
+            if self._queue:
+                delay = min(delay, self._queue[0][0] - time.time())
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), max(delay, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, job: Job) -> None:
+        try:
+            result = job.callback()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"Scheduled job {job.name} failed: {e}")
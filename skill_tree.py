@@ -282,6 +282,7 @@ class SkillTreeView(View):
 
         # Apply the skill point
         self.player_data.skill_tree[self.current_tree][node_name] = current_level + 1
+        self.player_data.invalidate_stats()
         self.player_data.skill_points -= 1
         self.player_data.skill_points_spent[self.current_tree] = self.player_data.skill_points_spent.get(self.current_tree, 0) + 1
 
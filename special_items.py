@@ -7,6 +7,7 @@ from typing import Dict, List, Optional, Tuple, Any
 
 from data_models import PlayerData, DataManager, Item, InventoryItem
 from utils import GAME_CLASSES, ADVANCED_CLASSES, STARTER_CLASSES
+from item_catalog import catalog_key, create_item
 
 # Special transformation items that can change character abilities
 TRANSFORMATION_ITEMS = {
@@ -123,33 +124,24 @@ def generate_special_item_id() -> str:
 
 def create_transformation_item(item_name: str) -> Item:
     """Create a transformation item"""
-    item_data = TRANSFORMATION_ITEMS[item_name]
-
-    return Item(
-        item_id=generate_special_item_id(),
-        name=item_name,
-        description=item_data["description"],
-        item_type="special",
-        rarity=item_data["rarity"],
-        stats=item_data.get("stats_boost", {}),
-        level_req=item_data["level_req"],
-        value=item_data["value"]
-    )
+    return create_item(catalog_key("transformation", item_name),
+                       generate_special_item_id())
 
 def create_special_consumable(item_name: str) -> Item:
     """Create a special consumable item"""
-    item_data = SPECIAL_CONSUMABLES[item_name]
-
-    return Item(
-        item_id=generate_special_item_id(),
-        name=item_name,
-        description=item_data["description"],
-        item_type="special_consumable",
-        rarity=item_data["rarity"],
-        stats={},  # consumables don't have permanent stat boosts
-        level_req=item_data["level_req"],
-        value=item_data["value"]
-    )
+    return create_item(catalog_key("consumable", item_name),
+                       generate_special_item_id())
+
+def create_special_reward_item(item_name: str, source: str) -> Item:
+    """Create a keepsake item awarded by an achievement or quest"""
+    return Item(item_id=generate_special_item_id(),
+                name=item_name,
+                description=f"Awarded for {source}",
+                item_type="special",
+                rarity="legendary",
+                stats={},
+                level_req=1,
+                value=0)
 
 class SpecialItemView(View):
     def __init__(self, player_data: PlayerData, item_name: str, data_manager: DataManager):
@@ -204,7 +196,7 @@ class SpecialItemView(View):
             return
 
         # Check if the player already has this special ability
-        player_abilities = self.player_data.__dict__.get("special_abilities", {})
+        player_abilities = self.player_data.special_abilities
         if item_data["ability_name"] in player_abilities:
             await interaction.response.send_message(
                 f"❌ You already know the {item_data['ability_name']} ability!",
@@ -239,6 +231,7 @@ class SpecialItemView(View):
                     self.player_data.allocated_stats[stat] += boost
                 else:
                     self.player_data.allocated_stats[stat] = boost
+            self.player_data.invalidate_stats()
 
             # Add special ability
             self.player_data.special_abilities[item_data["ability_name"]] = {
@@ -249,13 +242,9 @@ class SpecialItemView(View):
             }
 
             # Remove the item from inventory
-            for i, inv_item in enumerate(self.player_data.inventory):
-                if inv_item.item.name == self.item_name:
-                    if inv_item.quantity > 1:
-                        inv_item.quantity -= 1
-                    else:
-                        self.player_data.inventory.pop(i)
-                    break
+            inv_item = self.player_data.inventory.find(self.item_name)
+            if inv_item is not None:
+                self.player_data.remove_item(inv_item, 1)
 
             # Save player data
             self.data_manager.save_data()
@@ -364,15 +353,12 @@ class SpecialItemView(View):
                 "ally_power": item_data.get("ally_power", 0),
                 "chance": item_data.get("chance", 0)
             }
+            self.player_data.invalidate_stats()
 
             # Remove the item from inventory
-            for i, inv_item in enumerate(self.player_data.inventory):
-                if inv_item.item.name == self.item_name:
-                    if inv_item.quantity > 1:
-                        inv_item.quantity -= 1
-                    else:
-                        self.player_data.inventory.pop(i)
-                    break
+            inv_item = self.player_data.inventory.find(self.item_name)
+            if inv_item is not None:
+                self.player_data.remove_item(inv_item, 1)
 
             # Save player data
             self.data_manager.save_data()
@@ -552,14 +538,8 @@ async def special_items_command(ctx, data_manager: DataManager):
         return
 
     # Get special items from inventory
-    special_items = []
-    special_consumables = []
-
-    for inv_item in player_data.inventory:
-        if inv_item.item.item_type == "special":
-            special_items.append(inv_item)
-        elif inv_item.item.item_type == "special_consumable":
-            special_consumables.append(inv_item)
+    special_items = player_data.inventory.by_type("special")
+    special_consumables = player_data.inventory.by_type("special_consumable")
 
     # Create embed for special items
     embed = discord.Embed(
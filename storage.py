@@ -0,0 +1,727 @@
+"""
+Storage backends for DataManager
+
+JsonStorage keeps everything in a single player_data.json document, plus a
+log of the records changed since it was last rewritten.
+SQLiteStorage keeps one row per player and per guild in player_data.db, so a
+single player can be read or written without touching the rest.
+BinaryStorage keeps a compact binary snapshot in player_data.bin, plus a
+log of the records changed since it was last rewritten.
+
+Each backend encodes records its own way; DataManager only compares and
+passes around whatever encode_record() returns.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, Iterator, Optional, Tuple, Union
+
+from binary_format import (encode_value, decode_value, pack_snapshot,
+                           unpack_snapshot, pack_changes, unpack_changes,
+                           MAGIC)
+
+JSON_PATH = 'player_data.json'
+SQLITE_PATH = 'player_data.db'
+BINARY_PATH = 'player_data.bin'
+
+# Fields (with defaults) copied out of every player record so population-wide
+# views such as leaderboards can run without loading each player
+SUMMARY_FIELDS = {
+    "class_name": None,
+    "display_name": None,
+    "class_level": 1,
+    "class_exp": 0,
+    "level_stamp": None,
+    "gold": 100,
+    "wins": 0,
+    "pvp_wins": 0,
+    "dungeons_completed": 0,
+    "bosses_defeated": 0,
+    "last_daily": None,
+    "last_train": None,
+    "last_pvp_battle": None
+}
+
+
+def summarize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a stored player record down to SUMMARY_FIELDS"""
+    return {
+        field: record.get(field, default)
+        for field, default in SUMMARY_FIELDS.items()
+    }
+
+
+def atomic_write(path: str, content: Union[str, bytes]) -> None:
+    """Replace a file's content so readers only ever see the old or new version"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb' if isinstance(content, bytes) else 'w') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class JsonStorage:
+    """Whole-document storage in player_data.json
+
+    The document is parsed once at startup and each player is kept as its
+    encoded record until first requested. A commit appends only the records
+    changed since the last one to player_data.json.delta, one JSON line per
+    commit, which load() applies on top of the document. Once the log
+    outgrows the document the cached encodings are joined back into a new
+    document and the log starts over, so writes stay proportional to the
+    changes.
+    """
+
+    def __init__(self, path: str = JSON_PATH):
+        self.path = path
+        self.delta_path = f"{path}.delta"
+        self.player_records: Dict[int, str] = {}
+        self.player_summaries: Dict[int, Dict[str, Any]] = {}
+        self.guild_records: Dict[str, str] = {}
+        self.member_map_record = "{}"
+        self.journal_seq = 0
+        self.schema_version = 1
+
+        # Changes since the last commit, None for removed records
+        self._changed_players: Dict[int, Optional[str]] = {}
+        self._changed_guilds: Dict[str, Optional[str]] = {}
+        self._member_map_changed = False
+        # Sizes deciding when the log is folded into the document; a store
+        # that was never loaded writes a full document on its first commit
+        self._document_size = 0
+        self._delta_size = 0
+
+        if not os.path.exists(self.path):
+            with open(self.path, 'w') as f:
+                json.dump({}, f)
+
+    def _read_delta(self, data: Dict[str, Any]) -> None:
+        """Apply the logged commits to a loaded document, in order"""
+        if not os.path.exists(self.delta_path):
+            return
+
+        with open(self.delta_path, 'r+') as f:
+            for line in iter(f.readline, ''):
+                try:
+                    if not line.endswith("\n"):
+                        raise ValueError("incomplete line")
+                    change = json.loads(line)
+                except ValueError:
+                    # A commit cut short by a crash, and the last line
+                    # written. Cut it off so later commits start cleanly.
+                    f.seek(f.tell() - len(line.encode()))
+                    f.truncate()
+                    break
+                for field in ("players", "guilds"):
+                    for key, record in change[field].items():
+                        if record is None:
+                            data[field].pop(key, None)
+                        else:
+                            data[field][key] = record
+                if "member_guild_map" in change:
+                    data["member_guild_map"] = change["member_guild_map"]
+                data["journal_seq"] = change["journal_seq"]
+                data["schema_version"] = change["schema_version"]
+                self._delta_size += len(line)
+
+    def load(self) -> Dict[str, Any]:
+        """Read the whole document, accepting both the old and new layouts"""
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+
+        if isinstance(data, dict) and "players" in data:
+            data = {
+                "players": data.get("players", {}),
+                "guilds": data.get("guilds", {}),
+                "member_guild_map": data.get("member_guild_map", {}),
+                "journal_seq": data.get("journal_seq", 0),
+                "schema_version": data.get("schema_version", 1)
+            }
+        else:
+            # Old format - only player data
+            data = {
+                "players": data,
+                "guilds": {},
+                "member_guild_map": {},
+                "journal_seq": 0,
+                "schema_version": 1
+            }
+
+        self._document_size = os.path.getsize(self.path)
+        self._delta_size = 0
+        self._read_delta(data)
+
+        # Seed the record cache so untouched records are written back as-is
+        self.player_records = {
+            int(user_id): json.dumps(record, separators=(",", ":"))
+            for user_id, record in data["players"].items()
+        }
+        self.player_summaries = {
+            int(user_id): summarize_record(record)
+            for user_id, record in data["players"].items()
+        }
+        self.guild_records = {
+            name: json.dumps(record, separators=(",", ":"))
+            for name, record in data["guilds"].items()
+        }
+        self.member_map_record = json.dumps(data["member_guild_map"],
+                                            separators=(",", ":"))
+        self.journal_seq = data["journal_seq"]
+        self.schema_version = data["schema_version"]
+
+        return data
+
+    @staticmethod
+    def encode_record(record: Any) -> str:
+        return json.dumps(record, separators=(",", ":"))
+
+    @staticmethod
+    def decode_record(encoded: str) -> Any:
+        return json.loads(encoded)
+
+    def player_count(self) -> int:
+        return len(self.player_records)
+
+    def load_player(self, user_id: int) -> Optional[str]:
+        return self.player_records.get(user_id)
+
+    def iter_player_rows(self) -> Iterator[Tuple[int, str]]:
+        yield from list(self.player_records.items())
+
+    def load_summary(self, user_id: int) -> Optional[Dict[str, Any]]:
+        return self.player_summaries.get(user_id)
+
+    def iter_summaries(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        yield from list(self.player_summaries.items())
+
+    def put_player(self, user_id: int, record: Optional[str],
+                   summary: Optional[Dict[str, Any]] = None) -> None:
+        if record is None:
+            self.player_records.pop(user_id, None)
+            self.player_summaries.pop(user_id, None)
+        else:
+            self.player_records[user_id] = record
+            self.player_summaries[user_id] = summary
+        self._changed_players[user_id] = record
+
+    def put_guild(self, guild_name: str, record: Optional[str]) -> None:
+        if record is None:
+            self.guild_records.pop(guild_name, None)
+        else:
+            self.guild_records[guild_name] = record
+        self._changed_guilds[guild_name] = record
+
+    def put_member_map(self, member_map: Dict[int, str]) -> None:
+        self.member_map_record = json.dumps(
+            {str(k): v for k, v in member_map.items()},
+            separators=(",", ":"))
+        self._member_map_changed = True
+
+    def set_journal_seq(self, seq: int) -> None:
+        """Record the last journal entry included in the next commit"""
+        self.journal_seq = seq
+
+    def set_schema_version(self, version: int) -> None:
+        """Record the schema version of the player records, see migrations.py"""
+        self.schema_version = version
+
+    def commit(self) -> None:
+        """Log the changed records, or rewrite the document once the log has
+        grown larger than it"""
+        if self._delta_size >= self._document_size:
+            self._write_document()
+        else:
+            self._append_delta()
+
+        self._changed_players = {}
+        self._changed_guilds = {}
+        self._member_map_changed = False
+
+    def _append_delta(self) -> None:
+        """Append one line holding the changes since the last commit
+
+        The line is fsynced before commit() returns; a line cut short by a
+        crash is ignored on load.
+        """
+        players = ",".join(
+            f'"{user_id}":{"null" if record is None else record}'
+            for user_id, record in self._changed_players.items())
+        guilds = ",".join(
+            f'{json.dumps(name)}:{"null" if record is None else record}'
+            for name, record in self._changed_guilds.items())
+        parts = ['{"players":{', players, '},"guilds":{', guilds, '}']
+        if self._member_map_changed:
+            parts += [',"member_guild_map":', self.member_map_record]
+        parts += [',"journal_seq":', str(self.journal_seq),
+                  ',"schema_version":', str(self.schema_version), '}\n']
+        line = ''.join(parts)
+
+        with open(self.delta_path, 'a') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._delta_size += len(line)
+
+    def _write_document(self) -> None:
+        """Write the cached records out as a new document, one record per line
+
+        The document is written to a temporary file, fsynced and renamed over
+        the old one, so a crash mid-write never leaves a truncated file. The
+        log is removed afterwards; if a crash keeps it, replaying it over the
+        new document changes nothing.
+        """
+        players = ",\n".join(f'"{user_id}":{record}'
+                             for user_id, record in self.player_records.items())
+        guilds = ",\n".join(f'{json.dumps(name)}:{record}'
+                            for name, record in self.guild_records.items())
+
+        atomic_write(self.path, ''.join([
+            '{"players":{\n', players, '\n},\n"guilds":{\n', guilds,
+            '\n},\n"member_guild_map":', self.member_map_record,
+            ',\n"journal_seq":', str(self.journal_seq),
+            ',\n"schema_version":', str(self.schema_version), '}\n'
+        ]))
+        self._document_size = os.path.getsize(self.path)
+
+        if os.path.exists(self.delta_path):
+            os.remove(self.delta_path)
+        self._delta_size = 0
+
+
+class SQLiteStorage:
+    """Row-per-record storage in a WAL-mode SQLite database
+
+    Guilds and the member -> guild map are loaded up front; players are read
+    one row at a time as they are requested. Writes go through self.conn on
+    the save worker thread, reads through a connection per reading thread so
+    they never wait on a write in progress or share a cursor across threads.
+    """
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS players (
+                user_id INTEGER PRIMARY KEY,
+                data TEXT NOT NULL,
+                summary TEXT
+            );
+            CREATE TABLE IF NOT EXISTS guilds (
+                name TEXT PRIMARY KEY,
+                data TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS member_guild_map (
+                user_id INTEGER PRIMARY KEY,
+                guild_name TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        self._add_summary_column()
+        self.conn.commit()
+        self._readers = threading.local()
+
+    @property
+    def read_conn(self) -> sqlite3.Connection:
+        """The calling thread's read connection, opened on first use"""
+        conn = getattr(self._readers, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            self._readers.conn = conn
+        return conn
+
+    def _add_summary_column(self) -> None:
+        """Upgrade databases created before players had a summary column"""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(players)")]
+        if "summary" in columns:
+            return
+
+        self.conn.execute("ALTER TABLE players ADD COLUMN summary TEXT")
+        rows = self.conn.execute("SELECT user_id, data FROM players").fetchall()
+        self.conn.executemany(
+            "UPDATE players SET summary = ? WHERE user_id = ?",
+            [(json.dumps(summarize_record(json.loads(data))), user_id)
+             for user_id, data in rows])
+
+    def is_empty(self) -> bool:
+        for table in ("players", "guilds"):
+            if self.conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone():
+                return False
+        return True
+
+    def load(self) -> Dict[str, Any]:
+        """Load guilds and the member map. Players are fetched on demand."""
+        guilds = {
+            name: json.loads(data)
+            for name, data in self.conn.execute("SELECT name, data FROM guilds")
+        }
+        member_map = {
+            user_id: guild_name
+            for user_id, guild_name in self.conn.execute(
+                "SELECT user_id, guild_name FROM member_guild_map")
+        }
+        meta = dict(self.conn.execute("SELECT key, value FROM meta"))
+
+        return {
+            "players": {},
+            "guilds": guilds,
+            "member_guild_map": member_map,
+            "journal_seq": int(meta.get("journal_seq", 0)),
+            "schema_version": int(meta.get("schema_version", 1))
+        }
+
+    encode_record = staticmethod(JsonStorage.encode_record)
+    decode_record = staticmethod(JsonStorage.decode_record)
+
+    def player_count(self) -> int:
+        return self.read_conn.execute("SELECT COUNT(*) FROM players").fetchone()[0]
+
+    def load_player(self, user_id: int) -> Optional[str]:
+        row = self.read_conn.execute(
+            "SELECT data FROM players WHERE user_id = ?",
+            (user_id, )).fetchone()
+        return row[0] if row else None
+
+    def iter_player_rows(self) -> Iterator[Tuple[int, str]]:
+        yield from self.read_conn.execute("SELECT user_id, data FROM players")
+
+    def load_summary(self, user_id: int) -> Optional[Dict[str, Any]]:
+        row = self.read_conn.execute(
+            "SELECT summary FROM players WHERE user_id = ?",
+            (user_id, )).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_summaries(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        for user_id, summary in self.read_conn.execute(
+                "SELECT user_id, summary FROM players"):
+            yield user_id, json.loads(summary)
+
+    def put_player(self, user_id: int, record: Optional[str],
+                   summary: Optional[Dict[str, Any]] = None) -> None:
+        if record is None:
+            self.conn.execute("DELETE FROM players WHERE user_id = ?",
+                              (user_id, ))
+        else:
+            self.conn.execute(
+                "INSERT INTO players (user_id, data, summary) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET "
+                "data = excluded.data, summary = excluded.summary",
+                (user_id, record, json.dumps(summary)))
+
+    def put_guild(self, guild_name: str, record: Optional[str]) -> None:
+        if record is None:
+            self.conn.execute("DELETE FROM guilds WHERE name = ?",
+                              (guild_name, ))
+        else:
+            self.conn.execute(
+                "INSERT INTO guilds (name, data) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data",
+                (guild_name, record))
+
+    def put_member_map(self, member_map: Dict[int, str]) -> None:
+        self.conn.execute("DELETE FROM member_guild_map")
+        self.conn.executemany(
+            "INSERT INTO member_guild_map (user_id, guild_name) VALUES (?, ?)",
+            [(int(k), v) for k, v in member_map.items()])
+
+    def _set_meta(self, key: str, value: int) -> None:
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value)))
+
+    def set_journal_seq(self, seq: int) -> None:
+        self._set_meta("journal_seq", seq)
+
+    def set_schema_version(self, version: int) -> None:
+        self._set_meta("schema_version", version)
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def import_json(self, json_path: str = JSON_PATH) -> int:
+        """
+        Import an existing player_data.json into the database
+
+        Returns:
+            The number of players imported
+        """
+        data = JsonStorage(json_path).load()
+
+        for user_id, record in data["players"].items():
+            self.put_player(int(user_id),
+                            json.dumps(record, separators=(",", ":")),
+                            summarize_record(record))
+        for guild_name, record in data["guilds"].items():
+            self.put_guild(guild_name,
+                           json.dumps(record, separators=(",", ":")))
+        self.put_member_map(data["member_guild_map"])
+        self.set_journal_seq(data["journal_seq"])
+        self.set_schema_version(data["schema_version"])
+        self.commit()
+
+        return len(data["players"])
+
+
+class BinaryStorage:
+    """Compact binary snapshot in player_data.bin, see binary_format.py
+
+    The file is read with a single buffered read. Player records stay
+    encoded (as slices of that buffer) until first requested; only the small
+    per-player summaries are decoded up front when a view asks for them.
+    Like JsonStorage, a commit appends only the changed records to
+    player_data.bin.delta, and the snapshot is rewritten once that log
+    outgrows it.
+    """
+
+    def __init__(self, path: str = BINARY_PATH):
+        self.path = path
+        self.delta_path = f"{path}.delta"
+        self.player_records: Dict[int, Any] = {}
+        self.player_summaries: Dict[int, Any] = {}
+        self.guild_records: Dict[str, Any] = {}
+        self.member_map_record = encode_value({})
+        self.journal_seq = 0
+        self.schema_version = 1
+
+        # Changes since the last commit, None for removed records
+        self._changed_players: Dict[int, Optional[Tuple[bytes, bytes]]] = {}
+        self._changed_guilds: Dict[str, Optional[bytes]] = {}
+        self._member_map_changed = False
+        # Sizes deciding when the log is folded into the snapshot, as in
+        # JsonStorage
+        self._document_size = 0
+        self._delta_size = 0
+
+    def encode_record(self, record: Any) -> bytes:
+        return encode_value(record)
+
+    def decode_record(self, encoded: Any) -> Any:
+        return decode_value(encoded)
+
+    def _read_delta(self) -> None:
+        """Apply the logged commits on top of the loaded snapshot, in order"""
+        if not os.path.exists(self.delta_path):
+            return
+
+        with open(self.delta_path, 'r+b') as f:
+            data = f.read()
+            entries, intact = unpack_changes(data)
+            if intact < len(data):
+                # A commit cut short by a crash, and the last one written.
+                # Cut it off so later commits start cleanly.
+                f.truncate(intact)
+
+        for players, guilds, member_map, journal_seq, schema_version in entries:
+            for user_id, stored in players.items():
+                if stored is None:
+                    self.player_records.pop(user_id, None)
+                    self.player_summaries.pop(user_id, None)
+                else:
+                    (self.player_records[user_id],
+                     self.player_summaries[user_id]) = stored
+            for name, record in guilds.items():
+                if record is None:
+                    self.guild_records.pop(name, None)
+                else:
+                    self.guild_records[name] = record
+            if member_map is not None:
+                self.member_map_record = member_map
+            self.journal_seq = journal_seq
+            self.schema_version = schema_version
+        self._delta_size = intact
+
+    def load(self) -> Dict[str, Any]:
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                data = f.read()
+
+            (players, self.guild_records, self.member_map_record,
+             self.journal_seq, self.schema_version) = unpack_snapshot(data)
+            for user_id, (record, summary) in players.items():
+                self.player_records[user_id] = record
+                self.player_summaries[user_id] = summary
+            # An older layout is converted on every load until the next commit
+            # rewrites it
+            self._document_size = len(data) if data.startswith(MAGIC) else 0
+            self._read_delta()
+
+        return {
+            "players": {},
+            "guilds": {
+                name: self.decode_record(record)
+                for name, record in self.guild_records.items()
+            },
+            "member_guild_map": self.decode_record(self.member_map_record),
+            "journal_seq": self.journal_seq,
+            "schema_version": self.schema_version
+        }
+
+    def player_count(self) -> int:
+        return len(self.player_records)
+
+    def load_player(self, user_id: int) -> Optional[Any]:
+        return self.player_records.get(user_id)
+
+    def iter_player_rows(self) -> Iterator[Tuple[int, Any]]:
+        yield from list(self.player_records.items())
+
+    def load_summary(self, user_id: int) -> Optional[Dict[str, Any]]:
+        summary = self.player_summaries.get(user_id)
+        return None if summary is None else self.decode_record(summary)
+
+    def iter_summaries(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        for user_id, summary in list(self.player_summaries.items()):
+            yield user_id, self.decode_record(summary)
+
+    def put_player(self, user_id: int, record: Optional[bytes],
+                   summary: Optional[Dict[str, Any]] = None) -> None:
+        if record is None:
+            self.player_records.pop(user_id, None)
+            self.player_summaries.pop(user_id, None)
+            self._changed_players[user_id] = None
+        else:
+            self.player_records[user_id] = record
+            self.player_summaries[user_id] = self.encode_record(summary)
+            self._changed_players[user_id] = (
+                record, self.player_summaries[user_id])
+
+    def put_guild(self, guild_name: str, record: Optional[bytes]) -> None:
+        if record is None:
+            self.guild_records.pop(guild_name, None)
+        else:
+            self.guild_records[guild_name] = record
+        self._changed_guilds[guild_name] = record
+
+    def put_member_map(self, member_map: Dict[int, str]) -> None:
+        self.member_map_record = self.encode_record(
+            {str(k): v for k, v in member_map.items()})
+        self._member_map_changed = True
+
+    def set_journal_seq(self, seq: int) -> None:
+        self.journal_seq = seq
+
+    def set_schema_version(self, version: int) -> None:
+        self.schema_version = version
+
+    def commit(self) -> None:
+        """Log the changed records, or rewrite the snapshot once the log has
+        grown larger than it"""
+        if self._delta_size >= self._document_size:
+            self._write_snapshot()
+        else:
+            self._append_delta()
+
+        self._changed_players = {}
+        self._changed_guilds = {}
+        self._member_map_changed = False
+
+    def _append_delta(self) -> None:
+        """Append one change entry, fsynced before commit() returns"""
+        entry = pack_changes(
+            self._changed_players, self._changed_guilds,
+            self.member_map_record if self._member_map_changed else None,
+            self.journal_seq, self.schema_version)
+
+        with open(self.delta_path, 'ab') as f:
+            f.write(entry)
+            f.flush()
+            os.fsync(f.fileno())
+        self._delta_size += len(entry)
+
+    def _write_snapshot(self) -> None:
+        """Write every record out as a new snapshot and drop the log; as in
+        JsonStorage a log left behind by a crash changes nothing on load"""
+        players = {
+            user_id: (record, self.player_summaries[user_id])
+            for user_id, record in self.player_records.items()
+        }
+        snapshot = pack_snapshot(players, self.guild_records,
+                                 self.member_map_record, self.journal_seq,
+                                 self.schema_version)
+        atomic_write(self.path, snapshot)
+        self._document_size = len(snapshot)
+
+        if os.path.exists(self.delta_path):
+            os.remove(self.delta_path)
+        self._delta_size = 0
+
+    def import_json(self, json_path: str = JSON_PATH) -> int:
+        """
+        Convert player_data.json into this binary snapshot
+
+        Returns:
+            The number of players converted
+        """
+        data = JsonStorage(json_path).load()
+
+        for user_id, record in data["players"].items():
+            self.put_player(int(user_id), self.encode_record(record),
+                            summarize_record(record))
+        for guild_name, record in data["guilds"].items():
+            self.put_guild(guild_name, self.encode_record(record))
+        self.put_member_map(data["member_guild_map"])
+        self.set_journal_seq(data["journal_seq"])
+        self.set_schema_version(data["schema_version"])
+        self.commit()
+
+        return len(data["players"])
+
+    def export_json(self, json_path: str = JSON_PATH) -> int:
+        """
+        Convert this binary snapshot back into a JSON document
+
+        Returns:
+            The number of players converted
+        """
+        self.load()
+        target = JsonStorage(json_path)
+
+        for user_id, record in self.player_records.items():
+            decoded = self.decode_record(record)
+            target.put_player(user_id, target.encode_record(decoded),
+                              summarize_record(decoded))
+        for guild_name, record in self.guild_records.items():
+            target.put_guild(guild_name,
+                             target.encode_record(self.decode_record(record)))
+        target.member_map_record = target.encode_record(
+            self.decode_record(self.member_map_record))
+        target.set_journal_seq(self.journal_seq)
+        target.set_schema_version(self.schema_version)
+        target.commit()
+
+        return len(self.player_records)
+
+
+def open_storage(backend: Optional[str] = None):
+    """
+    Open the configured storage backend
+
+    The backend is taken from the DATA_BACKEND environment variable when not
+    given ("json", "sqlite" or "binary"). A fresh SQLite database or binary
+    snapshot is seeded from player_data.json if one exists.
+    """
+    backend = (backend or os.getenv("DATA_BACKEND", "json")).lower()
+
+    if backend == "sqlite":
+        storage = SQLiteStorage()
+        if storage.is_empty() and os.path.exists(JSON_PATH):
+            imported = storage.import_json(JSON_PATH)
+            print(f"Migrated {imported} players from {JSON_PATH} to {SQLITE_PATH}")
+        return storage
+
+    if backend == "binary":
+        storage = BinaryStorage()
+        if not os.path.exists(BINARY_PATH) and os.path.exists(JSON_PATH):
+            imported = storage.import_json(JSON_PATH)
+            print(f"Converted {imported} players from {JSON_PATH} to {BINARY_PATH}")
+        return storage
+
+    return JsonStorage()
@@ -93,22 +93,27 @@ class TradeManager:
         sender = self.data_manager.get_player(trade.sender_id)
         receiver = self.data_manager.get_player(trade.receiver_id)
 
-        # Create maps of item_id -> InventoryItem for faster lookup
-        sender_items = {item.item.item_id: item for item in sender.inventory}
+        # Look up the traded entries by item_id. An id the server-wide
+        # index assigns to someone else (a duplicated item) is refused.
+        sender_items = {
+            item_id: self.data_manager.find_item(item_id)
+            for item_id in trade.offered_items
+        }
         receiver_items = {
-            item.item.item_id: item
-            for item in receiver.inventory
+            item_id: self.data_manager.find_item(item_id)
+            for item_id in trade.requested_items
         }
 
         # Verify sender has the offered items
-        for item_id in trade.offered_items:
-            if item_id not in sender_items or sender_items[item_id].equipped:
+        for found in sender_items.values():
+            if (found is None or found[0] != trade.sender_id
+                    or found[1].equipped):
                 return False
 
         # Verify receiver has the requested items
-        for item_id in trade.requested_items:
-            if item_id not in receiver_items or receiver_items[
-                    item_id].equipped:
+        for found in receiver_items.values():
+            if (found is None or found[0] != trade.receiver_id
+                    or found[1].equipped):
                 return False
 
         # Verify cursed energy amounts
@@ -119,15 +124,15 @@ class TradeManager:
 
         # Transfer items from sender to receiver
         for item_id in trade.offered_items:
-            item = sender_items[item_id]
-            sender.inventory.remove(item)
-            receiver.inventory.append(item)
+            item = sender_items[item_id][1]
+            sender.remove_item(item)
+            receiver.add_item(item.item, item.quantity)
 
         # Transfer items from receiver to sender
         for item_id in trade.requested_items:
-            item = receiver_items[item_id]
-            receiver.inventory.remove(item)
-            sender.inventory.append(item)
+            item = receiver_items[item_id][1]
+            receiver.remove_item(item)
+            sender.add_item(item.item, item.quantity)
 
         # Transfer cursed energy
         sender.cursed_energy -= trade.offered_cursed_energy
@@ -378,6 +383,12 @@ class TradeView(View):
                     for item_id in self.trade.requested_items
                 ])
 
+            resolver = interaction.client.name_resolver
+            sender_name = (resolver.cached_name(self.trade.sender_id)
+                           or f"User {self.trade.sender_id}")
+            receiver_name = (resolver.cached_name(self.trade.receiver_id)
+                             or f"User {self.trade.receiver_id}")
+
             embed = discord.Embed(
                 title="Trade Completed!",
                 description="The trade has been successfully completed.",
@@ -385,14 +396,14 @@ class TradeView(View):
 
             embed.add_field(
                 name=
-                f"{interaction.client.get_user(self.trade.sender_id)} sent:",
+                f"{sender_name} sent:",
                 value=
                 f"{offered_items_text}\n{self.trade.offered_cursed_energy} cursed energy",
                 inline=True)
 
             embed.add_field(
                 name=
-                f"{interaction.client.get_user(self.trade.receiver_id)} sent:",
+                f"{receiver_name} sent:",
                 value=
                 f"{requested_items_text}\n{self.trade.requested_cursed_energy} cursed energy",
                 inline=True)
@@ -506,11 +517,8 @@ class TradeView(View):
 # Helper functions
 def get_item_by_id(item_id: str, data_manager: DataManager) -> Optional[Item]:
     """Find an item by its ID across all player inventories"""
-    for player_id, player in data_manager.players.items():
-        for inv_item in player.inventory:
-            if inv_item.item.item_id == item_id:
-                return inv_item.item
-    return None
+    found = data_manager.find_item(item_id)
+    return found[1].item if found else None
 
 
 def get_item_name_by_id(item_id: str, data_manager: DataManager) -> str:
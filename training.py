@@ -177,6 +177,7 @@ class TrainingOptionView(RestrictedView):
         # Attribute points directly modify allocated stats
         self.player_data.allocated_stats[
             option_data['attribute']] += attribute_gain
+        self.player_data.invalidate_stats()
 
         # Add exp
         leveled_up = self.player_data.add_exp(exp_gain)
@@ -305,6 +306,7 @@ class SkillPointsView(View):
         else:
             self.player_data.allocated_stats[stat] += 2
             increase_amount = 2
+        self.player_data.invalidate_stats()
 
         # Save player data
         self.data_manager.save_data()
@@ -483,7 +485,7 @@ async def train_command(ctx, data_manager: DataManager):
     embed.add_field(
         name="📈 Level Info",
         value=f"**Level:** {player_data.class_level}\n"
-        f"**EXP:** {player_data.class_exp}/{int(100 * (player_data.class_level ** 1.5))}\n"
+        f"**EXP:** {player_data.class_exp}/{player_data.xp_to_next_level()}\n"
         f"**Class:** {player_data.class_name}",
         inline=True)
 
@@ -0,0 +1,91 @@
+"""
+Experience curves with precomputed level tables
+
+Each curve tabulates, once at import, the experience every level needs to
+level up (per_level[L] takes a player from L to L + 1) and the running total
+needed to reach every level (cumulative[L] is the experience from level 1 to
+level L). Turning a total into a level is then a binary search over
+cumulative rather than a level-by-level loop, and add_exp() implementations
+can apply any number of level-ups in one step with advance().
+
+PLAYER_CURVE, CRAFTING_CURVE and GUILD_CURVE are the game's curves; level-ups
+and XP displays read them from here.
+"""
+
+import zlib
+from bisect import bisect_right
+from typing import Callable, List, Tuple
+
+
+class XpCurve:
+
+    __slots__ = ("formula", "max_level", "per_level", "cumulative",
+                 "checksum")
+
+    def __init__(self, formula: Callable[[int], int], max_level: int):
+        self.formula = formula
+        self.max_level = max_level
+        # Index 0 is unused so that levels index the tables directly
+        self.per_level: List[int] = [0] + [
+            formula(level) for level in range(1, max_level + 1)
+        ]
+        # One entry past max_level, so totals beyond the cap can be detected
+        cumulative = [0, 0]
+        for level in range(1, max_level + 1):
+            cumulative.append(cumulative[-1] + self.per_level[level])
+        self.cumulative: List[int] = cumulative
+        # Changes whenever the formula or the level cap does
+        self.checksum = zlib.crc32(
+            ",".join(map(str, self.per_level)).encode())
+
+    def exp_for_level(self, level: int) -> int:
+        """Experience needed to level up from level"""
+        if 1 <= level <= self.max_level:
+            return self.per_level[level]
+        return self.formula(level)
+
+    def total_exp(self, level: int, exp: int) -> int:
+        """Total experience earned by someone at level with exp banked"""
+        return self.cumulative[max(1, min(level, self.max_level))] + exp
+
+    def level_for_total(self, total_exp: int) -> Tuple[int, int]:
+        """
+        Level reached with total_exp earned from level 1
+
+        Returns:
+            Tuple of (level, exp left over); past the level cap this is
+            (max_level, 0)
+        """
+        level = bisect_right(self.cumulative, total_exp) - 1
+        if level > self.max_level:
+            return self.max_level, 0
+        return level, total_exp - self.cumulative[level]
+
+    def advance(self, level: int, exp: int) -> Tuple[int, int]:
+        """
+        Apply every level-up that exp pays for, starting from level
+
+        Returns:
+            Tuple of (new level, exp left over). At max_level no more
+            levels are gained and the exp stays banked.
+        """
+        if level >= self.max_level or exp < self.per_level[max(level, 1)]:
+            return level, exp
+
+        total = self.cumulative[max(level, 1)] + exp
+        new_level = min(bisect_right(self.cumulative, total) - 1,
+                        self.max_level)
+        return new_level, total - self.cumulative[new_level]
+
+
+# Class levels: 75 * level^1.35 per level, capped at 1000
+PLAYER_CURVE = XpCurve(lambda level: int(75 * (level**1.35)), 1000)
+
+# Crafting skill levels: 100 * level^1.5 per level, capped at 1000
+CRAFTING_CURVE = XpCurve(lambda level: int(100 * (level**1.5)), 1000)
+
+# Guilds keep their total exp and level up from level L once it reaches
+# 1000 * L^2 (guild_system.calculate_guild_exp_for_level), which is
+# 1000 * (2L - 1) more than level L - 1 needed. The table stops at level
+# 1000, a total of about a billion exp.
+GUILD_CURVE = XpCurve(lambda level: 1000 * (2 * level - 1), 1000)